@@ -2,62 +2,122 @@
 import streamlit as st
 import pandas as pd
 import logging
-import os
-from datetime import datetime, timedelta
+from datetime import date, datetime, timedelta
 
-from utils.cache_manager import load_from_cache, save_to_cache
+from utils.dataset_cache import get_dataset_cache, resolve_cache_dir, DatasetCache
 from utils.config_loader import APP_CONFIG # Import APP_CONFIG if not already
+from data_processing.async_baserow_fetcher import AsyncBaserowFetcher
 
 logger = logging.getLogger(__name__)
 
-def _load_single_dataset(
-    fetcher, 
-    dataset_name: str, 
-    session_state_key: str, 
-    fetch_function,
-    table_id: int, 
-    cache_config: dict, 
-    force_reload: bool = False
-):
+def _get_dataset_cache(cache_config: dict):
+    """The shared two-tier cache and the default TTL (seconds) for datasets without their own `ttl_hours`."""
+    return get_dataset_cache(resolve_cache_dir(cache_config)), float(cache_config.get('expiry_days', 5)) * 86400
+
+
+def _version_key(session_state_key: str) -> str:
+    """Session state key holding the cache version of the session's copy."""
+    return f"{session_state_key}_cache_version"
+
+
+def _meta_version(meta):
+    """A cached dataset's version: changes on every full fill and on every partition update."""
+    return (meta.get('version') or meta.get('last_updated')) if meta else None
+
+
+def _single_flight_fetch(cache, fetcher, dataset_name: str, fetch_function, ttl_seconds: float, force_reload: bool):
     """
-    Generic function to load one dataset, handling session state and file cache.
+    Wraps `fetch_function(table_id)` so that only one session or process fetches the dataset at a
+    time; the others wait and use what it cached (see DatasetCache.get_or_fill). A forced reload
+    also rebuilds the fetcher's delta-sync snapshot of the table (see BaserowFetcher.full_refresh).
     """
-    if session_state_key in st.session_state and not force_reload:
-        logger.debug(f"DATA_LOADER: Found '{dataset_name}' data in session state. Skipping reload.")
-        return
+    def fill(table_id):
+        if not force_reload:
+            return fetch_function(table_id)
+        with fetcher.full_refresh():
+            return fetch_function(table_id)
 
-    project_root = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
-    cache_dir = os.path.join(project_root, cache_config.get('directory', '.rms_cache'))
-    cache_expiry_days = cache_config.get('expiry_days', 5)
-    
-    df = None
-    if not force_reload:
-        df = load_from_cache(dataset_name, cache_dir, cache_expiry_days)
+    def fetch(table_id):
+        return cache.get_or_fill(dataset_name, lambda: fill(table_id), ttl_seconds=ttl_seconds, force=force_reload)
+    return fetch
+
+
+def _store_dataset(dataset_name: str, session_state_key: str, df, fetched: bool, version=None):
+    """
+    Puts the dataset into session state. Data comes from the cache already in its typed form
+    (see utils/dataset_schemas.py); fetched data was typed and cached by the single-flight fill.
+    What the session holds is a shallow view of the frame in the cache's memory tier, shared by
+    every session of the process, not a copy, so memory does not grow with the number of sessions.
+    Pages filter and derive from it but must not modify it in place.
+    """
+    if fetched and (df is None or df.empty):
+        df = pd.DataFrame()
+        logger.warning(f"DATA_LOADER: Fetched '{dataset_name}' data is empty or None.")
 
-    if df is None:
-        logger.info(f"DATA_LOADER: Fetching fresh '{dataset_name}' data from Baserow (Table ID: {table_id}).")
-        with st.spinner(f"Loading {dataset_name.replace('_', ' ')} from Baserow..."):
-            df = fetch_function(table_id)
-            if df is not None and not df.empty:
-                save_to_cache(df, dataset_name, cache_dir)
-            else:
-                df = pd.DataFrame()
-                logger.warning(f"DATA_LOADER: Fetched '{dataset_name}' data is empty or None.")
-    
-    # Perform one-time cleaning specific to the dataset
-    if dataset_name == 'processed_sales_data' and not df.empty:
-        df['Sale Date'] = df['Sale Date'].astype(str).str.strip()
-        df['Sale Date'] = pd.to_datetime(df['Sale Date'], errors='coerce').dt.date
-        df['Report Period Start Date'] = pd.to_datetime(df['Report Period Start Date'], errors='coerce').dt.date
-        df['Quantity Sold'] = pd.to_numeric(df['Quantity Sold'], errors='coerce').fillna(0)
-        df['Net Revenue'] = pd.to_numeric(df['Net Revenue'], errors='coerce').fillna(0)
-        df.dropna(subset=['Sale Date', 'Platform', 'Account Name'], inplace=True)
-        df['MSKU'] = df['MSKU'].fillna('UNMAPPED').replace('', 'UNMAPPED')
-    
     st.session_state[session_state_key] = df
+    st.session_state[_version_key(session_state_key)] = version
     logger.info(f"DATA_LOADER: '{dataset_name}' data is now loaded into session state.")
 
 
+def _serve_without_blocking(cache, dataset_name: str, session_state_key: str, fetch_function, table_id,
+                            default_ttl_seconds: float, grace_seconds: float) -> bool:
+    """
+    Stale-while-revalidate. Returns True when the dataset could be served without waiting on Baserow:
+    - the session already has it; a newer cached version (from a background refresh, another
+      session or the notifier) is swapped in, and an expired one is refreshed in the background;
+    - the cache has it and it is fresh, or expired by less than the grace window, in which case
+      the stale copy is served and refreshed in the background.
+    Returns False when the caller has to fetch (nothing cached, or older than TTL + grace).
+    """
+    meta = cache.current_meta(dataset_name)
+    version = _meta_version(meta)
+    age = DatasetCache.age_seconds(meta)
+    ttl = cache.ttl_for(dataset_name, default_ttl_seconds)
+    refresh = lambda: fetch_function(table_id)
+
+    if session_state_key in st.session_state:
+        if version and version != st.session_state.get(_version_key(session_state_key)):
+            df = cache.get(dataset_name, allow_stale=True)
+            if df is not None:
+                logger.info(f"DATA_LOADER: Swapping in the newer cached version of '{dataset_name}' ({version[:16]}).")
+                _store_dataset(dataset_name, session_state_key, df, fetched=False, version=version)
+        if age is None or age >= ttl:
+            cache.refresh_in_background(dataset_name, refresh)
+        return True
+
+    if age is None or age >= ttl + grace_seconds:
+        return False
+    df = cache.get(dataset_name, allow_stale=True)
+    if df is None:
+        return False
+    if age >= ttl:
+        logger.info(f"DATA_LOADER: Serving '{dataset_name}' ({age / 3600:.1f}h old) while it refreshes in the background.")
+        cache.refresh_in_background(dataset_name, refresh)
+    _store_dataset(dataset_name, session_state_key, df, fetched=False, version=version)
+    return True
+
+
+def _format_age(seconds) -> str:
+    if seconds < 3600:
+        return f"{max(0, int(seconds // 60))} min"
+    if seconds < 2 * 86400:
+        return f"{seconds / 3600:.1f} h"
+    return f"{seconds / 86400:.1f} days"
+
+
+def _show_data_age(cache, loaded: list):
+    """Sidebar caption with the age of each dataset the page uses, marking those refreshing in the background."""
+    parts = []
+    for dataset_name, session_state_key in loaded:
+        age = DatasetCache.age_seconds(cache.current_meta(dataset_name))
+        if session_state_key not in st.session_state or age is None:
+            continue
+        label = dataset_name.replace('_data', '').replace('_', ' ')
+        parts.append(f"{label}: {_format_age(age)}" + (" (refreshing…)" if cache.is_refreshing(dataset_name) else ""))
+    if parts:
+        st.sidebar.caption("🕒 Data age — " + " · ".join(parts))
+
+
 def load_and_cache_analytics_data(
     fetcher, 
     sales_table_id, 
@@ -71,26 +131,126 @@ def load_and_cache_analytics_data(
 ):
     """
     Orchestrates loading of all analytics datasets, utilizing file cache and session state.
+    Cached data is served right away, even when it has expired but is still within
+    `cache.stale_grace_hours`; expired datasets are then refreshed in the background and
+    swapped in on a later rerun. Only datasets with nothing usable cached are fetched here,
+    concurrently, so the wait is roughly that of the slowest table.
     """
     if cache_config is None:
         cache_config = APP_CONFIG.get('cache', {})
+    cache, default_ttl_seconds = _get_dataset_cache(cache_config)
+    grace_seconds = float(cache_config.get('stale_grace_hours', 72)) * 3600
+
+    # (dataset name, session state key, fetch function, table id)
+    datasets = [
+        ('processed_sales_data', 'analytics_sales_df', fetcher.get_table_data_as_dataframe, sales_table_id),
+        ('inventory_data', 'analytics_inventory_df', fetcher.get_inventory_data, inventory_table_id),
+        ('category_data', 'analytics_category_df', fetcher.get_category_data, category_table_id),
+        ('catalogue_data', 'analytics_catalogue_df', fetcher.get_catalogue_data, catalogue_table_id),
+        # --- NEW: packaging data ---
+        ('outbound_packaging_data', 'packaging_outbound_df', fetcher.get_outbound_packaging_data, outbound_table_id),
+        ('packaging_inventory_data', 'packaging_inventory_df', fetcher.get_packaging_inventory, packaging_inv_table_id),
+    ]
+
+    to_fetch = {}
+    loaded = []
+    for dataset_name, session_state_key, fetch_function, table_id in datasets:
+        if not table_id:
+            continue
+        loaded.append((dataset_name, session_state_key))
+        if not force_reload and _serve_without_blocking(cache, dataset_name, session_state_key, fetch_function, table_id,
+                                                        default_ttl_seconds, grace_seconds):
+            continue
+        to_fetch[dataset_name] = (session_state_key, fetch_function, table_id)
+
+    if not to_fetch:
+        _show_data_age(cache, loaded)
+        return
+
+    logger.info(f"DATA_LOADER: Fetching fresh data from Baserow for: {', '.join(to_fetch)}.")
+    async_fetcher = AsyncBaserowFetcher.from_fetcher(fetcher)
+    with st.spinner(f"Loading {', '.join(name.replace('_', ' ') for name in to_fetch)} from Baserow..."):
+        results = async_fetcher.load_many(
+            {
+                name: (_single_flight_fetch(cache, fetcher, name, fetch_function, default_ttl_seconds, force_reload), table_id)
+                for name, (_, fetch_function, table_id) in to_fetch.items()
+            },
+            return_exceptions=True,
+        )
+
+    first_error = None
+    for dataset_name, result in results.items():
+        if isinstance(result, Exception):
+            logger.error(f"DATA_LOADER: Failed to fetch '{dataset_name}' data: {result}")
+            first_error = first_error or result
+            continue
+        _store_dataset(dataset_name, to_fetch[dataset_name][0], result, fetched=True,
+                       version=_meta_version(cache.current_meta(dataset_name)))
+    _show_data_age(cache, loaded)
+    # Datasets that loaded fine are kept; the first failure is surfaced to the page as before.
+    if first_error is not None:
+        raise first_error
+
+def _date_str(value) -> str:
+    return value.strftime('%Y-%m-%d') if isinstance(value, (date, datetime)) else str(value)
+
 
-    if sales_table_id:
-        _load_single_dataset(fetcher, 'processed_sales_data', 'analytics_sales_df', fetcher.get_table_data_as_dataframe, sales_table_id, cache_config, force_reload)
-    
-    if inventory_table_id:
-        _load_single_dataset(fetcher, 'inventory_data', 'analytics_inventory_df', fetcher.get_inventory_data, inventory_table_id, cache_config, force_reload)
+def _sales_partition_filter(start_date=None, end_date=None, platforms=None, accounts=None) -> dict:
+    """Partition predicates (see HivePartitioning.partition_files) for a date range and optional platforms/accounts."""
+    first_month = _date_str(start_date)[:7] if start_date else None
+    last_month = _date_str(end_date)[:7] if end_date else None
+    return {
+        'Platform': set(platforms) if platforms else None,
+        'Account Name': set(accounts) if accounts else None,
+        'year_month': (lambda month: month is not None and (not first_month or month >= first_month)
+                       and (not last_month or month <= last_month)) if (first_month or last_month) else None,
+    }
 
-    if category_table_id:
-        _load_single_dataset(fetcher, 'category_data', 'analytics_category_df', fetcher.get_category_data, category_table_id, cache_config, force_reload)
 
-    if catalogue_table_id:
-        _load_single_dataset(fetcher, 'catalogue_data', 'analytics_catalogue_df', fetcher.get_catalogue_data, catalogue_table_id, cache_config, force_reload)
+def load_sales_data(start_date=None, end_date=None, platforms=None, accounts=None, cache_config=None):
+    """
+    Typed sales rows between `start_date` and `end_date` (inclusive), optionally for some
+    platforms/accounts, read from the partitioned sales cache: only the Platform / Account Name /
+    month partitions that can match are loaded. Returns None when the sales data is not cached
+    (load_and_cache_analytics_data or the notifier fill it). Expired data is returned as well;
+    the caller decides whether that matters.
+    """
+    if cache_config is None:
+        cache_config = APP_CONFIG.get('cache', {})
+    cache, _ = _get_dataset_cache(cache_config)
+    df = cache.get_partitions('processed_sales_data', _sales_partition_filter(start_date, end_date, platforms, accounts),
+                              allow_stale=True)
+    if df is None:
+        return None
+    if not df.empty and start_date:
+        df = df[df['Sale Date'] >= pd.to_datetime(start_date).date()]
+    if not df.empty and end_date:
+        df = df[df['Sale Date'] <= pd.to_datetime(end_date).date()]
+    return df
+
+
+def refresh_cached_sales_partitions(fetcher, sales_table_id, platform, account_name, start_date, end_date, cache_config=None):
+    """
+    After an upload, re-reads one platform/account date range from Baserow and writes it into
+    the sales cache, rewriting only the partitions (months) of that account the range covers.
+    Sessions holding the sales data swap the new version in on their next rerun.
+    Returns False when the sales data is not cached as partitions, or the re-read failed.
+    """
+    if cache_config is None:
+        cache_config = APP_CONFIG.get('cache', {})
+    cache, _ = _get_dataset_cache(cache_config)
+    start_str, end_str = _date_str(start_date), _date_str(end_date)
+    first_day, last_day = pd.to_datetime(start_str).date(), pd.to_datetime(end_str).date()
+    try:
+        fresh_df = fetcher.fetch_sales_partitions(sales_table_id, [(platform, account_name)], start_str, end_str)
+    except Exception as e:
+        logger.warning(f"DATA_LOADER: Could not re-read {platform} / {account_name} sales for the cache: {e}")
+        return False
 
-    # --- NEW: Add logic to load packaging data ---
-    if outbound_table_id:
-        _load_single_dataset(fetcher, 'outbound_packaging_data', 'packaging_outbound_df', fetcher.get_outbound_packaging_data, outbound_table_id, cache_config, force_reload)
+    def in_scope(frame):
+        # Cached sales are typed: 'Sale Date' holds dates and rows without one were dropped.
+        return ((frame['Platform'] == str(platform)) & (frame['Account Name'] == str(account_name))
+                & (frame['Sale Date'] >= first_day) & (frame['Sale Date'] <= last_day))
 
-    if packaging_inv_table_id:
-        _load_single_dataset(fetcher, 'packaging_inventory_data', 'packaging_inventory_df', fetcher.get_packaging_inventory, packaging_inv_table_id, cache_config, force_reload)
-    # --- END NEW ---
\ No newline at end of file
+    where = _sales_partition_filter(start_str, end_str, [str(platform)], [str(account_name)])
+    return cache.update_partitions('processed_sales_data', fresh_df, where, in_scope)
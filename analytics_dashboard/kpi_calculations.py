@@ -141,7 +141,7 @@ def calculate_sales_velocity(daily_sales_df: pd.DataFrame, days_period: int) ->
         logger.warning(f"KPI_CALC: No sales data found in the last {days_period} days for velocity calculation.")
         return pd.Series(dtype=float)
 
-    total_sales_per_msku = velocity_df.groupby('MSKU')['Quantity Sold'].sum()
+    total_sales_per_msku = velocity_df.groupby('MSKU', observed=True)['Quantity Sold'].sum()
     avg_daily_sales = total_sales_per_msku / days_period
     
     logger.info(f"KPI_CALC: Calculated sales velocity for {len(avg_daily_sales)} MSKUs over {days_period} days.")
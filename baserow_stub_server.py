@@ -0,0 +1,301 @@
+# RMS/baserow_stub_server.py
+"""
+A small local stand-in for the parts of the Baserow REST API that RMS uses, so the fetcher
+(pagination, filters, batch writes, export jobs) can be exercised without a real Baserow.
+
+Run:
+    python baserow_stub_server.py --rows 50000 --port 8099
+and point a fetcher at it:
+    BaserowFetcher(api_token="local", base_url="http://127.0.0.1:8099")
+
+Table 1 is a synthetic processed-sales table. Any other table id starts empty.
+"""
+import argparse
+import csv
+import io
+import json
+import random
+import threading
+import time
+import uuid
+from datetime import date, timedelta
+
+from flask import Flask, request, jsonify, Response, abort
+
+app = Flask(__name__)
+
+SALES_FIELDS = [
+    {"id": 1, "name": "Sale Date", "type": "date", "date_format": "ISO", "date_include_time": False, "primary": True},
+    {"id": 2, "name": "MSKU", "type": "text"},
+    {"id": 3, "name": "Platform", "type": "single_select"},
+    {"id": 4, "name": "Account Name", "type": "text"},
+    {"id": 5, "name": "Quantity Sold", "type": "number"},
+    {"id": 6, "name": "Net Revenue", "type": "number"},
+    {"id": 7, "name": "Tags", "type": "multiple_select"},
+]
+PLATFORMS = ["Amazon", "Flipkart", "Meesho", "Shopify", "FirstCry"]
+
+TABLES = {}        # table_id -> {"fields": [...], "rows": {row_id: row}, "next_id": int}
+EXPORT_JOBS = {}   # job_id -> {"table_id", "state", "polls", "file"}
+EXPORT_FILES = {}  # file name -> bytes
+LOCK = threading.Lock()
+SETTINGS = {"latency_ms": 0, "exports": True, "export_polls": 2, "max_rps": 0, "straggler_rate": 0.0, "straggler_ms": 0}
+RECENT_REQUESTS = []  # monotonic timestamps of the last second of API calls, for --max-rps
+
+
+def _build_sales_table(row_count, seed=7):
+    rng = random.Random(seed)
+    start = date(2024, 1, 1)
+    rows = {}
+    for row_id in range(1, row_count + 1):
+        platform = rng.choice(PLATFORMS)
+        rows[row_id] = {
+            "id": row_id,
+            "order": f"{row_id}.00000000000000000000",
+            "Sale Date": (start + timedelta(days=rng.randrange(365))).isoformat(),
+            "MSKU": f"MSKU-{rng.randrange(2000):04d}",
+            "Platform": {"id": PLATFORMS.index(platform) + 1, "value": platform, "color": "blue"},
+            "Account Name": f"Account {rng.randrange(3) + 1}",
+            "Quantity Sold": str(rng.randrange(1, 20)),
+            "Net Revenue": f"{rng.uniform(100, 5000):.2f}",
+            "Tags": [{"id": 1, "value": "bulk", "color": "red"}] if rng.random() < 0.1 else [],
+        }
+    return {"fields": SALES_FIELDS, "rows": rows, "next_id": row_count + 1}
+
+
+def _table(table_id):
+    with LOCK:
+        if table_id not in TABLES:
+            TABLES[table_id] = {"fields": [], "rows": {}, "next_id": 1}
+        return TABLES[table_id]
+
+
+def _require_token():
+    if not request.headers.get("Authorization", "").startswith("Token "):
+        abort(401)
+    if SETTINGS["max_rps"]:
+        now = time.monotonic()
+        with LOCK:
+            RECENT_REQUESTS[:] = [t for t in RECENT_REQUESTS if now - t < 1.0]
+            throttled = len(RECENT_REQUESTS) >= SETTINGS["max_rps"]
+            if not throttled:
+                RECENT_REQUESTS.append(now)
+        if throttled:
+            abort(Response(json.dumps({"error": "ERROR_REQUEST_THROTTLED"}), status=429,
+                           headers={"Retry-After": "1"}, mimetype="application/json"))
+    delay_ms = SETTINGS["latency_ms"]
+    if SETTINGS["straggler_rate"] and random.random() < SETTINGS["straggler_rate"]:
+        delay_ms += SETTINGS["straggler_ms"]
+    if delay_ms:
+        time.sleep(delay_ms / 1000)
+
+
+def _plain(value):
+    """Cell value as compared by filters: select options by their value."""
+    if isinstance(value, dict):
+        return str(value.get("value", ""))
+    if isinstance(value, list):
+        return ",".join(_plain(v) for v in value)
+    return "" if value is None else str(value)
+
+
+def _matches(row, group):
+    results = []
+    for flt in group.get("filters", []):
+        cell, wanted = _plain(row.get(flt["field"])), flt.get("value", "")
+        kind = flt["type"]
+        if kind == "equal":
+            results.append(cell == wanted)
+        elif kind == "not_equal":
+            results.append(cell != wanted)
+        elif kind == "contains":
+            results.append(wanted.lower() in cell.lower())
+        elif kind == "date_after_or_equal":
+            results.append(cell[:10] >= wanted[:10] if cell else False)
+        elif kind == "date_before_or_equal":
+            results.append(cell[:10] <= wanted[:10] if cell else False)
+        else:
+            abort(400, description=f"Filter type '{kind}' is not supported by the stub server.")
+    results.extend(_matches(row, sub) for sub in group.get("groups", []))
+    if not results:
+        return True
+    return all(results) if group.get("filter_type", "AND") == "AND" else any(results)
+
+
+@app.route("/api/database/fields/table/<int:table_id>/", methods=["GET"])
+def list_fields(table_id):
+    _require_token()
+    return jsonify(_table(table_id)["fields"])
+
+
+@app.route("/api/database/rows/table/<int:table_id>/", methods=["GET"])
+def list_rows(table_id):
+    _require_token()
+    table = _table(table_id)
+    page = int(request.args.get("page", 1))
+    size = min(int(request.args.get("size", 100)), 200)
+
+    with LOCK:
+        rows = list(table["rows"].values())
+    if request.args.get("filters"):
+        tree = json.loads(request.args["filters"])
+        rows = [row for row in rows if _matches(row, tree)]
+    for field in reversed([f for f in request.args.get("order_by", "").split(",") if f]):
+        rows.sort(key=lambda row: _plain(row.get(field.lstrip("-"))), reverse=field.startswith("-"))
+
+    count = len(rows)
+    page_rows = rows[(page - 1) * size: page * size]
+    if request.args.get("include"):
+        included = set(request.args["include"].split(","))
+        page_rows = [{k: v for k, v in row.items() if k in included or k in ("id", "order")} for row in page_rows]
+    if page > 1 and not page_rows:
+        return jsonify({"error": "ERROR_INVALID_PAGE", "detail": "Invalid page"}), 404
+    base = request.base_url
+    return jsonify({
+        "count": count,
+        "next": f"{base}?page={page + 1}&size={size}" if page * size < count else None,
+        "previous": f"{base}?page={page - 1}&size={size}" if page > 1 else None,
+        "results": page_rows,
+    })
+
+
+def _stored_value(field, value):
+    """Stores a written value the way Baserow returns it: numbers as text, select options as objects."""
+    field_type = field.get("type") if field else None
+    if value is None or field_type is None:
+        return value
+    if field_type == "number":
+        return str(value)
+    if field_type == "single_select":
+        name = value.get("value") if isinstance(value, dict) else str(value)
+        return {"id": PLATFORMS.index(name) + 1 if name in PLATFORMS else 0, "value": name, "color": "blue"}
+    if field_type == "multiple_select":
+        return [{"id": 0, "value": v.get("value") if isinstance(v, dict) else str(v), "color": "blue"} for v in value]
+    return value
+
+
+@app.route("/api/database/rows/table/<int:table_id>/batch/", methods=["POST", "PATCH"])
+def batch_write(table_id):
+    _require_token()
+    table = _table(table_id)
+    items = (request.get_json(silent=True) or {}).get("items", [])
+    if len(items) > 200:
+        return jsonify({"error": "ERROR_REQUEST_BODY_VALIDATION", "detail": "At most 200 items"}), 400
+    written = []
+    with LOCK:
+        for item in items:
+            if request.method == "POST":
+                row_id = table["next_id"]
+                table["next_id"] += 1
+                row = {"id": row_id, "order": f"{row_id}.00000000000000000000"}
+            else:
+                row = table["rows"].get(item.get("id"))
+                if row is None:
+                    return jsonify({"error": "ERROR_ROW_DOES_NOT_EXIST", "detail": f"Row {item.get('id')} does not exist"}), 404
+            fields = {f["name"]: f for f in table["fields"]}
+            row.update({k: _stored_value(fields.get(k), v) for k, v in item.items() if k not in ("id", "order")})
+            table["rows"][row["id"]] = row
+            written.append(row)
+    return jsonify({"items": written})
+
+
+@app.route("/api/database/rows/table/<int:table_id>/batch-delete/", methods=["POST"])
+def batch_delete(table_id):
+    _require_token()
+    table = _table(table_id)
+    row_ids = (request.get_json(silent=True) or {}).get("items", [])
+    with LOCK:
+        missing = [rid for rid in row_ids if rid not in table["rows"]]
+        if missing:
+            return jsonify({"error": "ERROR_ROW_DOES_NOT_EXIST", "detail": f"Rows {missing} do not exist"}), 404
+        for rid in row_ids:
+            del table["rows"][rid]
+    return Response(status=204)
+
+
+@app.route("/api/database/rows/table/<int:table_id>/<int:row_id>/", methods=["DELETE"])
+def delete_row(table_id, row_id):
+    _require_token()
+    with LOCK:
+        if _table(table_id)["rows"].pop(row_id, None) is None:
+            return jsonify({"error": "ERROR_ROW_DOES_NOT_EXIST"}), 404
+    return Response(status=204)
+
+
+def _export_csv(table):
+    with LOCK:
+        rows = list(table["rows"].values())
+    names = [f["name"] for f in table["fields"]] or sorted({k for row in rows for k in row} - {"id", "order"})
+    buffer = io.StringIO()
+    writer = csv.writer(buffer)
+    writer.writerow(["id"] + names)
+    for row in rows:
+        cells = []
+        for name in names:
+            value = row.get(name)
+            if isinstance(value, list):
+                inner = io.StringIO()
+                csv.writer(inner).writerow([_plain(v) for v in value])
+                cells.append(inner.getvalue().strip("\r\n"))
+            else:
+                cells.append(_plain(value))
+        writer.writerow([row["id"]] + cells)
+    return buffer.getvalue().encode("utf-8")
+
+
+@app.route("/api/database/export/table/<int:table_id>/", methods=["POST"])
+def start_export(table_id):
+    _require_token()
+    if not SETTINGS["exports"]:
+        # Real Baserow only accepts export jobs from a JWT-authenticated user.
+        return jsonify({"error": "ERROR_NOT_AUTHENTICATED"}), 401
+    job_id = len(EXPORT_JOBS) + 1
+    EXPORT_JOBS[job_id] = {"table_id": table_id, "state": "pending", "polls": 0, "file": None}
+    return jsonify({"id": job_id, "state": "pending", "progress_percentage": 0, "url": None})
+
+
+@app.route("/api/database/export/<int:job_id>/", methods=["GET"])
+def export_status(job_id):
+    _require_token()
+    job = EXPORT_JOBS.get(job_id)
+    if job is None:
+        return jsonify({"error": "ERROR_EXPORT_JOB_DOES_NOT_EXIST"}), 404
+    job["polls"] += 1
+    if job["state"] != "finished" and job["polls"] >= SETTINGS["export_polls"]:
+        file_name = f"export_{uuid.uuid4().hex}.csv"
+        EXPORT_FILES[file_name] = _export_csv(_table(job["table_id"]))
+        job.update({"state": "finished", "file": file_name})
+    elif job["state"] == "pending":
+        job["state"] = "exporting"
+    return jsonify({
+        "id": job_id, "state": job["state"],
+        "progress_percentage": 100 if job["state"] == "finished" else 50,
+        "url": f"/media/export_files/{job['file']}" if job["file"] else None,
+    })
+
+
+@app.route("/media/export_files/<file_name>", methods=["GET"])
+def download_export(file_name):
+    content = EXPORT_FILES.get(file_name)
+    if content is None:
+        abort(404)
+    return Response(content, mimetype="text/csv")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Local stand-in for the Baserow REST API used by RMS.")
+    parser.add_argument("--port", type=int, default=8099)
+    parser.add_argument("--rows", type=int, default=10000, help="Rows in the synthetic sales table (table id 1).")
+    parser.add_argument("--latency-ms", type=int, default=0, help="Delay added to every API call.")
+    parser.add_argument("--no-exports", action="store_true", help="Refuse export jobs like Baserow does for API tokens.")
+    parser.add_argument("--export-polls", type=int, default=2, help="Status polls before an export job finishes.")
+    parser.add_argument("--max-rps", type=int, default=0, help="Answer 429 (Retry-After: 1) above this many API calls per second.")
+    parser.add_argument("--straggler-rate", type=float, default=0.0, help="Share of API calls that get --straggler-ms extra delay.")
+    parser.add_argument("--straggler-ms", type=int, default=3000)
+    args = parser.parse_args()
+
+    SETTINGS.update({"latency_ms": args.latency_ms, "exports": not args.no_exports, "export_polls": args.export_polls,
+                     "max_rps": args.max_rps, "straggler_rate": args.straggler_rate, "straggler_ms": args.straggler_ms})
+    TABLES[1] = _build_sales_table(args.rows)
+    print(f"Baserow stand-in on http://127.0.0.1:{args.port} (sales table id 1, {args.rows} rows)")
+    app.run(host="127.0.0.1", port=args.port, threaded=True)
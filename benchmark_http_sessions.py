@@ -0,0 +1,136 @@
+# RMS/benchmark_http_sessions.py
+"""
+Compares the module-level requests.get (a new TCP/TLS connection per call) with the pooled
+keep-alive sessions from utils/http_session.py, replaying the requests of a typical planner
+session: field metadata and every page of the planner's tables, plus the product images
+downloaded for the replenishment PDF.
+
+By default both run against a built-in keep-alive server that charges --handshake-ms on every
+new connection, standing in for the TCP + TLS setup to the remote Baserow and image hosts:
+    python benchmark_http_sessions.py --handshake-ms 40
+
+Against a real server (read-only requests):
+    python benchmark_http_sessions.py --base-url https://baserow.example.com --token ... --table-id 708 --image-url https://.../image.jpg
+"""
+import argparse
+import json
+import socket
+import statistics
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+import requests
+
+from utils.http_session import get_http_session, session_stats, close_http_sessions
+
+
+def _local_server(handshake_ms):
+    """Starts an HTTP/1.1 keep-alive server on a free port and returns its base URL."""
+    page = json.dumps({"count": 10000, "next": "...", "results": [
+        {"id": i, "Sale Date": "2024-06-01", "MSKU": f"MSKU-{i:05d}", "Platform": {"id": 1, "value": "Amazon"},
+         "Account Name": "Main", "Quantity Sold": "3", "Net Revenue": "1299.00"} for i in range(200)
+    ]}).encode()
+    fields = json.dumps([{"id": 1, "name": "Sale Date", "type": "date"}, {"id": 2, "name": "MSKU", "type": "text"}]).encode()
+    image = bytes(range(256)) * 80 # ~20 KB, a product thumbnail
+
+    class Handler(BaseHTTPRequestHandler):
+        protocol_version = "HTTP/1.1"
+
+        def handle(self):
+            # Like nginx on keep-alive connections; otherwise Nagle + delayed ACKs add ~40 ms per reused request.
+            self.connection.setsockopt(socket.IPPROTO_TCP, socket.TCP_NODELAY, 1)
+            time.sleep(handshake_ms / 1000) # Once per connection
+            super().handle()
+
+        def do_GET(self):
+            if self.path.startswith("/api/database/rows/"):
+                body, content_type = page, "application/json"
+            elif self.path.startswith("/api/database/fields/"):
+                body, content_type = fields, "application/json"
+            else:
+                body, content_type = image, "image/jpeg"
+            self.send_response(200)
+            self.send_header("Content-Type", content_type)
+            self.send_header("Content-Length", str(len(body)))
+            self.end_headers()
+            self.wfile.write(body)
+
+        def log_message(self, *args):
+            pass
+
+    server = ThreadingHTTPServer(("127.0.0.1", 0), Handler)
+    server.daemon_threads = True
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    return f"http://127.0.0.1:{server.server_address[1]}"
+
+
+def planner_session_requests(base_url, table_id, tables, pages, images, image_url):
+    """The (url, params) list of one planner session, in the order the app sends them."""
+    calls = []
+    for _ in range(tables):
+        calls.append((f"{base_url}/api/database/fields/table/{table_id}/", None))
+        for page in range(1, pages + 1):
+            calls.append((f"{base_url}/api/database/rows/table/{table_id}/", {"user_field_names": "true", "page": page, "size": 200}))
+    image_url = image_url or f"{base_url}/media/thumbnails/product.jpg"
+    calls.extend((image_url, None) for _ in range(images))
+    return calls
+
+
+def run(calls, base_url, token, get):
+    latencies = []
+    started = time.perf_counter()
+    for url, params in calls:
+        headers = {"Authorization": f"Token {token}"} if url.startswith(f"{base_url}/api/") else None
+        call_started = time.perf_counter()
+        response = get(url, params=params, headers=headers, timeout=(5, 60))
+        response.content # Read the whole body so the connection goes back to the pool
+        latencies.append(time.perf_counter() - call_started)
+        if response.status_code >= 400:
+            raise SystemExit(f"{url} returned {response.status_code}: {response.text[:200]}")
+    return time.perf_counter() - started, latencies
+
+
+def describe(label, total, latencies, connections):
+    ordered = sorted(latencies)
+    print(f"{label:<22} total {total:7.2f}s | mean {statistics.mean(latencies) * 1000:7.1f} ms "
+          f"| p95 {ordered[int(0.95 * (len(ordered) - 1))] * 1000:7.1f} ms | connections opened {connections}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--base-url", default=None, help="A Baserow server; defaults to the built-in local server.")
+    parser.add_argument("--token", default="local")
+    parser.add_argument("--table-id", type=int, default=1)
+    parser.add_argument("--tables", type=int, default=6, help="Tables loaded by the planner.")
+    parser.add_argument("--pages", type=int, default=10, help="Pages (of 200 rows) read per table.")
+    parser.add_argument("--images", type=int, default=40, help="Product images downloaded for the PDF.")
+    parser.add_argument("--image-url", default=None, help="An image URL; defaults to one on the Baserow host.")
+    parser.add_argument("--handshake-ms", type=int, default=40, help="Built-in server only: delay on every new connection.")
+    parser.add_argument("--rounds", type=int, default=3)
+    args = parser.parse_args()
+
+    base_url = args.base_url.rstrip('/') if args.base_url else _local_server(args.handshake_ms)
+    calls = planner_session_requests(base_url, args.table_id, args.tables, args.pages, args.images, args.image_url)
+    print(f"Planner session against {base_url}: {len(calls)} requests "
+          f"({args.tables} tables x {args.pages} pages, {args.images} images), {args.rounds} rounds.\n")
+
+    per_call_totals, pooled_totals = [], []
+    for round_number in range(1, args.rounds + 1):
+        total, latencies = run(calls, base_url, args.token, requests.get)
+        per_call_totals.append(total)
+        describe(f"[{round_number}] requests.get", total, latencies, len(calls))
+
+        close_http_sessions() # Every round starts cold, like a new Streamlit process
+        total, latencies = run(calls, base_url, args.token, lambda url, **kwargs: get_http_session(url).get(url, **kwargs))
+        pooled_totals.append(total)
+        opened = sum(host["connections_opened"] for host in session_stats().values())
+        describe(f"[{round_number}] pooled session", total, latencies, opened)
+
+    saved = statistics.mean(per_call_totals) - statistics.mean(pooled_totals)
+    print(f"\nPooled sessions saved {saved:.2f}s per planner session "
+          f"({saved / len(calls) * 1000:.1f} ms of connection setup per request).")
+
+
+if __name__ == "__main__":
+    main()
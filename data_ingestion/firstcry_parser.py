@@ -1,7 +1,7 @@
 # RMS/data_ingestion/firstcry_parser.py
 import pandas as pd
 from datetime import datetime
-from .utils import clean_numeric_value, clean_integer_value
+from .utils import clean_numeric_value, clean_integer_value, map_report_skus
 import logging
 import os
 
@@ -14,13 +14,6 @@ class FirstCrySalesParser:
         self.sku_mapper = sku_mapper
         self.account_slug = account_config.get('slug', 'unknown_firstcry_account')
 
-    def _map_sku(self, platform_sku_in):
-        platform_sku_str = str(platform_sku_in).strip() if pd.notna(platform_sku_in) else ""
-        if not platform_sku_str:
-            return "", [None]
-        msku_result = self.sku_mapper.map_sku_to_msku(platform_sku_str)
-        return platform_sku_str, ([msku_result] if isinstance(msku_result, str) else msku_result) if msku_result is not None else [None]
-
     def _get_sku_column_name(self):
         return self.account_config.get('sku_column', 'VendorStyleCode')
 
@@ -68,43 +61,24 @@ class FirstCrySalesParser:
             logger.warning(f"FIRSTCRY_PARSER: No data in report for the selected date range.")
             return empty_df, unmapped_skus
 
-        temp_data_for_aggregation = []
-        for index, row in df_filtered.iterrows():
-            platform_sku_from_file = row[sku_col]
-            original_platform_sku, msku_list = self._map_sku(platform_sku_from_file)
-
-            if msku_list == [None]:
-                unmapped_skus.append({
-                    "Platform SKU": original_platform_sku,
-                    "Platform": self.platform_name,
-                    "Account": self.account_config.get('name'),
-                    "Source File": os.path.basename(file_path)
-                })
-                continue
-
-            sale_date_dt = row[date_col]
-            quantity_sold = sum(clean_integer_value(row.get(qc, 0)) for qc in qty_cols)
-            net_revenue = clean_numeric_value(row.get(revenue_col, 0))
-            order_id = row.get(order_id_col)
-
-            for msku_item in msku_list:
-                temp_data_for_aggregation.append({
-                    'Sale Date': sale_date_dt.date(),
-                    'MSKU': msku_item,
-                    'Platform': self.platform_name,
-                    'Account Name': self.account_config.get('name', self.account_slug),
-                    'Platform SKU': original_platform_sku,
-                    'Order ID': order_id,
-                    'Quantity Sold': quantity_sold,
-                    'Net Revenue': net_revenue,
-                    'Report Source File': os.path.basename(file_path)
-                })
-
-        if not temp_data_for_aggregation:
+        # Each distinct SKU is mapped once; combo sales are repeated for each component MSKU.
+        mapped_rows, unmapped_skus = map_report_skus(self.sku_mapper, df_filtered, sku_col, self.platform_name,
+                                                     self.account_config.get('name'), os.path.basename(file_path))
+        if mapped_rows.empty:
             logger.warning(f"FIRSTCRY_PARSER: No records to aggregate after processing rows in {file_path}")
             return empty_df, unmapped_skus
 
-        agg_df = pd.DataFrame(temp_data_for_aggregation)
+        agg_df = pd.DataFrame({
+            'Sale Date': mapped_rows[date_col].dt.date,
+            'MSKU': mapped_rows['MSKU'],
+            'Platform': self.platform_name,
+            'Account Name': self.account_config.get('name', self.account_slug),
+            'Platform SKU': mapped_rows['Platform SKU'],
+            'Order ID': mapped_rows[order_id_col].to_numpy(),
+            'Quantity Sold': sum(mapped_rows[qc].map(clean_integer_value) for qc in qty_cols),
+            'Net Revenue': mapped_rows[revenue_col].map(clean_numeric_value),
+            'Report Source File': os.path.basename(file_path),
+        })
         agg_df['MSKU_agg'] = agg_df['MSKU'].fillna('__UNMAPPED__')
 
         agg_functions = {
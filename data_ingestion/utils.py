@@ -36,4 +36,31 @@ def clean_integer_value(value):
     try:
         return int(s_value) if s_value else 0
     except ValueError:
-        return 0
\ No newline at end of file
+        return 0
+
+def map_report_skus(sku_mapper, df, sku_col, platform_name, account_name, source_file):
+    """
+    Maps the SKU column of a filtered report with SKUMapper.map_series (each distinct SKU once).
+
+    Returns (mapped_rows, unmapped_skus):
+    - mapped_rows: the mapped rows of `df`, repeated once per MSKU (a combo sale counts for each
+      component), with the stripped 'Platform SKU' and its 'MSKU'; new RangeIndex.
+    - unmapped_skus: one record per report row whose SKU could not be mapped (or is empty), in the
+      shape the parsers return them.
+    """
+    df = df.reset_index(drop=True)
+    platform_skus = df[sku_col].astype(object).where(df[sku_col].notna(), '').astype(str).str.strip()
+    mapped, _ = sku_mapper.map_series(platform_skus)
+
+    unmapped_rows = platform_skus[~platform_skus.index.isin(mapped['row'])]
+    unmapped_skus = [{
+        "Platform SKU": sku,
+        "Platform": platform_name,
+        "Account": account_name,
+        "Source File": source_file,
+    } for sku in unmapped_rows]
+
+    mapped_rows = df.loc[mapped['row']].reset_index(drop=True)
+    mapped_rows['Platform SKU'] = platform_skus.loc[mapped['row']].to_numpy()
+    mapped_rows['MSKU'] = mapped['MSKU'].to_numpy()
+    return mapped_rows, unmapped_skus
@@ -0,0 +1,98 @@
+# RMS/data_processing/async_baserow_fetcher.py
+import asyncio
+import logging
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+from utils.config_loader import APP_CONFIG
+from utils.http_session import get_http_session
+from data_processing.baserow_fetcher import BaserowFetcher
+
+logger = logging.getLogger(__name__)
+
+
+class AsyncBaserowFetcher(BaserowFetcher):
+    """
+    A BaserowFetcher that can load several tables at the same time.
+
+    Each table load runs the normal (synchronous) fetch method in a worker thread driven by
+    asyncio, so every table still gets parallel pagination, delta sync and field decoding.
+    All loads share one pooled session, sized for `max_concurrent_table_loads` tables times
+    `max_concurrent_page_requests` pages.
+
+    Example:
+        frames = fetcher.load_many({
+            'sales': ('get_table_data_as_dataframe', sales_table_id),
+            'inventory': ('get_inventory_data', inventory_table_id),
+            'pos': (lambda table_id: get_all_pos(fetcher, table_id), po_table_id),
+        })
+    """
+    def __init__(self, api_token, base_url="http://129.159.18.115:49161"):
+        super().__init__(api_token, base_url=base_url)
+        self._configure_table_concurrency()
+
+    @classmethod
+    def from_fetcher(cls, fetcher):
+        """
+        Returns an AsyncBaserowFetcher that shares `fetcher`'s session, field metadata and
+        delta-sync settings, so callers holding a plain BaserowFetcher can use load_many.
+        """
+        if isinstance(fetcher, cls):
+            return fetcher
+        async_fetcher = cls.__new__(cls)
+        async_fetcher.__dict__.update(fetcher.__dict__)
+        async_fetcher._configure_table_concurrency()
+        return async_fetcher
+
+    def _configure_table_concurrency(self):
+        self.max_concurrent_tables = max(1, int(APP_CONFIG.get('baserow', {}).get('max_concurrent_table_loads', 6)))
+        # Every table load may have max_concurrent_pages requests in flight; grow the pool so none of them
+        # has to open (and then throw away) a connection outside it.
+        get_http_session(self.base_url, pool_maxsize=max(self.max_concurrent_tables * self.max_concurrent_pages, 10))
+
+    def _resolve_fetch(self, fetch):
+        """`fetch` is either the name of a fetcher method or any callable taking a table id."""
+        if callable(fetch):
+            return fetch
+        method = getattr(self, fetch, None)
+        if method is None or not callable(method):
+            raise ValueError(f"AsyncBaserowFetcher has no fetch method named '{fetch}'.")
+        return method
+
+    async def fetch_async(self, fetch, table_id, semaphore=None):
+        """Runs one table load in a worker thread and returns its result."""
+        fetch_function = self._resolve_fetch(fetch)
+        semaphore = semaphore or asyncio.Semaphore(self.max_concurrent_tables)
+        async with semaphore:
+            started = time.perf_counter()
+            result = await asyncio.to_thread(fetch_function, table_id)
+            logger.debug(f"ASYNC_FETCHER: Table {table_id} loaded in {time.perf_counter() - started:.2f}s.")
+            return result
+
+    async def load_many_async(self, jobs, return_exceptions=False):
+        """
+        Loads several tables concurrently. `jobs` maps a name to `(fetch, table_id)`; the result
+        maps the same names to what each fetch returned. With `return_exceptions=True` a failed
+        load puts its exception in the result instead of raising.
+        """
+        semaphore = asyncio.Semaphore(self.max_concurrent_tables)
+        names = list(jobs.keys())
+        started = time.perf_counter()
+        results = await asyncio.gather(
+            *(self.fetch_async(fetch, table_id, semaphore) for fetch, table_id in jobs.values()),
+            return_exceptions=return_exceptions,
+        )
+        logger.info(f"ASYNC_FETCHER: Loaded {len(names)} tables ({', '.join(names)}) in {time.perf_counter() - started:.2f}s.")
+        return dict(zip(names, results))
+
+    def load_many(self, jobs, return_exceptions=False):
+        """Synchronous entry point for load_many_async, usable from Streamlit pages and scripts."""
+        if not jobs:
+            return {}
+        try:
+            asyncio.get_running_loop()
+        except RuntimeError:
+            return asyncio.run(self.load_many_async(jobs, return_exceptions=return_exceptions))
+        # Already inside an event loop (e.g. a notebook): run ours on a separate thread.
+        with ThreadPoolExecutor(max_workers=1) as executor:
+            return executor.submit(asyncio.run, self.load_many_async(jobs, return_exceptions=return_exceptions)).result()
@@ -1,15 +1,126 @@
 # RMS/data_processing/baserow_fetcher.py
-from datetime import datetime
+from datetime import date, datetime, timezone
+from urllib.parse import urlencode
 import requests
 import pandas as pd
 import logging
 import json # Make sure json is imported
 import os
+import io
+import csv
+import math
+import time
+import hashlib
+import threading
+from collections import deque
+from contextlib import contextmanager
+from concurrent.futures import ThreadPoolExecutor
 from utils.config_loader import APP_CONFIG
+from data_processing.baserow_query import BaserowQuery
+from data_processing.baserow_http import LatencyTracker, get_baserow_http
 
 logger = logging.getLogger(__name__)
 
+PAGE_SIZE_BYTES = os.sysconf('SC_PAGE_SIZE') if hasattr(os, 'sysconf') else 4096
+
+
+def current_rss_mb():
+    """Current resident set size of this process in MB, from /proc (Linux), or None where it can't be read."""
+    try:
+        with open('/proc/self/statm', 'r') as f:
+            return int(f.read().split()[1]) * PAGE_SIZE_BYTES / (1024 * 1024)
+    except (OSError, ValueError, IndexError):
+        return None
+
+
+class RssSampler:
+    """
+    Samples this process's RSS on a background thread while a load runs (`with RssSampler() as rss:`),
+    so each load reports its own peak: `start_mb`, `peak_mb` and `growth_mb` (peak above the start).
+    Loads running at the same time still share one process, so their windows can overlap.
+    All three stay None where RSS can't be read.
+    """
+    def __init__(self, interval_seconds=0.05):
+        self.interval_seconds = interval_seconds
+        self.start_mb = self.peak_mb = None
+        self._stop = threading.Event()
+        self._thread = None
+
+    @property
+    def growth_mb(self):
+        return self.peak_mb - self.start_mb if self.start_mb is not None else None
+
+    def _sample(self):
+        rss = current_rss_mb()
+        if rss is not None and (self.peak_mb is None or rss > self.peak_mb):
+            self.peak_mb = rss
+
+    def _run(self):
+        while not self._stop.wait(self.interval_seconds):
+            self._sample()
+
+    def __enter__(self):
+        self.start_mb = self.peak_mb = current_rss_mb()
+        if self.start_mb is not None:
+            self._thread = threading.Thread(target=self._run, name="rss-sampler", daemon=True)
+            self._thread.start()
+        return self
+
+    def __exit__(self, *exc_info):
+        if self._thread is not None:
+            self._stop.set()
+            self._thread.join()
+            self._sample()
+        return False
+
+class BatchWriteReport:
+    """
+    Outcome of a bulk write. Truthy only when every batch succeeded, so callers that treat
+    the result as a success flag keep working. `failed_records` holds the records of the failed
+    batches in their original order, ready to be passed back to batch_create_rows.
+    """
+    def __init__(self, total_records=0):
+        self.total_records = total_records
+        self.created_ids = []
+        self.deleted_ids = [] # Rows removed first when the write replaced existing rows (replace_sales_partition)
+        self.updated_ids = [] # Rows changed in place (batch_update_rows, upsert_sales_records)
+        self.unchanged_count = 0 # Upsert only: incoming rows identical to what is stored
+        self.failed_batches = [] # [{'start': index of first record, 'records': [...], 'status': code or None, 'error': str}]
+        self.failed_delete_ids = [] # Upsert only: stored rows that should have been deleted but weren't
+
+    @property
+    def created_count(self):
+        return len(self.created_ids)
+
+    @property
+    def failed_records(self):
+        return [record for batch in self.failed_batches for record in batch['records']]
+
+    def __bool__(self):
+        return not self.failed_batches
+
+    def summary(self):
+        parts = [f"Created {self.created_count}"]
+        if self.updated_ids:
+            parts.append(f"updated {len(self.updated_ids)}")
+        if self.deleted_ids:
+            parts.append(f"deleted {len(self.deleted_ids)}")
+        if self.unchanged_count:
+            parts.append(f"left {self.unchanged_count} unchanged")
+        text = f"{', '.join(parts)} of {self.total_records} rows."
+        if self.failed_batches:
+            text = text[:-1] + f"; {len(self.failed_batches)} batch(es) with {len(self.failed_records)} rows failed."
+        if self.failed_delete_ids:
+            text = text[:-1] + f"; {len(self.failed_delete_ids)} rows could not be deleted."
+        return text
+
+
 class BaserowFetcher:
+    PAGE_SIZE = 200 # Baserow's maximum page size for list rows
+    BATCH_SIZE = 200 # Baserow's maximum number of items per batch create/update request
+    SALES_KEY_COLUMNS = ['Sale Date', 'MSKU', 'Platform', 'Account Name'] # Natural key of a processed sales row
+    UPSERT_IGNORED_COLUMNS = ['Upload Batch ID', 'Data Processed Timestamp'] # Differ on every upload, so never compared
+
     def __init__(self, api_token, base_url="http://129.159.18.115:49161"):
         self.base_url = base_url.rstrip('/')
         self.headers = {
@@ -20,29 +131,545 @@ class BaserowFetcher:
             logger.error("Baserow API token is not provided.")
             raise ValueError("Baserow API token is required.")
 
-    def _get_all_rows(self, table_id):
+        # Number of pages fetched at the same time by _get_all_rows. 1 disables parallel pagination.
+        self.max_concurrent_pages = max(1, int(APP_CONFIG.get('baserow', {}).get('max_concurrent_page_requests', 4)))
+
+        # All traffic to this server goes through one shared HTTP layer: pooled keep-alive session,
+        # timeouts, adaptive rate limiting, retries, hedged page reads and latency metrics.
+        self.http = get_baserow_http(self.base_url)
+        self.session = self.http.session
+
+        # Delta sync: tables listed under baserow.delta_sync.tables (keyed by their table-id config key)
+        # are served from a local snapshot that only pulls new, changed and deleted rows.
+        project_root = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+        cache_dir_name = APP_CONFIG.get('cache', {}).get('directory', '.rms_cache')
+        self.cache_dir = cache_dir_name if os.path.isabs(cache_dir_name) else os.path.join(project_root, cache_dir_name)
+        baserow_config = APP_CONFIG.get('baserow', {})
+        delta_config = baserow_config.get('delta_sync', {}) or {}
+        self._delta_tables = {}
+        self._rejected_modified_fields = set() # (table id, field) watermarks already warned about
+        # Tables without a modified-field watermark are rebuilt from a full fetch this often, to pick up edits.
+        self.delta_full_resync_hours = float(delta_config.get('full_resync_hours', 24))
+        self._thread_state = threading.local() # `full_refresh` flag, see full_refresh()
+        self._field_metadata = {} # table_id -> Baserow field metadata, see get_table_fields
+        self.table_load_stats = {} # table_id -> rows/columns/seconds/RSS peak and growth of the last full-table load
+        if delta_config.get('enabled', False):
+            for table_key, options in (delta_config.get('tables') or {}).items():
+                table_id = baserow_config.get(table_key)
+                if table_id:
+                    self._delta_tables[str(table_id)] = options or {}
+
+        # Bulk writes: how many batches are sent at once and how transient errors are retried.
+        batch_write_config = baserow_config.get('batch_write', {}) or {}
+        self.max_concurrent_writes = max(1, int(batch_write_config.get('max_concurrent_batches', 4)))
+        self.write_max_retries = max(0, int(batch_write_config.get('max_retries', 4)))
+        self.write_backoff_seconds = float(batch_write_config.get('backoff_seconds', 1.0))
+
+        # Bulk path for full-table loads through Baserow export jobs, see fetch_table_via_export.
+        self.bulk_export = baserow_config.get('bulk_export', {}) or {}
+        self._export_unavailable = False # Set once the server refuses export jobs for our token
+
+    def _fetch_rows_page(self, table_id, page, size, params=None, hedge=False, page_latency=None):
+        """
+        Fetches a single page of rows and returns the decoded JSON response. With `hedge`, a
+        straggling request is duplicated once it is slower than the recent p95 page latency.
+        The time the page took (retries and hedging included) is recorded in `page_latency`, if given.
+        """
+        url = f"{self.base_url}/api/database/rows/table/{table_id}/?user_field_names=true&page={page}&size={size}"
+        if params:
+            url += f"&{urlencode(params)}"
+        response = None
+        started = time.perf_counter()
+        try:
+            send = self.http.hedged_request if hedge else self.http.request
+            response = send("GET", url, category="page", headers=self.headers)
+            if page_latency is not None:
+                page_latency.record("page", time.perf_counter() - started)
+            response.raise_for_status()
+            return response.json()
+        except requests.exceptions.RequestException as e:
+            logger.error(f"Error fetching data from Baserow table {table_id}, page {page}: {e}")
+            raise
+        except json.JSONDecodeError as e:
+            logger.error(f"Error decoding JSON response from Baserow table {table_id}, page {page}: {e}. Response text: {response.text[:500]}")
+            raise
+
+    def _iter_row_pages(self, table_id, params=None, start_page=1, page_latency=None):
+        """
+        Yields the rows of a table page by page (optionally filtered by extra query `params`),
+        starting at `start_page`. The first page tells us the total row count, after which
+        the remaining pages are fetched concurrently (bounded by
+        `baserow.max_concurrent_page_requests`) and yielded in page order.
+        Page times are recorded in the LatencyTracker `page_latency`, if given.
+        """
+        size = self.PAGE_SIZE
+        first_page = self._fetch_rows_page(table_id, start_page, size, params, page_latency=page_latency)
+        yield first_page.get("results", [])
+        if first_page.get("next") is None or not first_page.get("results"):
+            return
+
+        total_count = first_page.get("count")
+        last_page = first_page
+        page = start_page
+        total_pages = math.ceil(total_count / size) if total_count else start_page
+        if total_pages > start_page and self.max_concurrent_pages > 1:
+            remaining_pages = range(start_page + 1, total_pages + 1)
+            workers = min(self.max_concurrent_pages, len(remaining_pages))
+            logger.debug(f"Table {table_id}: fetching {len(remaining_pages)} remaining pages with {workers} workers.")
+            with ThreadPoolExecutor(max_workers=workers) as executor:
+                # At most two pages per worker are in flight, so fetched pages don't pile up in memory
+                # while the caller is still consuming earlier ones. Pages are yielded in order.
+                page_iter = iter(remaining_pages)
+                pending = deque()
+                for p in page_iter:
+                    pending.append((p, executor.submit(self._fetch_rows_page, table_id, p, size, params, True, page_latency)))
+                    if len(pending) >= workers * 2:
+                        break
+                while pending:
+                    page, future = pending.popleft()
+                    page_data = future.result()
+                    next_page = next(page_iter, None)
+                    if next_page is not None:
+                        pending.append((next_page, executor.submit(self._fetch_rows_page, table_id, next_page, size, params, True, page_latency)))
+                    yield page_data.get("results", [])
+                    last_page = page_data
+
+        # Sequential path (concurrency disabled), or rows were added after the count was read.
+        while last_page.get("next") is not None and last_page.get("results"):
+            page += 1
+            last_page = self._fetch_rows_page(table_id, page, size, params, page_latency=page_latency)
+            yield last_page.get("results", [])
+
+    def _get_all_rows(self, table_id, params=None, start_page=1):
         all_rows = []
-        page = 1
-        size = 200
-        while True:
-            url = f"{self.base_url}/api/database/rows/table/{table_id}/?user_field_names=true&page={page}&size={size}"
-            try:
-                response = requests.get(url, headers=self.headers)
-                response.raise_for_status()
-                data = response.json()
-                results = data.get("results", [])
-                all_rows.extend(results)
-                if data.get("next") is None or not results:
-                    break
-                page += 1
-            except requests.exceptions.RequestException as e:
-                logger.error(f"Error fetching data from Baserow table {table_id}, page {page}: {e}")
-                raise
-            except json.JSONDecodeError as e:
-                logger.error(f"Error decoding JSON response from Baserow table {table_id}, page {page}: {e}. Response text: {response.text[:500]}")
-                raise
+        for page_rows in self._iter_row_pages(table_id, params=params, start_page=start_page):
+            all_rows.extend(page_rows)
         return all_rows
 
+    def query(self, table_id):
+        """Starts a filtered/projected row query on a table. See data_processing.baserow_query.BaserowQuery."""
+        return BaserowQuery(self, table_id)
+
+    def get_table_fields(self, table_id):
+        """
+        Returns the field metadata of a table (list of dicts with 'name', 'type', ...) from
+        Baserow's fields endpoint. Cached per fetcher, so each table is only asked once.
+        Returns None if the metadata cannot be fetched.
+        """
+        table_key = str(table_id)
+        if table_key in self._field_metadata:
+            return self._field_metadata[table_key]
+
+        url = f"{self.base_url}/api/database/fields/table/{table_id}/"
+        try:
+            response = self.http.request("GET", url, category="fields", headers=self.headers)
+            response.raise_for_status()
+            fields = response.json()
+        except (requests.exceptions.RequestException, json.JSONDecodeError) as e:
+            logger.warning(f"Could not fetch field metadata for table {table_id}: {e}. Falling back to value-sniffing decode.")
+            return None
+
+        self._field_metadata[table_key] = fields
+        logger.debug(f"Cached field metadata for table {table_id}: {[(f.get('name'), f.get('type')) for f in fields]}")
+        return fields
+
+    @staticmethod
+    def _decode_select_values(values):
+        """single_select cells: {'id': .., 'value': .., 'color': ..} or None -> the option value."""
+        return [v.get('value') if isinstance(v, dict) else v for v in values]
+
+    @staticmethod
+    def _decode_list_values(values):
+        """multiple_select / link_row / lookup cells: [{'id': .., 'value': ..}, ...] -> [value, ...]."""
+        return [[item.get('value') for item in v if isinstance(item, dict)] if isinstance(v, list) else v for v in values]
+
+    def _column_decoders(self, table_id):
+        """Maps column name -> decoder for the columns that need unwrapping, or None if the schema is unknown."""
+        fields = self.get_table_fields(table_id) if table_id is not None else None
+        if fields is None:
+            return None
+        decoders = {}
+        for field in fields:
+            field_type = field.get('type')
+            if field_type == 'formula':
+                # Formula fields carry the shape of their result type.
+                field_type = {'single_select': 'single_select', 'array': 'lookup'}.get(field.get('formula_type'))
+            if field_type == 'single_select':
+                decoders[field.get('name')] = self._decode_select_values
+            elif field_type in ('multiple_select', 'link_row', 'lookup'):
+                decoders[field.get('name')] = self._decode_list_values
+        return decoders
+
+    def _rows_to_dataframe(self, rows, table_id=None):
+        """
+        Builds a DataFrame from raw Baserow rows, unwrapping select/link `{'value': ...}` cells.
+        When the table's field metadata is available only the select/link columns are decoded;
+        scalar columns are left untouched.
+        """
+        return self._pages_to_dataframe([rows], table_id)
+
+    def _pages_to_dataframe(self, pages, table_id=None):
+        """
+        Builds a DataFrame from an iterable of row pages (see _iter_row_pages) by appending each
+        page straight into per-column lists, so only the page being read is held as row dicts.
+        Columns that first show up in a later page are back-filled with None.
+        """
+        columns = {}
+        row_count = 0
+        for page_rows in pages:
+            if not page_rows:
+                continue
+            for key in dict.fromkeys(key for row in page_rows for key in row):
+                if key not in columns:
+                    columns[key] = [None] * row_count
+            for key, buffer in columns.items():
+                buffer.extend([row.get(key) for row in page_rows])
+            row_count += len(page_rows)
+
+        if not row_count:
+            return pd.DataFrame()
+
+        decoders = self._column_decoders(table_id)
+        if decoders is not None:
+            for col, decode in decoders.items():
+                if col in columns:
+                    columns[col] = decode(columns[col])
+            return pd.DataFrame(columns)
+        return self._sniff_wrapped_values(pd.DataFrame(columns))
+
+    @staticmethod
+    def _sniff_wrapped_values(df):
+        """Schema unknown: checks every column for wrapped select/link values and unwraps them."""
+        for col in df.columns:
+            if df[col].apply(lambda x: isinstance(x, dict) and 'value' in x).any():
+                df[col] = df[col].apply(lambda x: x['value'] if isinstance(x, dict) and 'value' in x else x)
+            elif df[col].apply(lambda x: isinstance(x, list) and x and isinstance(x[0], dict) and 'value' in x[0]).any():
+                df[col] = df[col].apply(lambda x: [item['value'] for item in x if isinstance(item, dict) and 'value' in item] if isinstance(x, list) else x)
+        return df
+
+    def _stream_table_to_dataframe(self, table_id, params=None, start_page=1):
+        """
+        Streams a table (optionally filtered by `params`) page by page into a decoded DataFrame
+        and logs rows, time, the latency of this load's pages and the RSS peak sampled during it.
+        Only full-table loads are kept in table_load_stats; a filtered query would overwrite them.
+        """
+        load_latency = LatencyTracker(window=None) # Just this load's pages; the client's tracker spans every request
+        started = time.perf_counter()
+        with RssSampler() as rss:
+            pages = self._iter_row_pages(table_id, params=params, start_page=start_page, page_latency=load_latency)
+            df = self._pages_to_dataframe(pages, table_id)
+        elapsed = time.perf_counter() - started
+
+        page_latency = load_latency.summary().get("page", {})
+        stats = {"rows": len(df), "columns": len(df.columns), "seconds": round(elapsed, 3),
+                 "peak_rss_mb": round(rss.peak_mb, 1) if rss.peak_mb is not None else None,
+                 "rss_growth_mb": round(rss.growth_mb, 1) if rss.growth_mb is not None else None,
+                 "pages": page_latency.get("count", 0),
+                 "page_p50_seconds": page_latency.get("p50"), "page_p95_seconds": page_latency.get("p95")}
+        if not params and start_page == 1:
+            self.table_load_stats[str(table_id)] = stats
+        latency_note = f" Page latency p50 {page_latency['p50']:.3f}s / p95 {page_latency['p95']:.3f}s." if page_latency else ""
+        if rss.peak_mb is not None:
+            logger.info(f"Table {table_id}: loaded {stats['rows']} rows x {stats['columns']} columns in {elapsed:.2f}s. "
+                        f"RSS peaked at {rss.peak_mb:.0f} MB during the load (+{rss.growth_mb:.0f} MB over its start).{latency_note}")
+        else:
+            logger.info(f"Table {table_id}: loaded {stats['rows']} rows x {stats['columns']} columns in {elapsed:.2f}s.{latency_note}")
+        return df
+
+    # --- Delta sync: keep a local snapshot of a table and only pull what changed ---
+
+    def _delta_cache_paths(self, table_id):
+        delta_dir = os.path.join(self.cache_dir, "delta")
+        return (os.path.join(delta_dir, f"table_{table_id}.parquet"),
+                os.path.join(delta_dir, f"table_{table_id}_meta.json"))
+
+    def _load_delta_state(self, table_id):
+        df_path, meta_path = self._delta_cache_paths(table_id)
+        if not (os.path.exists(df_path) and os.path.exists(meta_path)):
+            return None, {}
+        try:
+            with open(meta_path, 'r') as f:
+                meta = json.load(f)
+            return pd.read_parquet(df_path), meta
+        except Exception as e:
+            logger.warning(f"DELTA_SYNC: Could not read local snapshot for table {table_id}: {e}. A full fetch will be done.")
+            return None, {}
+
+    def _save_delta_state(self, table_id, df, synced_at, modified_field, last_full_sync_at=None):
+        df_path, meta_path = self._delta_cache_paths(table_id)
+        os.makedirs(os.path.dirname(df_path), exist_ok=True)
+        try:
+            df.to_parquet(df_path, index=False)
+            meta = {
+                "table_id": str(table_id),
+                "max_id": int(df['id'].max()) if 'id' in df.columns and not df.empty else 0,
+                "row_count": len(df),
+                "last_synced_at": synced_at.isoformat(),
+                "modified_field": modified_field,
+                "last_full_sync_at": last_full_sync_at.isoformat() if isinstance(last_full_sync_at, datetime) else last_full_sync_at,
+            }
+            with open(meta_path, 'w') as f:
+                json.dump(meta, f)
+        except Exception as e:
+            logger.warning(f"DELTA_SYNC: Could not save local snapshot for table {table_id}: {e}. The next sync will do a full fetch.")
+
+    def _full_delta_snapshot(self, table_id, synced_at, modified_field):
+        df = self._fetch_full_table(table_id)
+        self._save_delta_state(table_id, df, synced_at, modified_field, last_full_sync_at=synced_at)
+        logger.info(f"DELTA_SYNC: Stored full snapshot of table {table_id} ({len(df)} rows).")
+        return df
+
+    def _replace_rows_in_delta_snapshot(self, table_id, stale_ids, fresh_df):
+        """
+        After this process wrote to a delta-synced table, swaps the affected rows of the local
+        snapshot (`stale_ids`, plus any id in `fresh_df`) for the freshly read `fresh_df`.
+        The sync watermark is left alone.
+        """
+        cached_df, meta = self._load_delta_state(table_id)
+        if cached_df is None or 'id' not in cached_df.columns:
+            return
+        drop_ids = set(stale_ids) | (set(fresh_df['id']) if 'id' in fresh_df.columns else set())
+        frames = [cached_df[~cached_df['id'].isin(drop_ids)]]
+        if not fresh_df.empty:
+            frames.append(fresh_df)
+        # Baserow lists rows by id unless they were moved by hand; the next sync restores the exact order.
+        merged_df = pd.concat(frames, ignore_index=True).sort_values('id', kind='stable').reset_index(drop=True)
+        synced_at = datetime.fromisoformat(meta['last_synced_at']) if meta.get('last_synced_at') else datetime.now(timezone.utc)
+        self._save_delta_state(table_id, merged_df, synced_at, meta.get('modified_field'), meta.get('last_full_sync_at'))
+        logger.info(f"DELTA_SYNC: Patched local snapshot of table {table_id} with {len(fresh_df)} rewritten rows.")
+
+    def _checked_modified_field(self, table_id, modified_field):
+        """
+        `modified_field` if the table has a date-valued field of that name, else None (with a
+        warning, once per table) so the caller can fall back to a full fetch instead of sending a
+        filter that fails. Kept as is when the field metadata can't be read.
+        """
+        if not modified_field:
+            return None
+        fields = self.get_table_fields(table_id)
+        if fields is None:
+            return modified_field
+        field_type = next((field.get('type') for field in fields if field.get('name') == modified_field), None)
+        if field_type in ('last_modified', 'date', 'created_on'):
+            return modified_field
+        if (str(table_id), modified_field) not in self._rejected_modified_fields:
+            self._rejected_modified_fields.add((str(table_id), modified_field))
+            reason = "does not exist" if field_type is None else f"is a '{field_type}' field, not a date"
+            logger.warning(f"DELTA_SYNC: Field '{modified_field}' of table {table_id} {reason}, so it can't show which "
+                           f"rows changed. Every sync of this table is a full fetch until "
+                           f"`baserow.delta_sync.tables.<table>.modified_field` in settings.yaml is fixed.")
+        return None
+
+    @contextmanager
+    def full_refresh(self):
+        """
+        Within this block (on the calling thread), delta-synced tables are rebuilt from a full
+        fetch instead of synced, so a forced refresh also replaces the local snapshot.
+        """
+        previous = getattr(self._thread_state, 'full_refresh', False)
+        self._thread_state.full_refresh = True
+        try:
+            yield
+        finally:
+            self._thread_state.full_refresh = previous
+
+    def sync_table_delta(self, table_id, modified_field=None, full=False):
+        """
+        Returns the full (decoded) contents of a table, refreshing a local parquet snapshot
+        with only what changed since the last sync:
+        - new rows: ids not in the snapshot, fetched from the first page that contains one;
+        - changed rows: rows whose `modified_field` (a Baserow "last modified" field) is on or
+          after the previous sync date;
+        - deleted rows: reconciled with an id-only scan of the table.
+        A full fetch rebuilds the snapshot instead when there is no snapshot, the delta queries
+        fail, `full` is set (or the call runs inside full_refresh()), the configured modified field
+        is not a date field of the table, or the table has no modified field and its last full
+        fetch is older than `baserow.delta_sync.full_resync_hours` (edits are only seen then).
+        """
+        options = self._delta_tables.get(str(table_id), {})
+        configured_field = modified_field or options.get('modified_field')
+        modified_field = self._checked_modified_field(table_id, configured_field)
+        synced_at = datetime.now(timezone.utc)
+
+        if full or getattr(self._thread_state, 'full_refresh', False):
+            logger.info(f"DELTA_SYNC: Full refresh of table {table_id} requested.")
+            return self._full_delta_snapshot(table_id, synced_at, modified_field)
+        if configured_field and not modified_field:
+            return self._full_delta_snapshot(table_id, synced_at, modified_field)
+
+        cached_df, meta = self._load_delta_state(table_id)
+        if cached_df is None or 'id' not in cached_df.columns:
+            logger.info(f"DELTA_SYNC: No local snapshot for table {table_id}. Running a full fetch.")
+            return self._full_delta_snapshot(table_id, synced_at, modified_field)
+        if not modified_field:
+            resync_hours = float(options.get('full_resync_hours', self.delta_full_resync_hours))
+            last_full = meta.get('last_full_sync_at')
+            if not last_full or (synced_at - datetime.fromisoformat(last_full)).total_seconds() >= resync_hours * 3600:
+                logger.info(f"DELTA_SYNC: Table {table_id} has no modified field; its last full fetch is over "
+                            f"{resync_hours:g}h old, so edits are picked up with a full fetch.")
+                return self._full_delta_snapshot(table_id, synced_at, modified_field)
+
+        try:
+            # Cheap id-only scan: 'id' is not a field name, so `include` strips every field from the rows.
+            current_ids = [row['id'] for row in self.query(table_id).include('id').iter_rows()]
+            current_id_set = set(current_ids)
+            cached_ids = set(cached_df['id'])
+            deleted_ids = cached_ids - current_id_set
+            new_ids = current_id_set - cached_ids
+
+            refreshed_frames = []
+            if modified_field and meta.get('last_synced_at') and meta.get('modified_field') == modified_field:
+                since_date = meta['last_synced_at'][:10]
+                refreshed_frames.append(self.query(table_id).date_range(modified_field, start=since_date).to_dataframe())
+            elif modified_field:
+                logger.info(f"DELTA_SYNC: Table {table_id} has no '{modified_field}' watermark yet. Running a full fetch.")
+                return self._full_delta_snapshot(table_id, synced_at, modified_field)
+
+            if new_ids:
+                first_new_position = next(i for i, rid in enumerate(current_ids) if rid in new_ids)
+                start_page = first_new_position // self.PAGE_SIZE + 1
+                new_pages = ([row for row in page_rows if row['id'] in new_ids] for page_rows in self.query(table_id).iter_pages(start_page=start_page))
+                refreshed_frames.append(self._pages_to_dataframe(new_pages, table_id))
+        except (requests.exceptions.RequestException, json.JSONDecodeError) as e:
+            logger.warning(f"DELTA_SYNC: Delta queries failed for table {table_id}: {e}. Falling back to a full fetch.")
+            return self._full_delta_snapshot(table_id, synced_at, modified_field)
+
+        refreshed_frames = [f for f in refreshed_frames if not f.empty]
+        refreshed_df = pd.concat(refreshed_frames, ignore_index=True).drop_duplicates(subset=['id'], keep='first') if refreshed_frames else pd.DataFrame()
+        refreshed_ids = set(refreshed_df['id']) if not refreshed_df.empty else set()
+
+        kept_df = cached_df[~cached_df['id'].isin(deleted_ids | refreshed_ids)]
+        merged_df = pd.concat([kept_df, refreshed_df], ignore_index=True) if not refreshed_df.empty else kept_df
+        # Restore Baserow's row order using the positions from the id scan.
+        positions = {rid: i for i, rid in enumerate(current_ids)}
+        merged_df = merged_df[merged_df['id'].isin(current_id_set)]
+        merged_df = merged_df.iloc[merged_df['id'].map(positions).to_numpy().argsort(kind='stable')].reset_index(drop=True)
+
+        self._save_delta_state(table_id, merged_df, synced_at, modified_field, meta.get('last_full_sync_at'))
+        logger.info(f"DELTA_SYNC: Table {table_id} synced. New: {len(new_ids)}, changed/refetched: {len(refreshed_ids - new_ids)}, deleted: {len(deleted_ids)}. Rows: {len(merged_df)}.")
+        return merged_df
+
+    def _get_table_frame(self, table_id):
+        """Returns the decoded rows of a table, via delta sync when it is enabled for that table."""
+        if str(table_id) in self._delta_tables:
+            return self.sync_table_delta(table_id)
+        return self._fetch_full_table(table_id)
+
+    # --- Bulk path: pull a whole table through one Baserow export job instead of hundreds of pages ---
+
+    EXPORT_DATE_FORMATS = {'EU': '%d/%m/%Y', 'US': '%m/%d/%Y', 'ISO': '%Y-%m-%d'} # Baserow date_format -> strptime format
+
+    def _fetch_full_table(self, table_id):
+        """
+        Loads a whole, unfiltered table. When `baserow.bulk_export.enabled` is set and the table has
+        at least `min_rows` rows, an export job is tried first; pagination is the fallback.
+        """
+        if self.bulk_export.get('enabled', False) and not self._export_unavailable:
+            min_rows = int(self.bulk_export.get('min_rows', 5000))
+            try:
+                big_enough = min_rows <= 0 or self.query(table_id).count() >= min_rows
+            except (requests.exceptions.RequestException, json.JSONDecodeError):
+                big_enough = False # Let pagination surface the error as before
+            if big_enough:
+                df = self.fetch_table_via_export(table_id)
+                if df is not None:
+                    return df
+        return self._stream_table_to_dataframe(table_id)
+
+    def fetch_table_via_export(self, table_id):
+        """
+        Exports a table to CSV with a Baserow export job, waits for it to finish, downloads the
+        file and parses it into the same decoded DataFrame the paginated path returns.
+        Returns None when exports are not available (e.g. the server only allows them with a
+        JWT login), the job fails or times out, or the file can't be parsed.
+        """
+        poll_interval = float(self.bulk_export.get('poll_interval_seconds', 1.0))
+        timeout = float(self.bulk_export.get('timeout_seconds', 300))
+        started = time.perf_counter()
+        payload = {"exporter_type": "csv", "export_charset": "utf-8", "csv_include_header": True, "csv_column_separator": ","}
+        try:
+            response = self.http.request("POST", f"{self.base_url}/api/database/export/table/{table_id}/", category="export", headers=self.headers, json=payload)
+            if response.status_code in (401, 403, 404, 405):
+                self._export_unavailable = True
+                logger.info(f"BULK_EXPORT: Export jobs are not available (HTTP {response.status_code}). Using pagination from now on.")
+                return None
+            response.raise_for_status()
+            job = response.json()
+
+            deadline = time.monotonic() + timeout
+            while job.get('state') != 'finished':
+                if job.get('state') in ('failed', 'cancelled', 'expired'):
+                    logger.warning(f"BULK_EXPORT: Export of table {table_id} ended as '{job.get('state')}': {job.get('human_readable_error', '')}")
+                    return None
+                if time.monotonic() > deadline:
+                    logger.warning(f"BULK_EXPORT: Export of table {table_id} did not finish within {timeout:.0f}s.")
+                    return None
+                time.sleep(poll_interval)
+                job_response = self.http.request("GET", f"{self.base_url}/api/database/export/{job['id']}/", category="export", headers=self.headers)
+                job_response.raise_for_status()
+                job = job_response.json()
+
+            file_url = job.get('url')
+            if not file_url:
+                logger.warning(f"BULK_EXPORT: Finished export of table {table_id} has no file URL.")
+                return None
+            if file_url.startswith('/'):
+                file_url = f"{self.base_url}{file_url}"
+            # Export files are served as media (possibly pre-signed storage URLs), so no auth header is sent.
+            with RssSampler() as rss:
+                download = self.http.request("GET", file_url, category="export")
+                download.raise_for_status()
+                df = self._parse_export_csv(download.content, table_id)
+        except (requests.exceptions.RequestException, json.JSONDecodeError, ValueError, pd.errors.ParserError) as e:
+            logger.warning(f"BULK_EXPORT: Export of table {table_id} failed: {e}. Falling back to pagination.")
+            return None
+
+        elapsed = time.perf_counter() - started
+        self.table_load_stats[str(table_id)] = {"rows": len(df), "columns": len(df.columns), "seconds": round(elapsed, 3),
+                                                "peak_rss_mb": round(rss.peak_mb, 1) if rss.peak_mb is not None else None,
+                                                "rss_growth_mb": round(rss.growth_mb, 1) if rss.growth_mb is not None else None,
+                                                "source": "export"}
+        logger.info(f"BULK_EXPORT: Table {table_id}: {len(df)} rows x {len(df.columns)} columns in {elapsed:.2f}s through an export job.")
+        return df
+
+    @staticmethod
+    def _read_export_csv(content):
+        """
+        Reads an export file with every column as text. The C parser is used on purpose: the
+        pyarrow engine infers numbers before applying dtype=str, which turns '12.50' into '12.5'.
+        """
+        return pd.read_csv(io.BytesIO(content), dtype=str, keep_default_na=False)
+
+    def _parse_export_csv(self, content, table_id):
+        """
+        Turns an export CSV into the shape of the list-rows API after decoding: int ids, None for
+        empty cells, lists for multi-value fields, booleans, and ISO dates.
+        """
+        df = self._read_export_csv(content)
+        if df.empty:
+            return df
+        # Plain object columns with None for blanks, like the list-rows API gives.
+        df = df.astype(object).where(df != '', None)
+        if 'id' in df.columns:
+            df['id'] = pd.to_numeric(df['id'])
+
+        for field in self.get_table_fields(table_id) or []:
+            name, field_type = field.get('name'), field.get('type')
+            if name not in df.columns:
+                continue
+            if field_type == 'formula':
+                field_type = {'array': 'lookup', 'boolean': 'boolean', 'date': 'date'}.get(field.get('formula_type'), field_type)
+            if field_type in ('multiple_select', 'link_row', 'lookup'):
+                # Several values are written as one CSV-quoted, comma-separated cell.
+                df[name] = [[v.strip() for v in next(csv.reader([cell]))] if isinstance(cell, str) else [] for cell in df[name]]
+            elif field_type == 'boolean':
+                df[name] = df[name].map({'true': True, 'false': False}).fillna(False).astype(bool)
+            elif field_type == 'date' and not field.get('date_include_time'):
+                date_format = self.EXPORT_DATE_FORMATS.get(field.get('date_format'), '%Y-%m-%d')
+                parsed = pd.to_datetime(df[name], format=date_format, errors='coerce')
+                df[name] = parsed.dt.strftime('%Y-%m-%d').where(parsed.notna(), None)
+        return df.infer_objects() # Same column dtypes as a DataFrame built from API rows
+
     def get_table_data_as_dataframe(self, table_id, required_columns=None, column_mapping=None):
         """
         Fetches all data from a Baserow table and returns it as a Pandas DataFrame.
@@ -51,22 +678,13 @@ class BaserowFetcher:
         """
         logger.info(f"Fetching data for Baserow table ID: {table_id}")
         try:
-            rows = self._get_all_rows(table_id)
-            if not rows:
+            df = self._get_table_frame(table_id)
+            if df.empty:
                 logger.warning(f"No data found in Baserow table {table_id}.")
                 # If column_mapping is provided, use target names for empty df, else original required_columns
                 final_cols_for_empty_df = list(column_mapping.values()) if column_mapping else required_columns
                 return pd.DataFrame(columns=final_cols_for_empty_df) if final_cols_for_empty_df else pd.DataFrame()
 
-
-            df = pd.DataFrame(rows)
-
-            for col in df.columns:
-                if df[col].apply(lambda x: isinstance(x, dict) and 'value' in x).any():
-                    df[col] = df[col].apply(lambda x: x['value'] if isinstance(x, dict) and 'value' in x else x)
-                elif df[col].apply(lambda x: isinstance(x, list) and x and isinstance(x[0], dict) and 'value' in x[0]).any():
-                    df[col] = df[col].apply(lambda x: [item['value'] for item in x if isinstance(item, dict) and 'value' in item] if isinstance(x, list) else x)
-
             if required_columns:
                 missing_cols = [col for col in required_columns if col not in df.columns]
                 if missing_cols:
@@ -255,10 +873,10 @@ class BaserowFetcher:
             return {}
 
         try:
-            all_sales_records_df = self.get_table_data_as_dataframe(processed_sales_table_id)
-
-            all_sales_records_df['Sale Date'] = all_sales_records_df['Sale Date'].astype(str).str.strip()
-            all_sales_records_df['parsed_date'] = pd.to_datetime(all_sales_records_df['Sale Date'], errors='coerce')
+            # Only the three columns needed for the min/max are transferred.
+            all_sales_records_df = (self.query(processed_sales_table_id)
+                                    .include('Platform', 'Account Name', 'Sale Date')
+                                    .to_dataframe())
 
             if all_sales_records_df is None or all_sales_records_df.empty:
                 return {}
@@ -273,6 +891,7 @@ class BaserowFetcher:
             logger.debug(f"Date Range Check: Raw 'Sale Date' dtypes:\n{all_sales_records_df[['Platform', 'Sale Date']].head(10)}")
             
             # Attempt to convert to datetime, coercing errors
+            all_sales_records_df['Sale Date'] = all_sales_records_df['Sale Date'].astype(str).str.strip()
             all_sales_records_df['parsed_date'] = pd.to_datetime(all_sales_records_df['Sale Date'], errors='coerce')
             
             # Find out which rows failed to parse
@@ -313,72 +932,102 @@ class BaserowFetcher:
     def delete_sales_records_for_period(self, table_id, platform, account_name, msku, start_date_str, end_date_str):
         """
         Deletes sales records for a specific MSKU, platform, account within a date range.
-        Baserow API for deleting multiple rows based on complex filters can be tricky.
-        Often, you fetch IDs based on filters, then delete by ID.
+        Matching row IDs are found with a server-side filtered, id-only query, then deleted in batches.
         """
         logger.info(f"Attempting to delete records for {platform}-{account_name}, MSKU: {msku} from {start_date_str} to {end_date_str}")
-        
-        # Construct filter: by platform, account, msku, and date range
-        # Baserow field names/IDs would be needed here. Assuming 'Platform', 'Account Name', 'MSKU', 'Sale Date' are field names.
-        # Example filter string (syntax depends on Baserow API version and field types):
-        # filter__field_Platform__equal=Amazon&filter__field_Account_Name__equal=Main&filter__field_MSKU__equal=XYZ
-        # &filter__field_Sale_Date__date_after_or_equal=YYYY-MM-DD&filter__field_Sale_Date__date_before_or_equal=YYYY-MM-DD
-        
-        # This is a placeholder. Actual implementation requires knowing Baserow field IDs for filters.
-        # For now, this function would need to:
-        # 1. List rows matching the criteria (platform, account, msku, date range).
-        # 2. Get their Baserow row IDs.
-        # 3. Call the delete row API for each ID (or batch delete if available).
-        
-        # Simplified: For this example, we'll assume we'd query and delete.
-        # This part is complex and needs careful implementation with Baserow's API.
-        # For now, we'll just log it. A robust solution would involve fetching row IDs based on filters.
-        
-        # Fetch rows to delete
-        # Example: /api/database/rows/table/{table_id}/?user_field_names=true&filter__Platform__equal={platform}&filter__Account_Name__equal={account_name}&filter__MSKU__equal={msku}&filter__Sale_Date__date_after_or_equal={start_date_str}&filter__Sale_Date__date_before_or_equal={end_date_str}
-        # This requires field names to be exactly 'Platform', 'Account Name', etc. or using field_XXX IDs.
-        
-        # For now, let's assume a simpler strategy for the POC: if we are uploading daily aggregates,
-        # we might delete records for specific MSKU/Platform/Account/SaleDate combinations.
-        
-        # To implement a true "delete for period" for an MSKU:
-        # 1. Construct the filter URL.
-        # 2. GET request to fetch matching row IDs.
-        # 3. If rows found, POST to /api/database/rows/table/{table_id}/batch-delete/ with the list of row IDs.
-        # This is non-trivial with the current generic fetcher.
-        logger.warning("delete_sales_records_for_period is a placeholder and needs full Baserow API filter/delete implementation.")
-        return True # Placeholder
+        try:
+            row_ids = [row['id'] for row in (self.query(table_id)
+                                             .equal('Platform', platform)
+                                             .equal('Account Name', account_name)
+                                             .equal('MSKU', msku)
+                                             .date_range('Sale Date', start_date_str, end_date_str)
+                                             .include('id')
+                                             .iter_rows())]
+        except (requests.exceptions.RequestException, json.JSONDecodeError) as e:
+            logger.error(f"Error fetching row IDs for period deletion: {e}", exc_info=True)
+            return False
+
+        if not row_ids:
+            logger.info("No records found for the specified period. Nothing to delete.")
+            return True
+        return self.batch_delete_rows(table_id, row_ids)
 
-    def batch_create_rows(self, table_id, records_list):
+    def _send_write_with_retry(self, method, url, payload, description, retry_unsafe=True):
+        """
+        Sends one batch write through the shared HTTP layer, retrying 429 responses and
+        connections that could not be opened with exponential backoff (honouring Retry-After).
+        With `retry_unsafe` (updates and deletes, which are safe to repeat) 5xx responses, read
+        timeouts and dropped connections are retried too; batch creates pass False, since the
+        server may already have created the rows. Returns the decoded JSON response; raises the
+        last error once the retries are used up.
+        """
+        response = self.http.request(method, url, category="write", retry_unsafe=retry_unsafe, headers=self.headers, json=payload,
+                                     max_retries=self.write_max_retries, backoff_seconds=self.write_backoff_seconds)
+        if not response.ok:
+            logger.error(f"Response content for {description}: {response.text[:500]}")
+        response.raise_for_status()
+        return response.json() if response.content else {} # batch-delete answers 204 No Content
+
+    def batch_create_rows(self, table_id, records_list, batch_size=None):
         """
-        Creates rows in a Baserow table in batches.
-        Baserow API typically supports creating multiple rows in one request.
-        Max 200 items per request for batch row creation.
+        Creates rows in a Baserow table in batches of up to 200 (Baserow's limit), sending up
+        to `baserow.batch_write.max_concurrent_batches` batches at once. Only 429s and connections
+        that could not be opened are retried: after a 5xx or timeout the batch may have been
+        created, so it is reported as failed rather than sent twice. A failed batch does not stop the others.
+        Returns a BatchWriteReport with the created row ids and the failed batches.
         """
+        return self._batch_write_rows("POST", table_id, records_list, batch_size)
+
+    def batch_update_rows(self, table_id, records_list, batch_size=None):
+        """
+        Updates existing rows in batches of up to 200. Each record must carry the row 'id'
+        plus the fields to change. Same concurrency as batch_create_rows; as an update can be
+        repeated safely, 5xx responses and timeouts are retried too.
+        Returns a BatchWriteReport with `updated_ids` and the failed batches.
+        """
+        report = self._batch_write_rows("PATCH", table_id, records_list, batch_size)
+        report.updated_ids, report.created_ids = report.created_ids, []
+        return report
+
+    def _batch_write_rows(self, method, table_id, records_list, batch_size=None):
+        """
+        Sends `records_list` to the batch endpoint with `method` (POST creates, PATCH updates).
+        The ids of the written rows are collected in the report's `created_ids`.
+        """
+        report = BatchWriteReport(total_records=len(records_list or []))
         if not records_list:
-            return True
-        
+            return report
+
         url = f"{self.base_url}/api/database/rows/table/{table_id}/batch/?user_field_names=true"
-        all_results = []
-        
-        # Baserow batch create limit is often 200
-        batch_size = 100 # Being conservative
-        for i in range(0, len(records_list), batch_size):
-            batch = records_list[i:i + batch_size]
-            payload = {"items": batch} # Payload structure for batch create
+        action = "create" if method == "POST" else "update"
+        batch_size = min(batch_size or self.BATCH_SIZE, self.BATCH_SIZE)
+        batch_starts = range(0, len(records_list), batch_size)
+
+        def write_batch(start):
+            batch = records_list[start:start + batch_size]
+            description = f"Batch {action} of rows {start + 1}-{start + len(batch)} in table {table_id}"
             try:
-                response = requests.post(url, headers=self.headers, json=payload)
-                response.raise_for_status()
-                all_results.extend(response.json().get("items", [])) # Response structure for batch create
-                logger.info(f"Successfully created batch of {len(batch)} rows in table {table_id}.")
-            except requests.exceptions.RequestException as e:
-                logger.error(f"Error batch creating rows in table {table_id}: {e}")
-                if response is not None: logger.error(f"Response content: {response.text}")
-                return False # Indicate failure
-            except json.JSONDecodeError as e:
-                logger.error(f"Error decoding JSON response for batch create in table {table_id}: {e}. Response text: {response.text[:500]}")
-                return False
-        return True
+                # A repeated create would duplicate the rows, so creates are only resent when they can't have been applied.
+                data = self._send_write_with_retry(method, url, {"items": batch}, description, retry_unsafe=(method != "POST"))
+                return start, batch, [item.get('id') for item in data.get("items", [])], None
+            except (requests.exceptions.RequestException, json.JSONDecodeError) as e:
+                logger.error(f"{description} failed: {e}")
+                status = getattr(getattr(e, 'response', None), 'status_code', None)
+                return start, batch, [], {"start": start, "records": batch, "status": status, "error": str(e)}
+
+        workers = min(self.max_concurrent_writes, len(batch_starts))
+        with ThreadPoolExecutor(max_workers=workers) as executor:
+            # Results come back in batch order, so row ids follow the order of records_list.
+            for start, batch, row_ids, failure in executor.map(write_batch, batch_starts):
+                if failure:
+                    report.failed_batches.append(failure)
+                else:
+                    report.created_ids.extend(row_ids)
+                    logger.info(f"Successfully {action}d batch of {len(batch)} rows in table {table_id}.")
+
+        log = logger.info if not report.failed_batches else logger.error
+        log(f"Batch {action} in table {table_id}: {len(report.created_ids)} of {report.total_records} rows written, {len(report.failed_batches)} batch(es) failed.")
+        return report
     
     def check_existing_data_for_period(self, table_id, platform, account_name, start_date_str, end_date_str):
         """
@@ -391,46 +1040,23 @@ class BaserowFetcher:
             logger.warning("Missing parameters for check_existing_data_for_period.")
             return False # Or raise error
 
-        # Construct filter for Baserow API.
-        # This requires knowing the actual field names/IDs in your Baserow table.
-        # Assuming field names are 'Platform', 'Account Name', 'Sale Date'
-        # And date format in Baserow is YYYY-MM-DD
-        # Example: &filter__field_Platform__equal=Amazon&filter__field_Account_Name__equal=Main Account&filter__field_Sale_Date__date_after_or_equal=2023-01-01&filter__field_Sale_Date__date_before_or_equal=2023-01-31
-        
-        # For a robust solution, you'd get field IDs programmatically.
-        # For now, let's assume you have these field names.
-        # IMPORTANT: Replace 'field_Platform_ID', 'field_Account_Name_ID', 'field_Sale_Date_ID'
-        # with the actual Baserow field IDs (e.g., field_12345) or ensure your field names are exactly as used.
-        # If using user_field_names=true, you can use the display names.
-        
-        # Let's assume user_field_names=true is used in _get_all_rows, so we can use display names.
-        # Ensure your Baserow table has fields named exactly "Platform", "Account Name", "Sale Date".
-        filters = [
-            f"filter__Platform__equal={requests.utils.quote(platform)}",
-            f"filter__Account_Name__equal={requests.utils.quote(account_name)}",
-            f"filter__Sale_Date__date_after_or_equal={start_date_str}", # Assumes YYYY-MM-DD
-            f"filter__Sale_Date__date_before_or_equal={end_date_str}"  # Assumes YYYY-MM-DD
-        ]
-        filter_params = "&".join(filters)
-        
-        # We only need to know if at least one row exists, so limit to 1.
-        url = f"{self.base_url}/api/database/rows/table/{table_id}/?user_field_names=true&size=1&{filter_params}"
-        
+        # We only need to know if at least one row exists, so a one-row count query is enough.
         try:
-            response = requests.get(url, headers=self.headers)
-            response.raise_for_status()
-            data = response.json()
-            if data.get("count", 0) > 0:
+            matching_count = (self.query(table_id)
+                              .equal('Platform', platform)
+                              .equal('Account Name', account_name)
+                              .date_range('Sale Date', start_date_str, end_date_str) # Assumes YYYY-MM-DD
+                              .count())
+            if matching_count > 0:
                 logger.info("Existing data found for the specified period.")
                 return True
             logger.info("No existing data found for the specified period.")
             return False
         except requests.exceptions.RequestException as e:
             logger.error(f"Error checking existing data: {e}", exc_info=True)
-            if response is not None: logger.error(f"Response content: {response.text}")
             return False # Assume no data on error, or handle differently
         except json.JSONDecodeError as e:
-            logger.error(f"Error decoding JSON for existing data check: {e}. Response: {response.text[:500]}")
+            logger.error(f"Error decoding JSON for existing data check: {e}")
             return False
         
         
@@ -472,62 +1098,25 @@ class BaserowFetcher:
 
         logger.info(f"Fetching existing rows for P:{platform}, A:{account_name}, Dates:{min_date_str}-{max_date_str} to identify deletable IDs.")
 
-        filters = [
-            f"filter__Platform__equal={requests.utils.quote(platform)}",
-            f"filter__Account_Name__equal={requests.utils.quote(account_name)}",
-            f"filter__Sale_Date__date_after_or_equal={min_date_str}",
-            f"filter__Sale_Date__date_before_or_equal={max_date_str}"
-        ]
-        filter_params = "&".join(filters)
-        
-        # Fetch all potentially relevant rows (this could be large)
-        # The _get_all_rows helper is used here.
-        url = f"{self.base_url}/api/database/rows/table/{table_id}/?user_field_names=true&{filter_params}&size=200" # Max size per page
-        
-        all_fetched_rows = []
-        page = 1
-        while True:
-            paginated_url = f"{url}&page={page}"
-            try:
-                response = requests.get(paginated_url, headers=self.headers)
-                response.raise_for_status()
-                data = response.json()
-                results = data.get("results", [])
-                all_fetched_rows.extend(results)
-                if data.get("next") is None or not results: break
-                page += 1
-            except Exception as e:
-                logger.error(f"Error fetching rows for ID identification: {e}", exc_info=True)
-                return [] # Critical error, stop
-
-        if not all_fetched_rows:
+        # Fetch all potentially relevant rows (this could be large), projected to the key columns only.
+        try:
+            all_fetched_rows = (self.query(table_id)
+                                .equal('Platform', platform)
+                                .equal('Account Name', account_name)
+                                .date_range('Sale Date', min_date_str, max_date_str)
+                                .include('Sale Date', 'MSKU', 'Platform', 'Account Name')
+                                .fetch_all())
+            all_fetched_rows = self._rows_to_dataframe(all_fetched_rows, table_id) if all_fetched_rows else pd.DataFrame()
+        except Exception as e:
+            logger.error(f"Error fetching rows for ID identification: {e}", exc_info=True)
+            return [] # Critical error, stop
+
+        if all_fetched_rows.empty:
             logger.info("No existing rows found matching the broader criteria.")
             return []
 
-        # Now, locally filter these fetched_rows against the specific criteria_list_of_dicts
-        # This assumes 'Sale Date' from Baserow is string 'YYYY-MM-DD' or needs parsing.
-        # And 'MSKU' from Baserow matches.
-        for existing_row in all_fetched_rows:
-            # Ensure Baserow 'Sale Date' is comparable (string YYYY-MM-DD)
-            # Baserow date fields often come back as YYYY-MM-DD if user_field_names=true
-            existing_sale_date_str = existing_row.get('Sale Date')
-            existing_msku = existing_row.get('MSKU')
-            
-            # Handle if MSKU is None/NaN in Baserow (represented as None or empty string)
-            if existing_msku is None: existing_msku = "" # Or some other placeholder if needed for comparison
-
-            for new_record_criteria in criteria_list_of_dicts:
-                new_msku = new_record_criteria.get('MSKU')
-                if new_msku is None: new_msku = ""
-
-                if (existing_sale_date_str == new_record_criteria.get('Sale Date') and
-                    existing_msku == new_msku and # Compare potentially None MSKUs carefully
-                    existing_row.get('Platform') == new_record_criteria.get('Platform') and
-                    existing_row.get('Account Name') == new_record_criteria.get('Account Name')):
-                    row_ids_to_delete.append(existing_row['id'])
-                    break # Found a match for this existing_row, move to next existing_row
-        
-        unique_ids_to_delete = list(set(row_ids_to_delete)) # Ensure uniqueness
+        # Hash join the fetched rows against the criteria on the natural key instead of comparing every pair.
+        unique_ids_to_delete = self._match_sales_row_ids(pd.DataFrame(all_fetched_rows), pd.DataFrame(criteria_list_of_dicts))
         logger.info(f"Identified {len(unique_ids_to_delete)} existing row IDs to delete.")
         return unique_ids_to_delete
     
@@ -537,7 +1126,7 @@ class BaserowFetcher:
         response = None
         try:
             logger.info(f"Table {table_id}: Attempting to delete single row ID: {row_id} via URL: {url}")
-            response = requests.delete(url, headers=self.headers)
+            response = self.http.request("DELETE", url, category="write", headers=self.headers)
             
             if not response.ok and response.status_code != 404: # Log error unless it's a 404
                  logger.error(f"Table {table_id}: Single row delete API call failed for ID {row_id}. Status: {response.status_code}, Response: {response.text}")
@@ -598,57 +1187,29 @@ class BaserowFetcher:
         """
         logger.warning(f"Fetching ALL row IDs for range deletion: T:{table_id}, P:{platform}, A:{account_name}, {start_date_str}-{end_date_str}")
         
-        # Build the filter string for the API call
-        filters = []
+        # Only the row ids are needed, so every field is projected away.
+        query = self.query(table_id).include('id').date_range('Sale Date', start_date_str, end_date_str)
         if platform:
-            filters.append(f"filter__Platform__equal={requests.utils.quote(platform)}")
+            query.equal('Platform', platform)
         if account_name:
-            filters.append(f"filter__Account_Name__equal={requests.utils.quote(account_name)}")
-        if start_date_str:
-            filters.append(f"filter__Sale_Date__date_after_or_equal={start_date_str}")
-        if end_date_str:
-            filters.append(f"filter__Sale_Date__date_before_or_equal={end_date_str}")
-        
-        filter_params = "&".join(filters)
-        
-        all_matching_rows = []
-        page = 1
-        # We only need the 'id' field, but fetching all is simpler with get_table_data_as_dataframe
-        # Let's construct a paginated fetch manually to be more efficient.
-        base_url_for_list = f"{self.base_url}/api/database/rows/table/{table_id}/?user_field_names=true&size=200"
-        if filter_params:
-            base_url_for_list += f"&{filter_params}"
-
-        logger.debug(f"Fetching rows for range deletion with URL (page 1): {base_url_for_list}&page=1")
-
-        while True:
-            current_url = f"{base_url_for_list}&page={page}"
-            try:
-                response = requests.get(current_url, headers=self.headers)
-                response.raise_for_status()
-                data = response.json()
-                results = data.get("results", [])
-                if not results:
-                    break
-                all_matching_rows.extend(results)
-                if data.get("next") is None:
-                    break
-                page += 1
-            except requests.exceptions.RequestException as e:
-                logger.error(f"Error fetching rows for range deletion: {e}", exc_info=True)
-                if response is not None: logger.error(f"Response: {response.text}")
-                return [] # Return empty on error
-            except json.JSONDecodeError as e:
-                logger.error(f"JSON decode error fetching rows for range deletion: {e}. Response: {response.text[:500]}")
-                return []
-
-        row_ids = [row['id'] for row in all_matching_rows if 'id' in row]
+            query.equal('Account Name', account_name)
+
+        logger.debug(f"Fetching rows for range deletion with params: {query.to_params()}")
+        try:
+            row_ids = [row['id'] for row in query.iter_rows() if 'id' in row]
+        except requests.exceptions.RequestException as e:
+            logger.error(f"Error fetching rows for range deletion: {e}", exc_info=True)
+            return [] # Return empty on error
+        except json.JSONDecodeError as e:
+            logger.error(f"JSON decode error fetching rows for range deletion: {e}")
+            return []
+
         logger.info(f"Found {len(row_ids)} row IDs for range deletion criteria.")
         return row_ids
     
     def batch_delete_rows(self, table_id, row_ids_to_delete):
         """
-        Deletes rows in batches of 200 to comply with Baserow API limits.
+        Deletes rows in batches of 200 to comply with Baserow API limits, several batches at once.
         This is the fast and preferred method.
         """
         if not row_ids_to_delete:
@@ -667,47 +1228,315 @@ class BaserowFetcher:
             return True
 
         logger.info(f"Table {table_id}: Starting FAST BATCH DELETE for a total of {len(valid_row_ids)} rows.")
-        
+        _, failed_ids = self._batch_delete_concurrently(table_id, valid_row_ids)
+        if failed_ids:
+            logger.error(f"Table {table_id}: {len(failed_ids)} rows could not be deleted.")
+            return False
+        logger.info(f"Table {table_id}: All chunks processed successfully for deletion.")
+        return True
+
+    def _batch_delete_concurrently(self, table_id, row_ids):
+        """
+        Deletes rows through Baserow's batch-delete endpoint in chunks of 200, sending up to
+        `baserow.batch_write.max_concurrent_batches` chunks at once with retries.
+        Returns (deleted_ids, failed_ids).
+        """
+        if not row_ids:
+            return [], []
         url = f"{self.base_url}/api/database/rows/table/{table_id}/batch-delete/"
-        
-        # --- CHUNKING LOGIC ---
-        batch_size = 200 # Baserow's limit
-        overall_success = True
+        chunks = [row_ids[i:i + self.BATCH_SIZE] for i in range(0, len(row_ids), self.BATCH_SIZE)]
 
-        for i in range(0, len(valid_row_ids), batch_size):
-            chunk_of_ids = valid_row_ids[i:i + batch_size]
-            
-            logger.info(f"Table {table_id}: Deleting chunk {i//batch_size + 1}, containing {len(chunk_of_ids)} row IDs.")
-            
-            payload = {"items": chunk_of_ids}
-            
-            response = None
+        def delete_chunk(chunk_no):
+            chunk = chunks[chunk_no]
+            description = f"Batch delete chunk {chunk_no + 1}/{len(chunks)} ({len(chunk)} rows) in table {table_id}"
             try:
-                logger.debug(f"Table {table_id}: Sending POST to {url} with payload: {json.dumps(payload)}")
-                response = requests.post(url, headers=self.headers, json=payload)
-                
-                if not response.ok:
-                    logger.error(f"Table {table_id}: Batch delete API call for chunk failed. Status: {response.status_code}, Response: {response.text}")
-                
-                response.raise_for_status()
-                
-                logger.info(f"Table {table_id}: Successfully submitted batch delete request for chunk. Status: {response.status_code}")
-            except requests.exceptions.RequestException as e:
-                logger.error(f"Table {table_id}: FAST BATCH DELETE FAILED for a chunk. Error: {e}", exc_info=False)
-                if response is not None:
-                    logger.error(f"Table {table_id}: Failing response content: {response.text}")
-                overall_success = False # Mark the entire operation as failed
-                # You could choose to stop here or continue with other chunks
-                # For now, let's stop on the first failed chunk.
-                break 
-        
-        if not overall_success:
-            logger.error(f"Table {table_id}: One or more chunks failed to delete. The operation was aborted.")
-        else:
-            logger.info(f"Table {table_id}: All chunks processed successfully for deletion.")
+                self._send_write_with_retry("POST", url, {"items": chunk}, description)
+                return chunk, True
+            except (requests.exceptions.RequestException, json.JSONDecodeError) as e:
+                logger.error(f"{description} failed: {e}")
+                return chunk, False
+
+        deleted_ids, failed_ids = [], []
+        with ThreadPoolExecutor(max_workers=min(self.max_concurrent_writes, len(chunks))) as executor:
+            for chunk, ok in executor.map(delete_chunk, range(len(chunks))):
+                (deleted_ids if ok else failed_ids).extend(chunk)
+        return deleted_ids, failed_ids
+
+    # --- Sales partition replacement: delete the rows an upload overlaps, then bulk insert, with a resumable journal ---
+
+    @classmethod
+    def _sales_key_frame(cls, df):
+        """The natural-key columns of a sales frame, normalised so Baserow rows and upload records compare equal."""
+        keys = pd.DataFrame(index=df.index)
+        for col in cls.SALES_KEY_COLUMNS:
+            values = df[col] if col in df.columns else pd.Series(None, index=df.index, dtype=object)
+            keys[col] = values.fillna('').astype(str).str.strip()
+        keys['Sale Date'] = keys['Sale Date'].str[:10] # 'YYYY-MM-DD', also when a timestamp slipped in
+        return keys
+
+    def _match_sales_row_ids(self, existing_df, new_df):
+        """Returns the ids of rows in `existing_df` whose natural key appears in `new_df` (a hash join)."""
+        if existing_df.empty or new_df.empty or 'id' not in existing_df.columns:
+            return []
+        existing_keys = self._sales_key_frame(existing_df)
+        existing_keys['id'] = existing_df['id']
+        new_keys = self._sales_key_frame(new_df).drop_duplicates()
+        matched = existing_keys.merge(new_keys, on=self.SALES_KEY_COLUMNS, how='inner')
+        return [int(rid) for rid in matched['id'].unique()]
+
+    def _partition_journal_dir(self):
+        return os.path.join(self.cache_dir, "journals")
+
+    def _write_partition_journal(self, journal_path, journal):
+        os.makedirs(os.path.dirname(journal_path), exist_ok=True)
+        tmp_path = f"{journal_path}.tmp"
+        with open(tmp_path, 'w') as f:
+            json.dump(journal, f, default=str)
+        os.replace(tmp_path, journal_path) # Never leave a half-written journal behind
+
+    def replace_sales_partition(self, table_id, platform, account_name, start_date, end_date, new_data):
+        """
+        Replaces the sales rows of one platform/account between `start_date` and `end_date` that
+        share a natural key (Sale Date, MSKU, Platform, Account Name) with `new_data` (a DataFrame
+        or list of records): the matching rows are found with a hash join, removed with concurrent
+        batch-deletes, and `new_data` is inserted with batch_create_rows.
+
+        A journal under `<cache dir>/journals` records the work until it finishes; if the process
+        stops half-way, resume_sales_partition picks it up. Re-running is safe because the delete
+        step always removes every row with a key that is about to be inserted.
+        Returns the BatchWriteReport of the insert, with `deleted_ids` filled in.
+        """
+        records = new_data.to_dict('records') if isinstance(new_data, pd.DataFrame) else list(new_data or [])
+        start_str = start_date.strftime('%Y-%m-%d') if isinstance(start_date, (date, datetime)) else str(start_date)
+        end_str = end_date.strftime('%Y-%m-%d') if isinstance(end_date, (date, datetime)) else str(end_date)
+
+        if records:
+            new_keys = self._sales_key_frame(pd.DataFrame(records))
+            outside = new_keys[(new_keys['Platform'] != str(platform)) | (new_keys['Account Name'] != str(account_name))]
+            if not outside.empty:
+                raise ValueError(f"{len(outside)} records do not belong to {platform} / {account_name}; replace one partition at a time.")
+
+        partition_key = f"{table_id}|{platform}|{account_name}|{start_str}|{end_str}"
+        journal_name = f"sales_partition_{table_id}_{hashlib.md5(partition_key.encode('utf-8')).hexdigest()[:16]}.json"
+        journal_path = os.path.join(self._partition_journal_dir(), journal_name)
+        journal = {
+            "table_id": str(table_id), "platform": platform, "account_name": account_name,
+            "start_date": start_str, "end_date": end_str, "phase": "delete",
+            "started_at": datetime.now(timezone.utc).isoformat(), "records": records,
+        }
+        self._write_partition_journal(journal_path, journal)
+        return self._run_partition_replacement(journal_path, journal)
 
-        return overall_success
+    def get_pending_partition_journals(self, table_id=None):
+        """Lists unfinished partition replacements (optionally for one table), without their records."""
+        journal_dir = self._partition_journal_dir()
+        if not os.path.isdir(journal_dir):
+            return []
+        pending = []
+        for file_name in sorted(os.listdir(journal_dir)):
+            if not (file_name.startswith("sales_partition_") and file_name.endswith(".json")):
+                continue
+            path = os.path.join(journal_dir, file_name)
+            try:
+                with open(path, 'r') as f:
+                    journal = json.load(f)
+            except (OSError, json.JSONDecodeError) as e:
+                logger.warning(f"PARTITION_REPLACE: Could not read journal {path}: {e}")
+                continue
+            if table_id is not None and journal.get('table_id') != str(table_id):
+                continue
+            summary = {k: v for k, v in journal.items() if k != 'records'}
+            summary.update({"path": path, "record_count": len(journal.get('records', []))})
+            pending.append(summary)
+        return pending
+
+    def resume_sales_partition(self, journal_path):
+        """Finishes a partition replacement that was interrupted, from its journal."""
+        with open(journal_path, 'r') as f:
+            journal = json.load(f)
+        logger.info(f"PARTITION_REPLACE: Resuming {journal['platform']} / {journal['account_name']} "
+                    f"{journal['start_date']} to {journal['end_date']} from the '{journal['phase']}' step.")
+        return self._run_partition_replacement(journal_path, journal)
+
+    def _run_partition_replacement(self, journal_path, journal):
+        table_id, records = journal['table_id'], journal.get('records', [])
+        report = BatchWriteReport(total_records=len(records))
+        if not records:
+            os.remove(journal_path)
+            return report
+
+        # Query the partition, widened to any record dates outside the stated period so none of their twins survive.
+        new_keys = self._sales_key_frame(pd.DataFrame(records))
+        record_dates = new_keys['Sale Date'][new_keys['Sale Date'] != '']
+        query_start = min([journal['start_date']] + ([record_dates.min()] if not record_dates.empty else []))
+        query_end = max([journal['end_date']] + ([record_dates.max()] if not record_dates.empty else []))
+        try:
+            existing_df = (self.query(table_id)
+                           .equal('Platform', journal['platform'])
+                           .equal('Account Name', journal['account_name'])
+                           .date_range('Sale Date', query_start, query_end)
+                           .include(*self.SALES_KEY_COLUMNS)
+                           .to_dataframe())
+        except (requests.exceptions.RequestException, json.JSONDecodeError) as e:
+            logger.error(f"PARTITION_REPLACE: Could not read existing rows of table {table_id}: {e}")
+            report.failed_batches.append({"start": 0, "records": records, "status": None, "error": f"Reading existing rows failed: {e}"})
+            return report
+
+        row_ids = self._match_sales_row_ids(existing_df, new_keys)
+        deleted_ids, failed_ids = self._batch_delete_concurrently(table_id, row_ids)
+        logger.info(f"PARTITION_REPLACE: Table {table_id}: {len(existing_df)} rows in partition, {len(row_ids)} overlap the upload, {len(deleted_ids)} deleted.")
+        if failed_ids:
+            # The journal stays in the delete phase; a resume re-matches and deletes whatever is left.
+            report.deleted_ids = deleted_ids
+            report.failed_batches.append({"start": 0, "records": records, "status": None, "error": f"{len(failed_ids)} overlapping rows could not be deleted"})
+            return report
+
+        journal.update({"phase": "insert", "deleted_count": journal.get('deleted_count', 0) + len(deleted_ids)})
+        self._write_partition_journal(journal_path, journal)
+
+        report = self.batch_create_rows(table_id, records)
+        report.deleted_ids = deleted_ids
+        if report:
+            os.remove(journal_path)
+        else:
+            # Keep only what still has to be written; the next run deletes any of those keys first.
+            journal["records"] = report.failed_records
+            self._write_partition_journal(journal_path, journal)
+        logger.info(f"PARTITION_REPLACE: Table {table_id}: {report.summary()}")
+        return report
     
+    # --- Natural-key upsert of processed sales: only send what changed ---
+
+    @staticmethod
+    def _hash_normalize(series):
+        """Renders a column as comparable text: numbers in one canonical form, blanks as ''."""
+        text = series.where(series.notna(), '').astype(str).str.strip()
+        try:
+            numeric = pd.to_numeric(series, errors='coerce')
+        except (TypeError, ValueError):
+            return text
+        present = text != ''
+        if present.any() and numeric[present].notna().all():
+            # Baserow returns decimals as strings ('12.50'); the upload has floats (12.5).
+            return numeric.round(6).map(lambda v: '' if pd.isna(v) else repr(float(v)))
+        return text
+
+    def _row_hashes(self, df, columns):
+        """One 64-bit hash per row over `columns` (missing columns count as blank)."""
+        if not columns:
+            return pd.Series(0, index=df.index, dtype='uint64')
+        normalized = pd.DataFrame({col: self._hash_normalize(df[col]) if col in df.columns else '' for col in columns}, index=df.index)
+        return pd.util.hash_pandas_object(normalized, index=False)
+
+    def _upsert_key_frame(self, df):
+        """
+        Natural-key frame plus an `_occurrence` counter, so a key that appears more than once
+        (several orders of one MSKU on one day) pairs up occurrence by occurrence.
+        """
+        keys = self._sales_key_frame(df)
+        keys['_occurrence'] = keys.groupby(self.SALES_KEY_COLUMNS, sort=False).cumcount()
+        return keys
+
+    def upsert_sales_records(self, table_id, new_data, start_date=None, end_date=None, delete_missing=True):
+        """
+        Writes `new_data` (a DataFrame or list of records) to the processed sales table keyed on
+        (Sale Date, MSKU, Platform, Account Name), sending only the difference:
+        - keys not stored yet are created;
+        - stored keys whose values differ (compared by row hash, ignoring the upload batch id and
+          timestamp) are updated in place with batch PATCH requests;
+        - with `delete_missing`, stored keys of the same platform/account between `start_date` and
+          `end_date` (default: the upload's first and last Sale Date) that are not in the upload are deleted.
+        Stored rows are read from Baserow with a filtered query for the upload's platform/account
+        pairs and period, not from the delta-sync snapshot, which can miss edits made in Baserow;
+        when the table is delta-synced, the snapshot is patched afterwards so it reflects the writes.
+        Returns a BatchWriteReport with created, updated and deleted ids and the failed batches.
+        """
+        records = new_data.to_dict('records') if isinstance(new_data, pd.DataFrame) else list(new_data or [])
+        report = BatchWriteReport(total_records=len(records))
+        if not records:
+            return report
+
+        new_df = pd.DataFrame(records)
+        new_keys = self._upsert_key_frame(new_df)
+        record_dates = new_keys['Sale Date'][new_keys['Sale Date'] != '']
+        if record_dates.empty and not (start_date and end_date):
+            logger.error(f"UPSERT: None of the {len(records)} records has a Sale Date and no period was given; nothing was written.")
+            report.failed_batches.append({"start": 0, "records": records, "status": None,
+                                          "error": "No record has a Sale Date, so the period to compare against is unknown."})
+            return report
+        start_str = start_date.strftime('%Y-%m-%d') if isinstance(start_date, (date, datetime)) else (start_date or record_dates.min())
+        end_str = end_date.strftime('%Y-%m-%d') if isinstance(end_date, (date, datetime)) else (end_date or record_dates.max())
+        if not record_dates.empty:
+            start_str, end_str = min(start_str, record_dates.min()), max(end_str, record_dates.max())
+        partitions = new_keys[['Platform', 'Account Name']].drop_duplicates()
+        compare_columns = [c for c in new_df.columns if c not in self.SALES_KEY_COLUMNS + self.UPSERT_IGNORED_COLUMNS + ['id']]
+
+        try:
+            table_df = self.fetch_sales_partitions(table_id, partitions.itertuples(index=False), start_str, end_str)
+        except (requests.exceptions.RequestException, json.JSONDecodeError) as e:
+            logger.error(f"UPSERT: Could not read table {table_id}: {e}")
+            report.failed_batches.append({"start": 0, "records": records, "status": None, "error": f"Reading existing rows failed: {e}"})
+            return report
+
+        if table_df.empty or 'id' not in table_df.columns:
+            existing_df = pd.DataFrame(columns=['id'] + self.SALES_KEY_COLUMNS)
+        else:
+            table_keys = self._sales_key_frame(table_df)
+            in_scope = (pd.MultiIndex.from_frame(table_keys[['Platform', 'Account Name']]).isin(pd.MultiIndex.from_frame(partitions))
+                        & (table_keys['Sale Date'] >= start_str) & (table_keys['Sale Date'] <= end_str))
+            existing_df = table_df[in_scope].sort_values('id', kind='stable')
+        existing_keys = self._upsert_key_frame(existing_df)
+
+        # Nullable UInt64 keeps the hashes exact through the outer merge (a plain uint64 column would turn into float).
+        incoming = new_keys.assign(_position=range(len(new_df)), _new_hash=self._row_hashes(new_df, compare_columns).astype('UInt64'))
+        stored = existing_keys.assign(_row_id=existing_df['id'], _old_hash=self._row_hashes(existing_df, compare_columns).astype('UInt64'))
+        diff = incoming.merge(stored, on=self.SALES_KEY_COLUMNS + ['_occurrence'], how='outer', indicator=True)
+
+        matched = diff[diff['_merge'] == 'both']
+        changed = matched[matched['_new_hash'] != matched['_old_hash']]
+        to_create = [records[int(pos)] for pos in diff.loc[diff['_merge'] == 'left_only', '_position']]
+        to_update = [{**records[int(pos)], 'id': int(row_id)} for pos, row_id in zip(changed['_position'], changed['_row_id'])]
+        to_delete = [int(row_id) for row_id in diff.loc[diff['_merge'] == 'right_only', '_row_id']] if delete_missing else []
+        report.unchanged_count = len(matched) - len(changed)
+        logger.info(f"UPSERT: Table {table_id}, {start_str} to {end_str}: {len(to_create)} new, {len(to_update)} changed, "
+                    f"{report.unchanged_count} unchanged, {len(to_delete)} to delete.")
+
+        deleted_ids, failed_delete_ids = self._batch_delete_concurrently(table_id, to_delete)
+        update_report = self.batch_update_rows(table_id, to_update)
+        create_report = self.batch_create_rows(table_id, to_create)
+        report.deleted_ids = deleted_ids
+        report.updated_ids = update_report.updated_ids
+        report.created_ids = create_report.created_ids
+        report.failed_batches = update_report.failed_batches + create_report.failed_batches
+        report.failed_delete_ids = failed_delete_ids
+        if failed_delete_ids:
+            report.failed_batches.append({"start": None, "records": [], "status": None, "error": f"{len(failed_delete_ids)} vanished rows could not be deleted"})
+
+        if str(table_id) in self._delta_tables and (deleted_ids or report.updated_ids or report.created_ids):
+            self._refresh_sales_partitions_in_snapshot(table_id, partitions, start_str, end_str, existing_df['id'])
+        logger.info(f"UPSERT: Table {table_id}: {report.summary()}")
+        return report
+
+    def fetch_sales_partitions(self, table_id, partitions, start_str, end_str):
+        """Reads the sales rows of the given (platform, account name) pairs between two 'YYYY-MM-DD' dates from Baserow."""
+        query = self.query(table_id).date_range('Sale Date', start_str, end_str)
+        either_partition = query.group("OR")
+        for platform, account_name in partitions:
+            either_partition.group("AND").equal('Platform', platform).equal('Account Name', account_name)
+        return query.to_dataframe()
+
+    def _refresh_sales_partitions_in_snapshot(self, table_id, partitions, start_str, end_str, stale_ids):
+        """Re-reads the upserted platform/account date range and patches it into the delta snapshot."""
+        try:
+            fresh_df = self.fetch_sales_partitions(table_id, partitions.itertuples(index=False), start_str, end_str)
+            self._replace_rows_in_delta_snapshot(table_id, stale_ids, fresh_df)
+        except (requests.exceptions.RequestException, json.JSONDecodeError) as e:
+            # Without a refresh the snapshot would keep the old values of updated rows; drop it so the next load is a full fetch.
+            logger.warning(f"UPSERT: Could not refresh the local snapshot of table {table_id}: {e}. It will be rebuilt on the next load.")
+            _, meta_path = self._delta_cache_paths(table_id)
+            if os.path.exists(meta_path):
+                os.remove(meta_path)
+
     def get_category_data(self, table_id):
         """
         Fetches product category, cost, supplier, and strategic data from Baserow.
@@ -0,0 +1,270 @@
+# RMS/data_processing/baserow_http.py
+import logging
+import math
+import random
+import threading
+import time
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor, wait, FIRST_COMPLETED
+
+import requests
+from urllib3.exceptions import NewConnectionError
+from utils.config_loader import APP_CONFIG
+from utils.http_session import get_http_session
+
+logger = logging.getLogger(__name__)
+
+RETRYABLE_SERVER_ERRORS = {500, 502, 503, 504}
+IDEMPOTENT_METHODS = {"GET", "HEAD", "OPTIONS", "PUT", "DELETE"}
+
+
+class AdaptiveRateLimiter:
+    """
+    Token bucket shared by every request to one Baserow server. A 429 halves the rate and
+    pauses the bucket for the Retry-After period; every successful request raises the rate
+    again by a small step, up to the configured maximum (additive increase, multiplicative decrease).
+    """
+    def __init__(self, requests_per_second, burst, min_requests_per_second=1.0, increase_step=1.0):
+        self.max_rate = float(requests_per_second)
+        self.rate = self.max_rate
+        self.min_rate = min(float(min_requests_per_second), self.max_rate)
+        self.burst = max(1.0, float(burst))
+        self.increase_step = float(increase_step)
+        self.tokens = self.burst
+        self.paused_until = 0.0
+        self.throttle_count = 0
+        self._last_refill = time.monotonic()
+        self._lock = threading.Lock()
+
+    def acquire(self):
+        """Blocks until a request may be sent."""
+        while True:
+            with self._lock:
+                now = time.monotonic()
+                self.tokens = min(self.burst, self.tokens + (now - self._last_refill) * self.rate)
+                self._last_refill = now
+                if now >= self.paused_until and self.tokens >= 1:
+                    self.tokens -= 1
+                    return
+                wait_for = max(self.paused_until - now, (1 - self.tokens) / self.rate)
+            time.sleep(wait_for)
+
+    def on_throttled(self, retry_after=None):
+        with self._lock:
+            self.throttle_count += 1
+            now = time.monotonic()
+            if now < self.paused_until:
+                # Other in-flight requests of the same burst; the rate was already lowered for it.
+                return
+            self.rate = max(self.min_rate, self.rate / 2)
+            self.tokens = 0
+            self.paused_until = now + (retry_after if retry_after else 1.0 / self.rate)
+        logger.warning(f"BASEROW_HTTP: Throttled by the server (429). Rate lowered to {self.rate:.1f} req/s, "
+                       f"paused for {self.paused_until - now:.1f}s.")
+
+    def on_success(self):
+        with self._lock:
+            if self.rate < self.max_rate:
+                # About `increase_step` req/s more for every second of successful traffic.
+                self.rate = min(self.max_rate, self.rate + self.increase_step / max(self.rate, 1.0))
+
+
+class LatencyTracker:
+    """Keeps the most recent request latencies per category ('page', 'write', ...) for percentiles."""
+    def __init__(self, window=1000):
+        self.window = window
+        self._samples = {}
+        self._lock = threading.Lock()
+
+    def record(self, category, seconds):
+        with self._lock:
+            self._samples.setdefault(category, deque(maxlen=self.window)).append(seconds)
+
+    def count(self, category):
+        with self._lock:
+            return len(self._samples.get(category, ()))
+
+    def percentile(self, category, pct):
+        with self._lock:
+            samples = sorted(self._samples.get(category, ()))
+        if not samples:
+            return None
+        return samples[max(0, math.ceil(pct / 100 * len(samples)) - 1)]
+
+    def summary(self):
+        """{category: {'count', 'p50', 'p95', 'max'}} in seconds."""
+        with self._lock:
+            snapshot = {category: sorted(samples) for category, samples in self._samples.items()}
+        summary = {}
+        for category, samples in snapshot.items():
+            if not samples:
+                continue
+            summary[category] = {
+                "count": len(samples),
+                "p50": round(samples[max(0, math.ceil(0.50 * len(samples)) - 1)], 4),
+                "p95": round(samples[max(0, math.ceil(0.95 * len(samples)) - 1)], 4),
+                "max": round(samples[-1], 4),
+            }
+        return summary
+
+
+class BaserowHTTPClient:
+    """
+    The one way RMS talks to a Baserow server. Every request gets connect/read timeouts and
+    passes through a shared adaptive rate limiter; 429s are retried after Retry-After, and
+    idempotent requests are also retried on 5xx, timeouts and connection errors. Page reads
+    can be hedged: a duplicate is sent when the first attempt is slower than the recent p95.
+    Use get_baserow_http(base_url) to get the shared client for a server.
+    """
+    def __init__(self, base_url, http_config=None):
+        http_config = http_config or {}
+        self.base_url = base_url.rstrip('/')
+        self.timeout = (float(http_config.get('connect_timeout_seconds', 5)), float(http_config.get('read_timeout_seconds', 60)))
+        self.max_retries = max(0, int(http_config.get('max_retries', 4)))
+        self.backoff_seconds = float(http_config.get('backoff_seconds', 1.0))
+
+        rate_config = http_config.get('rate_limit', {}) or {}
+        requests_per_second = float(rate_config.get('requests_per_second', 20))
+        self.rate_limiter = AdaptiveRateLimiter(
+            requests_per_second,
+            burst=rate_config.get('burst', requests_per_second * 2),
+            min_requests_per_second=rate_config.get('min_requests_per_second', 1),
+        ) if requests_per_second > 0 else None
+
+        hedge_config = http_config.get('hedge', {}) or {}
+        self.hedge_enabled = bool(hedge_config.get('enabled', True))
+        self.hedge_p95_multiplier = float(hedge_config.get('p95_multiplier', 2.0))
+        self.hedge_min_delay = float(hedge_config.get('min_delay_seconds', 2.0))
+        self.hedge_min_samples = int(hedge_config.get('min_samples', 20))
+        self.hedges_sent = 0
+        self.hedges_won = 0
+        self._hedge_executor = ThreadPoolExecutor(max_workers=int(hedge_config.get('max_workers', 32)), thread_name_prefix="baserow-hedge")
+        self._counter_lock = threading.Lock()
+
+        # The keep-alive pool for this host is shared with every other module that calls it.
+        self.session = get_http_session(self.base_url, pool_maxsize=int(http_config.get('pool_maxsize', 32)))
+        self.latency = LatencyTracker()
+
+    @staticmethod
+    def _retry_after_seconds(response):
+        value = response.headers.get('Retry-After')
+        try:
+            return max(0.0, float(value)) if value else None
+        except ValueError:
+            return None # An HTTP date; fall back to our own backoff
+
+    @staticmethod
+    def _not_sent(error):
+        """True when the request never reached the server (connect timeout or refused connection), so resending can't duplicate it."""
+        if isinstance(error, requests.exceptions.ConnectTimeout):
+            return True
+        reason = getattr(error.args[0], 'reason', None) if error.args else None
+        return isinstance(reason, NewConnectionError)
+
+    def _backoff(self, attempt, base):
+        return base * (2 ** attempt) + random.uniform(0, base / 2)
+
+    def request(self, method, url, category="other", retry_unsafe=False, max_retries=None, backoff_seconds=None, timeout=None, **kwargs):
+        """
+        Sends a request and returns the response (callers still call raise_for_status).
+        429s and connections that could not be opened are always retried; 5xx, read timeouts and
+        dropped connections only for idempotent methods, or for any method when `retry_unsafe` is
+        set (the server may have acted on the request already). `category` groups the latency metrics.
+        """
+        method = method.upper()
+        retryable = method in IDEMPOTENT_METHODS or retry_unsafe
+        max_retries = self.max_retries if max_retries is None else max_retries
+        backoff_seconds = self.backoff_seconds if backoff_seconds is None else backoff_seconds
+        attempt = 0
+        while True:
+            if self.rate_limiter:
+                self.rate_limiter.acquire()
+            started = time.perf_counter()
+            try:
+                response = self.session.request(method, url, timeout=timeout or self.timeout, **kwargs)
+            except (requests.exceptions.ConnectionError, requests.exceptions.Timeout) as e:
+                self.latency.record(category, time.perf_counter() - started)
+                if not (retryable or self._not_sent(e)) or attempt >= max_retries:
+                    raise
+                delay = self._backoff(attempt, backoff_seconds)
+                attempt += 1
+                logger.warning(f"BASEROW_HTTP: {method} {url} failed ({e}). Retry {attempt}/{max_retries} in {delay:.1f}s.")
+                time.sleep(delay)
+                continue
+            self.latency.record(category, time.perf_counter() - started)
+
+            if response.status_code == 429:
+                retry_after = self._retry_after_seconds(response)
+                if self.rate_limiter:
+                    self.rate_limiter.on_throttled(retry_after)
+                if attempt >= max_retries:
+                    return response
+                attempt += 1
+                if not self.rate_limiter: # The limiter's pause does the waiting otherwise
+                    time.sleep(retry_after if retry_after is not None else self._backoff(attempt - 1, backoff_seconds))
+                continue
+            if response.status_code in RETRYABLE_SERVER_ERRORS and retryable and attempt < max_retries:
+                delay = self._backoff(attempt, backoff_seconds)
+                attempt += 1
+                logger.warning(f"BASEROW_HTTP: {method} {url} returned {response.status_code}. Retry {attempt}/{max_retries} in {delay:.1f}s.")
+                time.sleep(delay)
+                continue
+            if self.rate_limiter and response.ok:
+                self.rate_limiter.on_success()
+            return response
+
+    def hedge_delay(self, category):
+        """Seconds to wait before hedging a request of `category`, or None while there are too few samples."""
+        if not self.hedge_enabled or self.latency.count(category) < self.hedge_min_samples:
+            return None
+        return max(self.hedge_min_delay, self.latency.percentile(category, 95) * self.hedge_p95_multiplier)
+
+    def hedged_request(self, method, url, category="page", **kwargs):
+        """
+        Sends an idempotent request; if it hasn't answered within hedge_delay, a duplicate is
+        sent and whichever answers first is used. The slower one is left to finish on its own.
+        """
+        delay = self.hedge_delay(category)
+        if delay is None:
+            return self.request(method, url, category=category, **kwargs)
+        primary = self._hedge_executor.submit(self.request, method, url, category=category, **kwargs)
+        done, _ = wait([primary], timeout=delay)
+        if done:
+            return primary.result()
+
+        with self._counter_lock:
+            self.hedges_sent += 1
+        logger.debug(f"BASEROW_HTTP: {method} {url} is slower than {delay:.1f}s; sending a hedged duplicate.")
+        backup = self._hedge_executor.submit(self.request, method, url, category=category, **kwargs)
+        done, pending = wait([primary, backup], return_when=FIRST_COMPLETED)
+        winner = done.pop()
+        if winner.exception() is not None and pending:
+            winner = pending.pop() # The first answer was an error; use the other attempt
+        if winner is backup:
+            with self._counter_lock:
+                self.hedges_won += 1
+        return winner.result()
+
+    def metrics(self):
+        """Latency percentiles per category, rate limiter state and hedging counters."""
+        limiter = self.rate_limiter
+        return {
+            "latency_seconds": self.latency.summary(),
+            "rate_limit": {
+                "current_rps": round(limiter.rate, 2), "max_rps": limiter.max_rate, "throttled": limiter.throttle_count,
+            } if limiter else None,
+            "hedging": {"sent": self.hedges_sent, "won": self.hedges_won},
+        }
+
+
+_CLIENTS = {}
+_CLIENTS_LOCK = threading.Lock()
+
+
+def get_baserow_http(base_url):
+    """Returns the process-wide BaserowHTTPClient for `base_url`, configured from `baserow.http`."""
+    key = base_url.rstrip('/')
+    with _CLIENTS_LOCK:
+        if key not in _CLIENTS:
+            _CLIENTS[key] = BaserowHTTPClient(key, APP_CONFIG.get('baserow', {}).get('http', {}))
+        return _CLIENTS[key]
@@ -0,0 +1,147 @@
+# RMS/data_processing/baserow_query.py
+import json
+import logging
+from datetime import date, datetime
+
+import pandas as pd
+
+logger = logging.getLogger(__name__)
+
+
+def _format_filter_value(value) -> str:
+    """Baserow expects filter values as strings; dates are sent as YYYY-MM-DD."""
+    if isinstance(value, (datetime, date)):
+        return value.strftime('%Y-%m-%d')
+    if value is None:
+        return ""
+    return str(value)
+
+
+class FilterGroup:
+    """
+    A group of Baserow filters combined with AND or OR. Groups can be nested,
+    which maps directly onto Baserow's `filters` JSON query parameter.
+    """
+    def __init__(self, filter_type: str = "AND"):
+        filter_type = filter_type.upper()
+        if filter_type not in ("AND", "OR"):
+            raise ValueError(f"Unsupported filter group type: {filter_type}. Use 'AND' or 'OR'.")
+        self.filter_type = filter_type
+        self.filters: list[dict] = []
+        self.groups: list["FilterGroup"] = []
+
+    def where(self, field: str, filter_type: str, value) -> "FilterGroup":
+        """Adds a single filter, e.g. where('Platform', 'equal', 'Amazon')."""
+        self.filters.append({"field": field, "type": filter_type, "value": _format_filter_value(value)})
+        return self
+
+    def equal(self, field: str, value) -> "FilterGroup":
+        return self.where(field, "equal", value)
+
+    def date_range(self, field: str, start=None, end=None) -> "FilterGroup":
+        """Keeps rows whose date `field` is between `start` and `end` (both inclusive, either optional)."""
+        if start:
+            self.where(field, "date_after_or_equal", start)
+        if end:
+            self.where(field, "date_before_or_equal", end)
+        return self
+
+    def group(self, filter_type: str = "AND") -> "FilterGroup":
+        """Creates, attaches and returns a nested group."""
+        nested = FilterGroup(filter_type)
+        self.groups.append(nested)
+        return nested
+
+    def is_empty(self) -> bool:
+        return not self.filters and all(g.is_empty() for g in self.groups)
+
+    def to_dict(self) -> dict:
+        tree = {"filter_type": self.filter_type, "filters": list(self.filters)}
+        non_empty_groups = [g.to_dict() for g in self.groups if not g.is_empty()]
+        if non_empty_groups:
+            tree["groups"] = non_empty_groups
+        return tree
+
+
+class BaserowQuery:
+    """
+    Builds a filtered, projected and ordered list-rows request for one table and
+    streams the matching rows page by page.
+
+    Example:
+        rows = (fetcher.query(table_id)
+                .equal('Platform', 'Amazon')
+                .date_range('Sale Date', '2024-06-01', '2024-06-30')
+                .include('id', 'MSKU', 'Sale Date')
+                .order_by('Sale Date')
+                .iter_rows())
+    """
+    def __init__(self, fetcher, table_id):
+        self.fetcher = fetcher
+        self.table_id = table_id
+        self.root = FilterGroup("AND")
+        self._include: list[str] = []
+        self._order_by: list[str] = []
+
+    # --- Filters (added to the top-level AND group) ---
+    def where(self, field: str, filter_type: str, value) -> "BaserowQuery":
+        self.root.where(field, filter_type, value)
+        return self
+
+    def equal(self, field: str, value) -> "BaserowQuery":
+        self.root.equal(field, value)
+        return self
+
+    def date_range(self, field: str, start=None, end=None) -> "BaserowQuery":
+        self.root.date_range(field, start, end)
+        return self
+
+    def group(self, filter_type: str = "OR") -> FilterGroup:
+        """Returns a nested filter group (OR by default) attached to the top-level AND group."""
+        return self.root.group(filter_type)
+
+    # --- Projection and ordering ---
+    def include(self, *fields: str) -> "BaserowQuery":
+        """
+        Only return these fields. The row 'id' is always returned by Baserow;
+        include('id') on its own therefore returns ids only.
+        """
+        self._include.extend(fields)
+        return self
+
+    def order_by(self, *fields: str) -> "BaserowQuery":
+        """Orders by the given fields; prefix a field with '-' for descending order."""
+        self._order_by.extend(fields)
+        return self
+
+    def to_params(self) -> dict:
+        params = {}
+        if not self.root.is_empty():
+            params["filters"] = json.dumps(self.root.to_dict())
+        if self._include:
+            params["include"] = ",".join(self._include)
+        if self._order_by:
+            params["order_by"] = ",".join(self._order_by)
+        return params
+
+    # --- Execution ---
+    def iter_pages(self, start_page: int = 1):
+        """Yields lists of raw rows, one per page, in page order."""
+        return self.fetcher._iter_row_pages(self.table_id, params=self.to_params(), start_page=start_page)
+
+    def iter_rows(self, start_page: int = 1):
+        """Yields raw row dicts one at a time."""
+        for page_rows in self.iter_pages(start_page=start_page):
+            yield from page_rows
+
+    def fetch_all(self) -> list[dict]:
+        return list(self.iter_rows())
+
+    def to_dataframe(self) -> pd.DataFrame:
+        """Streams all matching rows into a DataFrame with select/link values unwrapped."""
+        return self.fetcher._stream_table_to_dataframe(self.table_id, params=self.to_params())
+
+    def count(self) -> int:
+        """Returns the number of matching rows using a single one-row request."""
+        data = self.fetcher._fetch_rows_page(self.table_id, 1, 1, self.to_params())
+        return int(data.get("count", 0))
@@ -2,15 +2,22 @@
 import pandas as pd
 import os
 import logging
+import pickle
 import unicodedata
 from datetime import datetime
 
-# Assuming cache_manager and BaserowFetcher are in accessible paths
-from utils.cache_manager import load_from_cache, save_to_cache
+# Assuming dataset_cache and BaserowFetcher are in accessible paths
+from utils.dataset_cache import DatasetCache, atomic_write, get_dataset_cache
 # BaserowFetcher is initialized outside and passed in
 
 logger = logging.getLogger(__name__)
 
+# Compiled lookup structures saved in the snapshot. Bump SNAPSHOT_FORMAT when one of them changes shape.
+SNAPSHOT_FORMAT = 1
+SNAPSHOT_FILE = "sku_mapper_snapshot.pkl"
+SNAPSHOT_ATTRIBUTES = ('_sku_to_msku_dict', '_combo_to_mskus_dict', 'combo_incidence',
+                       '_sku_index', '_msku_index', '_asin_index', '_msku_to_asin')
+
 class SKUMapper:
     def __init__(self, baserow_fetcher, sku_mapping_table_id, combo_sku_table_id,
                  amazon_listing_table_id, cache_config, project_root_dir, force_refresh_cache=False):
@@ -39,67 +46,202 @@ class SKUMapper:
         
         self.cache_expiry_days = cache_config.get('expiry_days', 5)
         self.force_refresh_cache = force_refresh_cache
+        self.dataset_cache = get_dataset_cache(self.cache_dir)
+        self.snapshot_enabled = cache_config.get('mapper_snapshot', True)
+
+        # The source tables are loaded on first use, so a mapper restored from its snapshot never reads them.
+        self._fetch_functions = {
+            "sku_mapping_data": lambda: self.fetcher.get_sku_mapping_data(self.sku_mapping_table_id),
+            "combo_sku_data": lambda: self.fetcher.get_combo_sku_data(self.combo_sku_table_id),
+            "asin_mapping_data": lambda: self.fetcher.get_asin_mapping_data(self.amazon_listing_table_id),
+        }
+        self._frames = {}
+        self._frame_versions = {} # cache name -> cache meta 'version' of the frame loaded
 
-        self.mapping_df = self._load_data_with_cache(
-            cache_name="sku_mapping_data",
-            fetch_function=lambda: self.fetcher.get_sku_mapping_data(self.sku_mapping_table_id)
-        )
-        self.combo_df = self._load_data_with_cache(
-            cache_name="combo_sku_data",
-            fetch_function=lambda: self.fetcher.get_combo_sku_data(self.combo_sku_table_id)
-        )
-
-        self.asin_df = self._load_data_with_cache(
-            cache_name="asin_mapping_data",
-            fetch_function=lambda: self.fetcher.get_asin_mapping_data(self.amazon_listing_table_id)
-        )
+        if not (self.snapshot_enabled and not self.force_refresh_cache and self._load_snapshot()):
+            self._compile()
+            if self.snapshot_enabled:
+                self._save_snapshot()
         
+        logger.info(f"SKUMapper initialized. SKU mappings: {len(self._sku_to_msku_dict)}, Combo mappings: {len(self._combo_to_mskus_dict)}, "
+                    f"ASINs: {len(self._asin_index)}")
+
+    def _frame(self, cache_name):
+        if cache_name not in self._frames:
+            self._frames[cache_name] = self._load_data_with_cache(cache_name, self._fetch_functions[cache_name])
+            meta = self.dataset_cache.current_meta(cache_name)
+            self._frame_versions[cache_name] = meta.get("version") if meta else None
+        return self._frames[cache_name]
+
+    @property
+    def mapping_df(self):
+        return self._frame("sku_mapping_data")
+
+    @property
+    def combo_df(self):
+        return self._frame("combo_sku_data")
+
+    @property
+    def asin_df(self):
+        return self._frame("asin_mapping_data")
+
+    def _compile(self):
+        """Builds the lookup dicts and indexes from the source tables."""
         # Pre-process and build dictionaries for faster lookups if dfs are large
         if not self.mapping_df.empty:
             self._sku_to_msku_dict = pd.Series(self.mapping_df.msku.values, index=self.mapping_df.sku).to_dict()
         else:
             self._sku_to_msku_dict = {}
 
-        if not self.combo_df.empty and 'Combo' in self.combo_df.columns:
-            self._combo_to_mskus_dict = {}
-            # Ensure 'Combo' column exists before trying to iterate
-            for _, row in self.combo_df.iterrows():
-                combo_sku_val = row['Combo'] # Already lowercased during fetch
-                if pd.isna(combo_sku_val) or combo_sku_val == '':
-                    continue
-                
-                # Component MSKUs are in columns like SKU1, SKU2, etc.
-                # These columns should contain the MSKUs of the child products.
-                component_mskus = []
-                for col_name in self.combo_df.columns:
-                    if col_name.upper().startswith('SKU') and col_name.upper() != 'SKU': # e.g., SKU1, SKU2
-                        msku_val = row[col_name]
-                        if pd.notna(msku_val) and str(msku_val).strip() != '':
-                            component_mskus.append(str(msku_val).strip())
-                
-                if component_mskus: # Only add if there are actual component MSKUs
-                    self._combo_to_mskus_dict[combo_sku_val] = component_mskus
-        else:
-            self._combo_to_mskus_dict = {}
-        
-        logger.info(f"SKUMapper initialized. SKU mappings: {len(self._sku_to_msku_dict)}, Combo mappings: {len(self._combo_to_mskus_dict)}")
+        self._combo_to_mskus_dict, self.combo_incidence = self.compile_combos(self.combo_df)
+        self._sku_index, self._msku_index, self._asin_index, self._msku_to_asin = self.build_indexes(self.mapping_df, self.asin_df)
 
+    def _snapshot_path(self):
+        return os.path.join(self.dataset_cache.cache_dir, SNAPSHOT_FILE)
+
+    def _source_metas(self):
+        """{dataset name: cache meta} of the source tables when all of them are cached and within their TTL, else None."""
+        metas = {}
+        for cache_name in self._fetch_functions:
+            meta = self.dataset_cache.current_meta(cache_name)
+            age = DatasetCache.age_seconds(meta)
+            if age is None or age >= self.dataset_cache.ttl_for(cache_name, self.cache_expiry_days * 86400):
+                return None
+            metas[cache_name] = meta
+        return metas
+
+    def _load_snapshot(self):
+        """
+        Restores the compiled dicts and indexes from the snapshot when it was built from the
+        versions of the source tables that are cached now. Returns True when it was used.
+        """
+        metas = self._source_metas()
+        if metas is None:
+            return False
+        try:
+            with open(self._snapshot_path(), 'rb') as f:
+                snapshot = pickle.load(f)
+        except FileNotFoundError:
+            return False
+        except Exception as e:
+            logger.warning(f"Could not read the SKU mapper snapshot: {e}. Compiling from the source tables.")
+            return False
+        sources = {cache_name: meta.get("version") for cache_name, meta in metas.items()}
+        if snapshot.get("format") != SNAPSHOT_FORMAT or snapshot.get("sources") != sources:
+            logger.debug("SKU mapper snapshot is out of date; compiling from the source tables.")
+            return False
+        for attribute in SNAPSHOT_ATTRIBUTES:
+            setattr(self, attribute, snapshot[attribute])
+        logger.info(f"SKUMapper restored from its snapshot of {', '.join(f'{n} {v}' for n, v in sources.items())}.")
+        return True
+
+    def _save_snapshot(self):
+        """Saves the compiled dicts and indexes, keyed by the cached versions of the source tables."""
+        metas = self._source_metas()
+        if metas is None:
+            return
+        # Only when the versions compiled are still the cached ones: a refresh during the compile
+        # (e.g. a corrected mapping, same row count) must not be keyed to the old mappings.
+        sources = {cache_name: meta.get("version") for cache_name, meta in metas.items()}
+        if sources != {cache_name: self._frame_versions.get(cache_name) for cache_name in sources}:
+            logger.debug("Source tables changed while the SKU mapper compiled; not saving a snapshot.")
+            return
+        snapshot = {attribute: getattr(self, attribute) for attribute in SNAPSHOT_ATTRIBUTES}
+        snapshot["format"] = SNAPSHOT_FORMAT
+        snapshot["sources"] = sources
+
+        def write(tmp_path):
+            with open(tmp_path, 'wb') as f:
+                pickle.dump(snapshot, f, protocol=pickle.HIGHEST_PROTOCOL)
+        try:
+            atomic_write(self._snapshot_path(), write)
+        except Exception as e:
+            logger.warning(f"Could not save the SKU mapper snapshot: {e}")
+
+    @staticmethod
+    def compile_combos(combo_df):
+        """
+        Compiles the combo table in one pass: the SKU1, SKU2, ... columns are melted into
+        (combo, position, component) rows, blanks dropped, and grouped into tuples.
+
+        Returns:
+            tuple[dict, pd.Series]: {combo SKU: tuple of component MSKUs, in column order}, and the
+            combo -> component incidence matrix in sparse (COO) form: a Series indexed by
+            (Combo, MSKU) holding how many units of the MSKU one combo contains. Multiply combo
+            quantities through it to explode combo demand into component demand.
+        """
+        empty_incidence = pd.Series(dtype='int64', index=pd.MultiIndex.from_arrays([[], []], names=['Combo', 'MSKU']),
+                                    name='units')
+        if combo_df is None or combo_df.empty or 'Combo' not in combo_df.columns:
+            return {}, empty_incidence
+        # Component MSKUs are in columns like SKU1, SKU2, etc.
+        component_columns = [c for c in combo_df.columns if str(c).upper().startswith('SKU') and str(c).upper() != 'SKU']
+        if not component_columns:
+            return {}, empty_incidence
+
+        wide = combo_df[['Combo'] + component_columns].copy()
+        wide['_row'] = range(len(wide))
+        long = wide.melt(id_vars=['Combo', '_row'], value_vars=component_columns, var_name='_slot', value_name='MSKU')
+        long['_slot'] = long['_slot'].map({column: position for position, column in enumerate(component_columns)})
+        long = long[long['Combo'].notna() & (long['Combo'] != '') & long['MSKU'].notna()]
+        long['MSKU'] = long['MSKU'].astype(str).str.strip()
+        long = long[long['MSKU'] != '']
+        # A combo listed twice keeps its last row that has components (Combo is already lowercased during fetch).
+        long = long[long['_row'] == long.groupby('Combo')['_row'].transform('max')].sort_values(['_row', '_slot'])
+
+        combo_to_mskus = long.groupby('Combo', sort=False)['MSKU'].agg(tuple).to_dict()
+        incidence = long.groupby(['Combo', 'MSKU'], sort=False).size().rename('units')
+        return combo_to_mskus, incidence
+
+    @staticmethod
+    def build_indexes(mapping_df, asin_df):
+        """
+        Builds the lookup indexes of the detail lookups, once, from the mapping and ASIN tables.
+
+        Returns:
+            tuple[dict, dict, dict, dict]: sku -> mapping row (first match), msku -> list of mapping
+            rows (table order), asin -> ASIN row (first match) and msku -> asin (first match).
+            Rows are dicts of the table's columns.
+        """
+        sku_index, msku_index, asin_index, msku_to_asin = {}, {}, {}, {}
+        if mapping_df is not None and not mapping_df.empty and 'sku' in mapping_df.columns:
+            for record in mapping_df.to_dict('records'):
+                sku_index.setdefault(record['sku'], record)
+                if 'msku' in record:
+                    msku_index.setdefault(record['msku'], []).append(record)
+        if asin_df is not None and not asin_df.empty and 'asin' in asin_df.columns:
+            for record in asin_df.to_dict('records'):
+                asin_index.setdefault(record['asin'], record)
+                if 'msku' in record:
+                    msku_to_asin.setdefault(record['msku'], record['asin'])
+        return sku_index, msku_index, asin_index, msku_to_asin
+
+    def explode_combo_quantities(self, combo_quantities):
+        """
+        Component demand for combo sales via the incidence matrix: `combo_quantities` is a Series
+        of quantities indexed by combo SKU (normalized); returns the quantities per component MSKU.
+        """
+        incidence = self.combo_incidence.reset_index()
+        demand = incidence.merge(combo_quantities.rename('quantity'), left_on='Combo', right_index=True)
+        return (demand['units'] * demand['quantity']).groupby(demand['MSKU']).sum()
 
     def _load_data_with_cache(self, cache_name, fetch_function):
         """Generic function to load data, using cache if available and not stale."""
         cached_df = None
         if not self.force_refresh_cache:
-            cached_df = load_from_cache(cache_name, self.cache_dir, self.cache_expiry_days)
+            cached_df = self.dataset_cache.get(cache_name, ttl_seconds=self.cache_expiry_days * 86400)
             if cached_df is not None:
                 return cached_df
         
         logger.info(f"Fetching fresh data for '{cache_name}' (force_refresh={self.force_refresh_cache}).")
         try:
-            df = fetch_function()
+            # Single-flight: if another session or process is already fetching this table, wait for its result.
+            df = self.dataset_cache.get_or_fill(cache_name, self._full_refresh(fetch_function) if self.force_refresh_cache else fetch_function,
+                                                ttl_seconds=self.cache_expiry_days * 86400, force=self.force_refresh_cache)
             if df is None or df.empty: # fetch_function might return None or empty df on error/no data
                 # Try to load from cache as a fallback, even if stale, if fetching fails
                 logger.warning(f"Fetching fresh data for '{cache_name}' resulted in empty or None. Attempting to use cache as fallback.")
-                cached_df_fallback = load_from_cache(cache_name, self.cache_dir, self.cache_expiry_days)
+                cached_df_fallback = self.dataset_cache.get(cache_name, allow_stale=True)
                 if cached_df_fallback is not None:
                     logger.warning(f"Using cache (possibly stale) for '{cache_name}' due to fetch issue.")
                     return cached_df_fallback
@@ -107,18 +249,78 @@ class SKUMapper:
                     logger.error(f"No data found for '{cache_name}' from source and no cache available.")
                     return pd.DataFrame() # Return an empty DataFrame
             
-            save_to_cache(df, cache_name, self.cache_dir)
             return df
         except Exception as e:
             logger.error(f"Error loading data for '{cache_name}': {e}")
             # Attempt to load from cache as a fallback if fetching fails, even if stale
-            cached_df_fallback = load_from_cache(cache_name, self.cache_dir, self.cache_expiry_days)
+            cached_df_fallback = self.dataset_cache.get(cache_name, allow_stale=True)
             if cached_df_fallback is not None:
                 logger.warning(f"Using cache (possibly stale) for '{cache_name}' due to critical fetch error.")
                 return cached_df_fallback
             logger.error(f"Critical error loading '{cache_name}' and no cache available. Returning empty DataFrame.")
             return pd.DataFrame() # Return an empty DataFrame on critical error
 
+    def _full_refresh(self, fetch_function):
+        """`fetch_function` run inside the fetcher's full_refresh(), so a forced refresh also rebuilds its delta-sync snapshot."""
+        def fetch():
+            with self.fetcher.full_refresh():
+                return fetch_function()
+        return fetch
+
+    @staticmethod
+    def normalize_sku(platform_sku):
+        """NFKD for compatibility, drop non-ASCII, lowercase and strip: the form SKUs have in the mapping dicts."""
+        return unicodedata.normalize('NFKD', str(platform_sku).strip()).encode('ascii', 'ignore').decode('utf-8').lower()
+
+    def _resolve_normalized_sku(self, normalized_sku):
+        """(list of MSKUs, is_combo) for a normalized SKU, or (None, False) when it does not map. Does not log."""
+        if normalized_sku in self._combo_to_mskus_dict:
+            component_mskus = self._combo_to_mskus_dict[normalized_sku]
+            return (list(component_mskus), True) if component_mskus else (None, False)
+        msku = self._sku_to_msku_dict.get(normalized_sku)
+        if msku is not None and not pd.isna(msku) and str(msku).strip() != '':
+            return [str(msku).strip()], False
+        return None, False
+
+    def map_series(self, platform_skus):
+        """
+        Maps a whole column of platform SKUs. Each distinct SKU is normalized and resolved once.
+
+        Args:
+            platform_skus (pd.Series): SKUs from a platform report (any index).
+
+        Returns:
+            tuple[pd.DataFrame, set]: A long-form frame with columns 'row' (the index label of the
+            SKU in `platform_skus`), 'MSKU' and 'is_combo', with one row per MSKU (a combo gives one
+            per component, in order), ready to join back onto the report; and the set of non-empty
+            SKUs (stripped, as in the report) that could not be mapped. Empty/NaN SKUs are neither.
+        """
+        stripped = platform_skus.astype(object).where(platform_skus.notna(), '').astype(str).str.strip()
+        codes, unique_skus = pd.factorize(stripped, sort=False)
+
+        unique_codes, mskus, is_combo, unmapped = [], [], [], set()
+        for code, sku in enumerate(unique_skus):
+            if not sku:
+                continue
+            normalized_sku = self.normalize_sku(sku)
+            component_mskus, combo = self._resolve_normalized_sku(normalized_sku) if normalized_sku else (None, False)
+            if component_mskus is None:
+                unmapped.add(sku)
+                continue
+            unique_codes.extend([code] * len(component_mskus))
+            mskus.extend(component_mskus)
+            is_combo.extend([combo] * len(component_mskus))
+
+        resolved = pd.DataFrame({'code': pd.Series(unique_codes, dtype='int64'), 'MSKU': pd.Series(mskus, dtype=object),
+                                 'is_combo': pd.Series(is_combo, dtype=bool)})
+        rows = pd.DataFrame({'row': platform_skus.index, 'code': codes})
+        mapped = rows.merge(resolved, on='code', how='inner').drop(columns='code')
+        if unmapped:
+            sample = sorted(unmapped)[:10]
+            logger.warning(f"No MSKU mapping found for {len(unmapped)} SKU(s), e.g. {sample}")
+        logger.debug(f"Mapped {len(unique_skus)} distinct SKUs from {len(platform_skus)} rows into {len(mapped)} MSKU rows.")
+        return mapped, unmapped
+
     def map_sku_to_msku(self, platform_sku):
         """
         Map a single platform SKU to its corresponding MSKU or list of MSKUs for combos.
@@ -136,7 +338,7 @@ class SKUMapper:
 
         try:
             # Normalize SKU: NFKD for compatibility, remove control chars, lowercase, strip whitespace
-            normalized_sku = unicodedata.normalize('NFKD', str(platform_sku).strip()).encode('ascii', 'ignore').decode('utf-8').lower()
+            normalized_sku = self.normalize_sku(platform_sku)
             if not normalized_sku:
                 logger.warning(f"Platform SKU '{platform_sku}' became empty after normalization.")
                 return None
@@ -148,7 +350,7 @@ class SKUMapper:
                 component_mskus = self._combo_to_mskus_dict[normalized_sku]
                 if component_mskus: # Ensure the list is not empty
                     logger.debug(f"SKU '{normalized_sku}' is a combo, maps to MSKUs: {component_mskus}")
-                    return component_mskus
+                    return list(component_mskus)
                 else:
                     logger.warning(f"Combo SKU '{normalized_sku}' found but has no component MSKUs listed.")
                     # Fall through to check standard mapping, or return None based on desired logic
@@ -194,7 +396,13 @@ class SKUMapper:
             return sales_report_df
 
         logger.info(f"Mapping SKUs for sales report using column '{platform_sku_column}'.")
-        sales_report_df['msku_mapped'] = sales_report_df[platform_sku_column].apply(self.map_sku_to_msku)
+        # Map by position so a report with a duplicated index still lines up.
+        mapped, _ = self.map_series(sales_report_df[platform_sku_column].reset_index(drop=True))
+        per_row = mapped.groupby('row', sort=False).agg(mskus=('MSKU', list), is_combo=('is_combo', 'first'))
+        msku_mapped = [None] * len(sales_report_df)
+        for position, mskus, is_combo in zip(per_row.index, per_row['mskus'], per_row['is_combo']):
+            msku_mapped[position] = mskus if is_combo else mskus[0]
+        sales_report_df['msku_mapped'] = pd.Series(msku_mapped, index=sales_report_df.index, dtype=object)
         
         unmapped_count = sales_report_df['msku_mapped'].isnull().sum()
         if unmapped_count > 0:
@@ -216,34 +424,24 @@ class SKUMapper:
             dict or None: A dictionary with keys like 'msku', 'Panel', 'Status'
                           if a match is found, otherwise None.
         """
-        if not platform_sku or pd.isna(platform_sku):
-            return None
+        details = self._lookup_sku(platform_sku)
+        if details is None and platform_sku and not pd.isna(platform_sku):
+            # We don't handle combos in this detailed lookup for now, as they don't have a single Panel/Status
+            logger.warning(f"No mapping details found for SKU: '{platform_sku}'")
+        return details
 
-        try:
-            normalized_sku = unicodedata.normalize('NFKD', str(platform_sku).strip()).encode('ascii', 'ignore').decode('utf-8').lower()
-            if not normalized_sku:
-                return None
-            
-            # We will search directly in the mapping_df for this
-            # This is slightly slower than the pre-built dict but more flexible for getting multiple columns
-            if self.mapping_df.empty:
-                return None
-            
-            match_row = self.mapping_df[self.mapping_df['sku'] == normalized_sku]
-            
-            if not match_row.empty:
-                # Return the first match as a dictionary
-                details = match_row.iloc[0].to_dict()
-                # Ensure keys are consistent if needed (e.g., lowercase)
-                # For now, we assume they match the DataFrame columns: 'msku', 'Panel', 'Status'
-                return details
-            else:
-                # We don't handle combos in this detailed lookup for now, as they don't have a single Panel/Status
-                logger.warning(f"No mapping details found for SKU: '{normalized_sku}' (original: '{platform_sku}')")
-                return None
-        except Exception as e:
-            logger.error(f"Error getting mapping details for SKU '{platform_sku}': {e}", exc_info=True)
+    def get_mapping_details_for_skus(self, platform_skus) -> list[dict | None]:
+        """Bulk get_mapping_details_for_sku: one entry (details dict or None) per SKU, in order."""
+        results = [self._lookup_sku(platform_sku) for platform_sku in platform_skus]
+        self._log_misses("SKU", platform_skus, results)
+        return results
+
+    def _lookup_sku(self, platform_sku):
+        if not platform_sku or pd.isna(platform_sku):
             return None
+        normalized_sku = self.normalize_sku(platform_sku)
+        details = self._sku_index.get(normalized_sku) if normalized_sku else None
+        return dict(details) if details is not None else None
         
     def get_mapping_details_for_msku(self, msku: str) -> list[dict] | None:
         """
@@ -258,60 +456,57 @@ class SKUMapper:
                                 represents a matching row (a platform SKU mapping).
                                 Returns None if no matches are found.
         """
-        if not msku or pd.isna(msku):
-            return None
+        details = self._lookup_msku(msku)
+        if details is None and msku and not pd.isna(msku):
+            logger.warning(f"No mapping details found for MSKU: '{str(msku).strip()}'")
+        return details
 
-        try:
-            # We search directly in the mapping_df for this
-            if self.mapping_df.empty:
-                return None
-            
-            # Find all rows where the 'msku' column matches
-            # We use .strip() and .lower() on the MSKU for a case-insensitive match,
-            # assuming MSKUs should be consistent.
-            # Note: The 'msku' column in the df is already stripped from the fetcher.
-            msku_to_find = str(msku).strip()
-            
-            match_rows = self.mapping_df[self.mapping_df['msku'] == msku_to_find]
-            
-            if not match_rows.empty:
-                # Return all matching rows as a list of dictionaries
-                return match_rows.to_dict('records')
-            else:
-                logger.warning(f"No mapping details found for MSKU: '{msku_to_find}'")
-                return None
-        except Exception as e:
-            logger.error(f"Error getting mapping details for MSKU '{msku}': {e}", exc_info=True)
+    def get_mapping_details_for_mskus(self, mskus) -> list[list[dict] | None]:
+        """Bulk get_mapping_details_for_msku: one entry (list of details dicts or None) per MSKU, in order."""
+        results = [self._lookup_msku(msku) for msku in mskus]
+        self._log_misses("MSKU", mskus, results)
+        return results
+
+    def _lookup_msku(self, msku):
+        if not msku or pd.isna(msku):
             return None
+        # Note: The 'msku' column in the df is already stripped from the fetcher.
+        records = self._msku_index.get(str(msku).strip())
+        return [dict(record) for record in records] if records else None
         
     def get_mapping_details_for_asin(self, asin: str) -> dict | None:
         """
         Finds the mapping record for a single ASIN.
         An ASIN should ideally map to one SKU/MSKU combination.
         """
+        details = self._lookup_asin(asin)
+        if details is None and asin and not pd.isna(asin):
+            logger.warning(f"No mapping details found for ASIN: '{str(asin).strip().upper()}'")
+        return details
+
+    def get_mapping_details_for_asins(self, asins) -> list[dict | None]:
+        """Bulk get_mapping_details_for_asin: one entry (details dict or None) per ASIN, in order."""
+        results = [self._lookup_asin(asin) for asin in asins]
+        self._log_misses("ASIN", asins, results)
+        return results
+
+    def _lookup_asin(self, asin):
         if not asin or pd.isna(asin):
             return None
+        details = self._asin_index.get(str(asin).strip().upper())
+        return dict(details) if details is not None else None
 
-        try:
-            if self.asin_df.empty:
-                return None
-            
-            asin_to_find = str(asin).strip().upper()
-            
-            match_row = self.asin_df[self.asin_df['asin'] == asin_to_find]
-            
-            if not match_row.empty:
-                # Return the first match as a dictionary
-                # We can merge this with the main mapping_df to get Panel info if needed
-                # For now, let's return what's in the asin_df
-                details = match_row.iloc[0].to_dict()
-                return details
-            else:
-                logger.warning(f"No mapping details found for ASIN: '{asin_to_find}'")
-                return None
-        except Exception as e:
-            logger.error(f"Error getting mapping details for ASIN '{asin}': {e}", exc_info=True)
+    def get_asin_for_msku(self, msku: str) -> str | None:
+        """The ASIN listed for an MSKU (the first one in the listing table), or None."""
+        if not msku or pd.isna(msku):
             return None
+        return self._msku_to_asin.get(str(msku).strip())
+
+    @staticmethod
+    def _log_misses(kind, keys, results):
+        missing = [key for key, result in zip(keys, results) if result is None and key and not pd.isna(key)]
+        if missing:
+            logger.warning(f"No mapping details found for {len(missing)} {kind}(s), e.g. {missing[:10]}")
 
     # Placeholder for inventory fetching logic
     # def get_inventory_for_mskus(self, mskus_list):
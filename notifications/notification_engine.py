@@ -4,11 +4,13 @@ from datetime import datetime, timedelta
 import logging
 
 from utils.config_loader import APP_CONFIG
-from data_processing.baserow_fetcher import BaserowFetcher
+from utils.dataset_cache import get_dataset_cache
+from data_processing.async_baserow_fetcher import AsyncBaserowFetcher
 # --- MODIFIED: Import the correct engine functions ---
 from replenishment_engine.core import calculate_sales_stats, run_replenishment_engine
 from po_module.po_management import get_all_pos, get_open_po_data, get_last_order_dates
 from analytics_dashboard.kpi_calculations import process_sales_data_for_analytics as get_sales_data, calculate_total_sales_kpis
+from analytics_dashboard.data_loader import load_sales_data
 
 from .waha_sender import WahaSender
 from .message_generator import generate_low_stock_alert, generate_stale_data_alert, generate_weekly_summary
@@ -24,7 +26,7 @@ def run_all_checks():
         if sender.check_session_status() != "WORKING":
             logger.error("NOTIFICATION_ENGINE: WAHA session is not 'WORKING'. Aborting checks.")
             return
-        fetcher = BaserowFetcher(api_token=APP_CONFIG['baserow']['api_token'], base_url=APP_CONFIG['baserow'].get('base_url'))
+        fetcher = AsyncBaserowFetcher(api_token=APP_CONFIG['baserow']['api_token'], base_url=APP_CONFIG['baserow'].get('base_url'))
     except Exception as e:
         logger.error(f"NOTIFICATION_ENGINE: Failed to initialize tools. Error: {e}", exc_info=True)
         return
@@ -32,10 +34,20 @@ def run_all_checks():
     # --- 2. Load All Necessary Data (remains the same) ---
     logger.info("NOTIFICATION_ENGINE: Loading all required data from Baserow...")
     try:
-        all_sales_df = fetcher.get_table_data_as_dataframe(APP_CONFIG['baserow']['processed_sales_data_table_id'])
-        all_inventory_df = fetcher.get_inventory_data(APP_CONFIG['baserow']['inventory_table_id'])
-        all_category_df = fetcher.get_category_data(APP_CONFIG['baserow']['category_table_id'])
-        all_pos_df = get_all_pos(fetcher, APP_CONFIG['baserow']['purchase_orders_table_id'])
+        # The four tables are fetched at the same time; the wait is roughly that of the slowest one.
+        # Checks always use fresh data, but a table the app is already fetching is waited for and
+        # shared rather than fetched twice; our fetches refresh the app's cache in turn.
+        cache = get_dataset_cache()
+        def shared_fill(dataset_name, fetch):
+            return lambda table_id: cache.get_or_fill(dataset_name, lambda: fetch(table_id), force=True)
+        loaded = fetcher.load_many({
+            'sales': (shared_fill('processed_sales_data', fetcher.get_table_data_as_dataframe), APP_CONFIG['baserow']['processed_sales_data_table_id']),
+            'inventory': (shared_fill('inventory_data', fetcher.get_inventory_data), APP_CONFIG['baserow']['inventory_table_id']),
+            'category': (shared_fill('category_data', fetcher.get_category_data), APP_CONFIG['baserow']['category_table_id']),
+            'pos': (lambda table_id: get_all_pos(fetcher, table_id), APP_CONFIG['baserow']['purchase_orders_table_id']),
+        })
+        all_sales_df, all_inventory_df = loaded['sales'], loaded['inventory']
+        all_category_df, all_pos_df = loaded['category'], loaded['pos']
         if all_sales_df.empty or all_inventory_df.empty or all_category_df.empty:
             logger.warning("NOTIFICATION_ENGINE: One or more essential data tables are empty.")
     except Exception as e:
@@ -49,15 +61,13 @@ def run_all_checks():
     try:
         logger.info("NOTIFICATION_ENGINE: Preparing data and running replenishment engine...")
         
-        # Clean sales data
-        all_sales_df['Sale Date'] = pd.to_datetime(all_sales_df['Sale Date'].astype(str).str.strip(), errors='coerce').dt.date
-        all_sales_df['Quantity Sold'] = pd.to_numeric(all_sales_df['Quantity Sold'], errors='coerce').fillna(0)
-        all_sales_df.dropna(subset=['Sale Date'], inplace=True)
-        
+        # Sales come from the cache fill already typed (see utils/dataset_schemas.py), so there is no cleaning step here.
         # Prepare all inputs for the engine
         max_date = all_sales_df['Sale Date'].max()
         min_date = max_date - timedelta(days=90)
-        daily_sales_for_stats = get_sales_data(all_sales_df, min_date, max_date)
+        # Only the months of the window are read; the full frame is the fallback when the sales aren't cached.
+        window_sales_df = load_sales_data(min_date, max_date)
+        daily_sales_for_stats = get_sales_data(all_sales_df if window_sales_df is None else window_sales_df, min_date, max_date)
         
         # --- FIX 1: Call calculate_sales_stats with the correct argument ---
         sales_stats = calculate_sales_stats(daily_sales_for_stats, sales_history_days=60)
@@ -104,7 +114,7 @@ def run_all_checks():
         threshold_days = waha_config.get('stale_data_threshold_days', 3)
         
         # The 'Sale Date' column is now a proper date object from the cleaning step
-        last_sale_dates_by_account = all_sales_df.groupby(['Platform', 'Account Name'])['Sale Date'].max().reset_index()
+        last_sale_dates_by_account = all_sales_df.groupby(['Platform', 'Account Name'], observed=True)['Sale Date'].max().reset_index()
         
         # --- THIS IS THE FIX for the AttributeError ---
         # Ensure the column is datetime before using .dt accessor
@@ -127,10 +137,10 @@ def run_all_checks():
             logger.info("NOTIFICATION_ENGINE: Running weekly summary check...")
             today = datetime.now().date()
             seven_days_ago = today - timedelta(days=6)
-            weekly_sales_df = get_sales_data(all_sales_df, seven_days_ago, today)
+            window_sales_df = load_sales_data(seven_days_ago, today)
+            weekly_sales_df = get_sales_data(all_sales_df if window_sales_df is None else window_sales_df, seven_days_ago, today)
             weekly_kpis = calculate_total_sales_kpis(weekly_sales_df)
             
-            all_pos_df['Order Date'] = pd.to_datetime(all_pos_df['Order Date'], errors='coerce')
             new_pos_count = len(all_pos_df[all_pos_df['Order Date'] >= (datetime.now() - timedelta(days=7))]['Po No.'].unique())
             
             low_stock_count = len(low_stock_products) if 'low_stock_products' in locals() else 0
@@ -2,6 +2,7 @@
 import requests
 import logging
 import json
+from utils.http_session import get_http_session
 
 logger = logging.getLogger(__name__)
 
@@ -16,6 +17,8 @@ class WahaSender:
         self.base_url = base_url.rstrip('/')
         self.session_name = session_name
         self.headers = {"Content-Type": "application/json"}
+        # Keep-alive connection to the WAHA server, reused across messages and status checks.
+        self.http = get_http_session(self.base_url)
         
         logger.info(f"WahaSender initialized for session '{session_name}' at {self.base_url}")
 
@@ -41,7 +44,7 @@ class WahaSender:
             logger.info(f"WAHA_SENDER: Sending message to group {group_id} via session {self.session_name}.")
             logger.debug(f"WAHA_SENDER: Payload: {json.dumps(payload)}")
             
-            response = requests.post(url, headers=self.headers, json=payload, timeout=15)
+            response = self.http.post(url, headers=self.headers, json=payload, timeout=15)
             response.raise_for_status()
             
             response_json = response.json()
@@ -72,7 +75,7 @@ class WahaSender:
         url = f"{self.base_url}{endpoint}"
         
         try:
-            response = requests.get(url, timeout=10)
+            response = self.http.get(url, timeout=10)
             response.raise_for_status()
             data = response.json()
             
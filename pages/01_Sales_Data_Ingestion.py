@@ -12,6 +12,7 @@ if project_root not in sys.path: sys.path.insert(0, project_root)
 from utils.config_loader import APP_CONFIG
 from data_processing.baserow_fetcher import BaserowFetcher
 from data_processing.sku_mapper import SKUMapper
+from analytics_dashboard.data_loader import refresh_cached_sales_partitions
 from data_ingestion.amazon_parser import AmazonSalesParser
 from data_ingestion.flipkart_parser import FlipkartSalesParser
 from data_ingestion.meesho_parser import MeeshoSalesParser
@@ -212,9 +213,28 @@ if st.button("Process File (Preview Data)", key="ingest_process_file_button", di
                 st.session_state.ingestion_report_end_date_str
             )
         st.session_state.ingestion_data_exists_in_range = data_exists
+        st.session_state.ingestion_retry_as_upsert = False
         st.session_state.ingestion_proceed_with_upload = False # Reset proceed flag
 
 
+# --- Interrupted overwrite uploads (journaled by replace_sales_partition) ---
+if processed_sales_table_id:
+    pending_replacements = fetcher.get_pending_partition_journals(processed_sales_table_id)
+    if pending_replacements:
+        st.warning(f"{len(pending_replacements)} overwrite upload(s) did not finish. Resume them to avoid missing or duplicated sales rows.")
+        for journal in pending_replacements:
+            label = (f"{journal['platform']} / {journal['account_name']}, {journal['start_date']} to {journal['end_date']} "
+                     f"({journal['record_count']} records, stopped at the {journal['phase']} step)")
+            if st.button(f"Resume: {label}", key=f"resume_{os.path.basename(journal['path'])}"):
+                with st.spinner("Resuming upload..."):
+                    resume_report = fetcher.resume_sales_partition(journal['path'])
+                if resume_report:
+                    refresh_cached_sales_partitions(fetcher, processed_sales_table_id, journal['platform'], journal['account_name'],
+                                                    journal['start_date'], journal['end_date'])
+                    st.success(f"Resumed upload finished. {resume_report.summary()}")
+                else:
+                    st.error(f"Resumed upload did not finish. {resume_report.summary()} Check logs and try again.")
+
 # --- Display Preview and Upload Button Logic ---
 if st.session_state.get('ingestion_standardized_df') is not None:
     st.subheader("Preview of Processed Data")
@@ -224,18 +244,37 @@ if st.session_state.get('ingestion_standardized_df') is not None:
     st.markdown(f"---")
     
     if st.session_state.get('ingestion_data_exists_in_range'):
+        overwrite_mode = st.radio(
+            "Overwrite mode",
+            options=["Upsert (send only changes)", "Delete and re-insert overlapping records"],
+            key="ingestion_overwrite_mode",
+            help="Upsert compares the upload with the stored rows by Sale Date, MSKU, Platform and Account Name: "
+                 "new days are created, changed ones updated and unchanged ones skipped. Stored rows of this account "
+                 "inside the report period that are missing from the upload are deleted."
+        )
+        if overwrite_mode.startswith("Upsert"):
+            overwrite_effect = """
+        If you proceed, the stored records of this account within this range are made to match your upload: records for
+        MSKU/date entries that are also in the upload are **UPDATED** where they differ, new entries are created, and stored
+        records within the range that are **not** in your upload are **DELETED**.
+        """
+        else:
+            overwrite_effect = """
+        If you proceed, existing records for specific MSKUs on specific dates within this range that are also present in your new upload will be **DELETED and REPLACED**. 
+        Data outside this new report's specific daily entries but within the overall range will remain untouched unless directly overwritten by a new daily entry.
+        """
         st.warning(f"""
         ⚠️ **Data Overlap Warning!**
         Existing data for **{st.session_state.ingestion_platform_conf['name']} - {st.session_state.ingestion_account_name}**
         has been found within the date range of your current upload 
         (**{st.session_state.ingestion_report_start_date_str}** to **{st.session_state.ingestion_report_end_date_str}**).
-
-        If you proceed, existing records for specific MSKUs on specific dates within this range that are also present in your new upload will be **DELETED and REPLACED**. 
-        Data outside this new report's specific daily entries but within the overall range will remain untouched unless directly overwritten by a new daily entry.
-        """)
+        {overwrite_effect}""")
         if st.button(f"Proceed and Upload {num_records} Records (Overwrite Overlapping)", key="ingest_confirm_overwrite_button"):
             st.session_state.ingestion_proceed_with_upload = True
     else:
+        if st.session_state.get('ingestion_retry_as_upsert'):
+            st.info("The last upload failed part-way. This retry is compared with the stored rows by Sale Date, MSKU, "
+                    "Platform and Account Name, so rows that were already written are not created twice.")
         if st.button(f"Confirm and Upload {num_records} Records to Baserow", key="ingest_confirm_new_upload_button"):
             st.session_state.ingestion_proceed_with_upload = True
 
@@ -247,47 +286,49 @@ if st.session_state.get('ingestion_standardized_df') is not None:
         with st.spinner("Preparing and Uploading to Baserow..."):
             records_to_upload_final = st.session_state.ingestion_records_to_upload
             
-            # Deletion Logic
-            if st.session_state.get('ingestion_data_exists_in_range'):
-                logger.info("Overlap detected. Identifying records to delete...")
-                # Create a list of criteria for records to delete based on the new upload
-                # Each criterion is a dict: {'Sale Date', 'MSKU', 'Platform', 'Account Name'}
-                criteria_for_deletion = []
-                for rec in records_to_upload_final:
-                    criteria_for_deletion.append({
-                        'Sale Date': rec['Sale Date'], # Assumes YYYY-MM-DD string
-                        'MSKU': rec['MSKU'],
-                        'Platform': rec['Platform'],
-                        'Account Name': rec['Account Name']
-                    })
-                
-                # Get IDs of rows in Baserow that match these exact criteria
-                # The get_row_ids_for_criteria needs to be robust.
-                # It should ideally fetch rows matching platform, account, and the MIN/MAX Sale Date of records_to_upload_final,
-                # then locally filter against the full criteria_for_deletion list.
-                if criteria_for_deletion: # Only proceed if there are records to potentially delete/replace
-                    row_ids_to_delete = fetcher.get_row_ids_for_criteria(
-                        processed_sales_table_id,
-                        criteria_for_deletion # Pass the list of specific records from the new upload
-                    )
-                    if row_ids_to_delete:
-                        logger.info(f"Attempting to delete {len(row_ids_to_delete)} existing records before insert.")
-                        delete_success = fetcher.delete_rows_by_ids_one_by_one(processed_sales_table_id, row_ids_to_delete)
-                        if not delete_success:
-                            st.error("Failed to delete existing overlapping records. Upload aborted. Check logs.")
-                            st.stop() # Stop further processing
-                        else:
-                            st.info(f"Successfully deleted {len(row_ids_to_delete)} overlapping records.")
-                    else:
-                        logger.info("No specific existing records found matching the new upload's daily entries for deletion.")
-                else:
-                    logger.info("New upload is empty, no deletion criteria formed.")
-
-
-            # Proceed with upload
-            upload_success = fetcher.batch_create_rows(processed_sales_table_id, records_to_upload_final)
-            if upload_success:
+            retry_as_upsert = st.session_state.get('ingestion_retry_as_upsert', False)
+            upserted = retry_as_upsert or (st.session_state.get('ingestion_data_exists_in_range')
+                                           and st.session_state.get('ingestion_overwrite_mode', '').startswith("Upsert"))
+            if upserted:
+                logger.info("Retrying a failed upload by natural key..." if retry_as_upsert else "Overlap detected. Upserting records by natural key...")
+                # A retry only fills in what is missing: the period had no data before this upload, so nothing is deleted.
+                upload_report = fetcher.upsert_sales_records(
+                    processed_sales_table_id,
+                    records_to_upload_final,
+                    st.session_state.ingestion_report_start_date_str,
+                    st.session_state.ingestion_report_end_date_str,
+                    delete_missing=not retry_as_upsert
+                )
+                st.info(upload_report.summary())
+            elif st.session_state.get('ingestion_data_exists_in_range'):
+                # Overlapping daily entries (same Sale Date, MSKU, Platform, Account Name) are deleted and
+                # replaced in one journaled operation; an interrupted run can be resumed from the banner above.
+                logger.info("Overlap detected. Replacing overlapping records...")
+                upload_report = fetcher.replace_sales_partition(
+                    processed_sales_table_id,
+                    st.session_state.ingestion_platform_conf['name'],
+                    st.session_state.ingestion_account_name,
+                    st.session_state.ingestion_report_start_date_str,
+                    st.session_state.ingestion_report_end_date_str,
+                    records_to_upload_final
+                )
+                if upload_report.deleted_ids:
+                    st.info(f"Successfully deleted {len(upload_report.deleted_ids)} overlapping records.")
+            else:
+                upload_report = fetcher.batch_create_rows(processed_sales_table_id, records_to_upload_final)
+            if upload_report:
                 st.success("Data successfully uploaded to Baserow!")
+                # --- NEW: rewrite only the affected partitions of the local sales cache ---
+                uploaded_dates = [st.session_state.ingestion_report_start_date_str, st.session_state.ingestion_report_end_date_str]
+                uploaded_dates += pd.to_datetime(pd.DataFrame(records_to_upload_final, columns=['Sale Date'])['Sale Date'], errors='coerce').dropna().dt.strftime('%Y-%m-%d').tolist()
+                refresh_cached_sales_partitions(
+                    fetcher,
+                    processed_sales_table_id,
+                    st.session_state.ingestion_platform_conf['name'],
+                    st.session_state.ingestion_account_name,
+                    min(uploaded_dates),
+                    max(uploaded_dates)
+                )
                 if st.session_state.get('ingestion_platform_conf') and st.session_state.get('ingestion_account_name'):
                     platform_slug_for_cache = st.session_state.ingestion_platform_conf['slug']
                     account_name_for_cache = st.session_state.ingestion_account_name
@@ -303,9 +344,39 @@ if st.session_state.get('ingestion_standardized_df') is not None:
                 st.session_state.ingestion_platform_conf = None
                 st.session_state.ingestion_account_name = None
                 st.session_state.ingestion_data_exists_in_range = False
+                st.session_state.ingestion_retry_as_upsert = False
                 st.session_state.ingestion_proceed_with_upload = False
                 st.rerun()
             else:
-                st.error("Failed to upload some or all records to Baserow. Check logs.")
+                st.session_state.ingestion_proceed_with_upload = False
+                if upserted:
+                    # An upsert is idempotent, so the retry sends the whole upload again: what was written is
+                    # left unchanged and the failed creates, updates and deletes are worked out afresh.
+                    # Retrying only the failed records would delete every other stored row of the period.
+                    st.error(f"Failed to upload some records to Baserow. {upload_report.summary()} "
+                             "Click upload again to retry; rows already written are not sent twice. Check logs for details.")
+                elif st.session_state.get('ingestion_data_exists_in_range'):
+                    # Keep only the records of the failed batches. The retry goes through replace_sales_partition
+                    # again, which first removes any row with the same key, so a batch that was written
+                    # despite the error is replaced rather than duplicated.
+                    st.session_state.ingestion_records_to_upload = upload_report.failed_records
+                    st.error(f"Failed to upload some records to Baserow. {upload_report.summary()} "
+                             "Only the failed records are kept; click upload again to retry them. Check logs for details.")
+                else:
+                    # A create batch that failed with a 5xx or a timeout may have been written anyway, so
+                    # re-creating its records could duplicate them. The retry sends the whole upload through
+                    # upsert_sales_records instead, which matches the stored rows by key.
+                    st.session_state.ingestion_retry_as_upsert = True
+                    st.error(f"Failed to upload some records to Baserow. {upload_report.summary()} "
+                             "Some failed batches may have been stored anyway. Click upload again to retry; the upload is "
+                             "compared with the stored rows, so nothing is created twice. Check logs for details.")
+                with st.expander("Failed batches"):
+                    st.dataframe(pd.DataFrame([
+                        {"First record #": b['start'] + 1 if b['start'] is not None else None, "Records": len(b['records']),
+                         "HTTP status": b['status'], "Error": b['error']}
+                        for b in upload_report.failed_batches
+                    ]), hide_index=True)
+                    if upload_report.failed_delete_ids:
+                        st.caption(f"Rows not deleted: {', '.join(map(str, upload_report.failed_delete_ids))}")
         # Reset proceed flag after action or if no action taken
         # st.session_state.ingestion_proceed_with_upload = False # This is now handled by rerun or if block ends
@@ -189,7 +189,7 @@ else:
             with col_plat:
                 st.subheader("By Platform")
                 if 'Platform' in sales_df_daily.columns:
-                    platform_sales = sales_df_daily.groupby('Platform', as_index=False)['Net Revenue'].sum()
+                    platform_sales = sales_df_daily.groupby('Platform', as_index=False, observed=True)['Net Revenue'].sum()
                     platform_sales = platform_sales.sort_values(by='Net Revenue', ascending=False)
                     if not platform_sales.empty:
                         fig_platform_bar = create_bar_chart(platform_sales, x_column='Platform', y_column='Net Revenue', y_column_name='Net Revenue (₹)', title='Revenue by Platform')
@@ -200,7 +200,7 @@ else:
             with col_acc:
                 st.subheader("By Account")
                 if 'Account Name' in sales_df_daily.columns and 'Platform' in sales_df_daily.columns:
-                    sales_df_daily['Platform_Account_Display'] = sales_df_daily['Platform'] + " - " + sales_df_daily['Account Name']
+                    sales_df_daily['Platform_Account_Display'] = sales_df_daily['Platform'].astype(str) + " - " + sales_df_daily['Account Name'].astype(str)
                     account_sales = sales_df_daily.groupby('Platform_Account_Display', as_index=False)['Net Revenue'].sum()
                     account_sales = account_sales.sort_values(by='Net Revenue', ascending=False)
                     if not account_sales.empty:
@@ -214,7 +214,7 @@ else:
             st.header("Top Performing Products")
             if 'MSKU' in sales_df_daily.columns:
                 top_products_df = sales_df_daily.copy()
-                top_products_df['MSKU_Display'] = top_products_df['MSKU'].fillna("Unmapped/Unknown")
+                top_products_df['MSKU_Display'] = top_products_df['MSKU'].astype(object).fillna("Unmapped/Unknown")
                 
                 top_n = st.slider("Number of Top Products:", min_value=3, max_value=20, value=5, key="top_n_slider_overview")
 
@@ -290,7 +290,7 @@ else:
             if all_category_df is not None:
                 profit_df = pd.merge(profit_df, all_category_df[['MSKU', 'Category']], on='MSKU', how='left')
             
-            msku_profit_summary = profit_df.groupby(['MSKU', 'Product Name', 'Category'], as_index=False).agg(
+            msku_profit_summary = profit_df.groupby(['MSKU', 'Product Name', 'Category'], as_index=False, observed=True).agg(
                 total_units_sold=('Quantity Sold', 'sum'),
                 total_net_revenue=('Net Revenue', 'sum'),
                 total_cogs=('Total COGS', 'sum'),
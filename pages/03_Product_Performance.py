@@ -157,7 +157,7 @@ with main_tab1:
 
                 with col_plat_prod:
                     st.markdown("##### By Platform")
-                    platform_sales_msku = sales_df_msku_daily.groupby('Platform', as_index=False)['Net Revenue'].sum()
+                    platform_sales_msku = sales_df_msku_daily.groupby('Platform', as_index=False, observed=True)['Net Revenue'].sum()
                     if not platform_sales_msku.empty:
                         fig_plat_pie_msku = create_pie_chart(platform_sales_msku, names_column='Platform', values_column='Net Revenue', title=f'Revenue by Platform')
                         st.plotly_chart(fig_plat_pie_msku, use_container_width=True)
@@ -165,7 +165,7 @@ with main_tab1:
                         
                 with col_acc_prod:
                     st.markdown("##### By Account")
-                    sales_df_msku_daily['Platform_Account_Display'] = sales_df_msku_daily['Platform'] + " - " + sales_df_msku_daily['Account Name']
+                    sales_df_msku_daily['Platform_Account_Display'] = sales_df_msku_daily['Platform'].astype(str) + " - " + sales_df_msku_daily['Account Name'].astype(str)
                     account_sales_msku = sales_df_msku_daily.groupby('Platform_Account_Display', as_index=False)['Net Revenue'].sum()
                     if not account_sales_msku.empty:
                         fig_acc_pie_msku = create_pie_chart(account_sales_msku, names_column='Platform_Account_Display', values_column='Net Revenue', title=f'Revenue by Account')
@@ -179,7 +179,7 @@ with main_tab1:
                     st.subheader("Profitability Breakdown by Platform & Account")
                     
                     # We already calculated platform_profit_summary in the previous version
-                    platform_profit_summary = profit_df_msku.groupby(['Platform', 'Account Name'], as_index=False).agg(
+                    platform_profit_summary = profit_df_msku.groupby(['Platform', 'Account Name'], as_index=False, observed=True).agg(
                         total_units_sold=('Quantity Sold', 'sum'),
                         total_net_revenue=('Net Revenue', 'sum'),
                         total_cogs=('Total COGS', 'sum'),
@@ -207,7 +207,7 @@ with main_tab1:
                     profit_chart_col1, profit_chart_col2 = st.columns(2)
                     with profit_chart_col1:
                         # Chart showing which platform contributes the most profit
-                        platform_profit_chart_data = platform_profit_summary.groupby('Platform', as_index=False)['total_gross_profit'].sum()
+                        platform_profit_chart_data = platform_profit_summary.groupby('Platform', as_index=False, observed=True)['total_gross_profit'].sum()
                         fig_plat_profit_pie = create_pie_chart(
                             platform_profit_chart_data, 
                             names_column='Platform', 
@@ -219,7 +219,7 @@ with main_tab1:
                     with profit_chart_col2:
                         # Chart showing which platform has the best margin
                         # Calculate weighted average margin per platform
-                        platform_margin_data = platform_profit_summary.groupby('Platform', as_index=False).agg(
+                        platform_margin_data = platform_profit_summary.groupby('Platform', as_index=False, observed=True).agg(
                             total_net_revenue=('total_net_revenue', 'sum'),
                             total_gross_profit=('total_gross_profit', 'sum')
                         )
@@ -296,7 +296,7 @@ with main_tab2:
             st.subheader("Sales Trend Comparison")
             
             # Group by both Date and MSKU to get trends for each
-            trend_data_grouped = comparison_sales_df.groupby(['Sale Date', 'MSKU'], as_index=False)['Net Revenue'].sum()
+            trend_data_grouped = comparison_sales_df.groupby(['Sale Date', 'MSKU'], as_index=False, observed=True)['Net Revenue'].sum()
             
             if not trend_data_grouped.empty:
                 # Use Plotly Express with the 'color' argument to create separate lines for each MSKU
@@ -317,7 +317,7 @@ with main_tab2:
             st.subheader("Sales Breakdown by Channel")
             
             # 1. Breakdown by Platform
-            platform_breakdown_df = comparison_sales_df.groupby(['MSKU', 'Platform'], as_index=False)['Net Revenue'].sum()
+            platform_breakdown_df = comparison_sales_df.groupby(['MSKU', 'Platform'], as_index=False, observed=True)['Net Revenue'].sum()
             if not platform_breakdown_df.empty:
                 fig_platform_breakdown = create_bar_chart(
                     platform_breakdown_df,
@@ -333,8 +333,8 @@ with main_tab2:
                 st.info("Not enough data for platform breakdown.")
 
             # 2. Breakdown by Account
-            comparison_sales_df['Platform_Account_Display'] = comparison_sales_df['Platform'] + " - " + comparison_sales_df['Account Name']
-            account_breakdown_df = comparison_sales_df.groupby(['MSKU', 'Platform_Account_Display'], as_index=False)['Net Revenue'].sum()
+            comparison_sales_df['Platform_Account_Display'] = comparison_sales_df['Platform'].astype(str) + " - " + comparison_sales_df['Account Name'].astype(str)
+            account_breakdown_df = comparison_sales_df.groupby(['MSKU', 'Platform_Account_Display'], as_index=False, observed=True)['Net Revenue'].sum()
             if not account_breakdown_df.empty:
                 fig_account_breakdown = create_bar_chart(
                     account_breakdown_df,
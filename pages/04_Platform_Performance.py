@@ -104,7 +104,7 @@ else:
         st.header("Performance by Platform")
         
         # Aggregate data by platform
-        platform_performance_df = sales_df_daily.groupby('Platform', as_index=False).agg(
+        platform_performance_df = sales_df_daily.groupby('Platform', as_index=False, observed=True).agg(
             total_net_revenue=('Net Revenue', 'sum'),
             total_units_sold=('Quantity Sold', 'sum')
         )
@@ -136,7 +136,7 @@ else:
         st.header("Performance by Account")
         
         # Create a combined display column
-        sales_df_daily['Platform_Account_Display'] = sales_df_daily['Platform'] + " - " + sales_df_daily['Account Name']
+        sales_df_daily['Platform_Account_Display'] = sales_df_daily['Platform'].astype(str) + " - " + sales_df_daily['Account Name'].astype(str)
         
         account_performance_df = sales_df_daily.groupby('Platform_Account_Display', as_index=False).agg(
             total_net_revenue=('Net Revenue', 'sum'),
@@ -215,7 +215,7 @@ else:
             top_product_df_filtered = sales_df_daily[sales_df_daily['Platform_Account_Display'] == selected_account_for_top]
             
             # Group by MSKU and aggregate
-            top_product_df_agg = top_product_df_filtered.groupby('MSKU', as_index=False).agg(
+            top_product_df_agg = top_product_df_filtered.groupby('MSKU', as_index=False, observed=True).agg(
                 total_net_revenue=('Net Revenue', 'sum'),
                 total_units_sold=('Quantity Sold', 'sum')
             ).nlargest(10, 'total_net_revenue') # Get top 10 by revenue
@@ -295,7 +295,7 @@ if project_root not in sys.path: sys.path.insert(0, project_root)
 
 from utils.config_loader import APP_CONFIG
 from data_processing.baserow_fetcher import BaserowFetcher
-from analytics_dashboard.data_loader import load_and_cache_analytics_data
+from analytics_dashboard.data_loader import load_and_cache_analytics_data, load_sales_data
 from analytics_dashboard.kpi_calculations import (
     process_sales_data_for_analytics as get_sales_data,
     get_current_inventory,
@@ -423,7 +423,9 @@ with product_tab:
             with st.spinner("Running advanced replenishment calculations..."):
                 max_date = all_sales_df['Sale Date'].max()
                 min_date = max_date - timedelta(days=60)
-                daily_sales_for_stats = get_sales_data(all_sales_df, min_date, max_date)
+                # Only the months of the window are read; the session's frame is the fallback when the sales aren't cached.
+                window_sales_df = load_sales_data(min_date, max_date)
+                daily_sales_for_stats = get_sales_data(all_sales_df if window_sales_df is None else window_sales_df, min_date, max_date)
                 
                 sales_stats = calculate_sales_stats(daily_sales_for_stats , sales_history_days=60)
                 open_po_data = get_open_po_data(all_pos_df)
@@ -13,13 +13,15 @@ if project_root not in sys.path: sys.path.insert(0, project_root)
 from utils.config_loader import APP_CONFIG
 from data_processing.baserow_fetcher import BaserowFetcher
 from analytics_dashboard.data_loader import load_and_cache_analytics_data
+from utils.cache_registry import cache_status, evict_in_background, refresh_in_background
+from utils.cache_warmer import read_history
 
 import logging
 logger = logging.getLogger(__name__)
 
 st.set_page_config(page_title="Cache Management - RMS", layout="wide")
 st.title("🔄 Cache Management")
-st.markdown("Force a refresh of the local data cache from Baserow. The app uses cached data by default to load faster. Refreshing here will pull the latest data for your next session or page load.")
+st.markdown("Inspect and refresh the local data cache. The app uses cached data by default to load faster. Refreshing here pulls the latest data from Baserow for every session.")
 
 # --- Initialize Tools & Config ---
 @st.cache_resource
@@ -41,68 +43,75 @@ po_table_id = APP_CONFIG['baserow'].get('purchase_orders_table_id')
 
 # --- Display Cache Status ---
 st.header("Current Cache Status")
-
-cache_dir = os.path.join(project_root, APP_CONFIG.get('cache', {}).get('directory', '.rms_cache'))
-datasets_to_manage = {
-    "Processed Sales Data": "processed_sales_data",
-    "Inventory Data": "inventory_data",
-    "Category Data": "category_data",
-    "Catalogue Data": "catalogue_data",
-    # We can add POs and others here too
-}
-
-status_data = []
-for display_name, cache_name in datasets_to_manage.items():
-    meta_path = os.path.join(cache_dir, f"{cache_name}_meta.json")
-    status = "Not Cached"
-    last_updated = "N/A"
-    if os.path.exists(meta_path):
-        try:
-            with open(meta_path, 'r') as f:
-                meta = json.load(f)
-            last_updated_dt = datetime.fromisoformat(meta.get("last_updated"))
-            last_updated = last_updated_dt.strftime('%Y-%m-%d %H:%M:%S')
-            status = "Cached"
-        except Exception:
-            status = "Cache Invalid"
-    status_data.append({"Dataset": display_name, "Status": status, "Last Updated": last_updated})
-
-st.dataframe(pd.DataFrame(status_data), use_container_width=True)
+st.caption("Hits and misses are counted since this app process started. Derived artifacts are values computed from the datasets (sales stats, open PO data, ...), cached by their input data.")
+
+def _mb(nbytes):
+    return round(nbytes / (1024 * 1024), 2) if nbytes else 0.0
+
+status_rows = cache_status()
+status_df = pd.DataFrame([{
+    "Type": "Dataset" if row["kind"] == "dataset" else "Derived",
+    "Name": row["label"],
+    "Status": row["status"] + (" (refreshing…)" if row["refreshing"] else ""),
+    "Age (h)": row["age_hours"],
+    "TTL (h)": row["ttl_hours"],
+    "Rows": row["rows"],
+    "Disk (MB)": _mb(row["disk_bytes"]),
+    "Memory (MB)": _mb(row["memory_bytes"]),
+    "Last Fetch (s)": row["last_fetch_seconds"],
+    "Hits": row["hits"],
+    "Misses": row["misses"],
+    "Hit Ratio": row["hit_ratio"],
+    "Last Updated": row["last_updated"][:19].replace('T', ' ') if row["last_updated"] else "N/A",
+} for row in status_rows])
+
+st.dataframe(status_df, use_container_width=True, hide_index=True)
+if st.button("Reload Status"):
+    st.rerun()
 
 st.divider()
 
-# --- Refresh Buttons ---
-st.header("Refresh Cache from Baserow")
+# --- Per-Dataset Actions ---
+st.header("Refresh or Evict")
+st.markdown("Refreshes run in the background: pages keep using the cached data until the new version is written, then pick it up on their next rerun. Evicting removes the cached files, so the next page load fetches the data from Baserow again.")
 
-col1, col2, col3, col4 = st.columns(4)
+datasets = {row["label"]: row["name"] for row in status_rows if row["kind"] == "dataset"}
+artifacts = {row["label"]: row["name"] for row in status_rows if row["kind"] == "derived"}
 
+col1, col2 = st.columns(2)
 with col1:
-    if st.button("Refresh Sales Data", use_container_width=True):
-        with st.spinner("Forcing refresh of Sales Data..."):
-            load_and_cache_analytics_data(fetcher, sales_table_id, None, None, None, force_reload=True)
-            st.success("Sales Data cache updated!")
-            st.rerun()
+    selected_dataset = st.selectbox("Dataset", list(datasets))
+    refresh_col, evict_col = st.columns(2)
+    if refresh_col.button("Refresh in Background", use_container_width=True):
+        st.info(refresh_in_background(datasets[selected_dataset], fetcher))
+    if evict_col.button("Evict Dataset", use_container_width=True):
+        evict_in_background(datasets[selected_dataset])
+        st.success(f"Evicting {selected_dataset} in the background.")
 
 with col2:
-    if st.button("Refresh Inventory Data", use_container_width=True):
-        with st.spinner("Forcing refresh of Inventory Data..."):
-            load_and_cache_analytics_data(fetcher, None, inventory_table_id, None, None, force_reload=True)
-            st.success("Inventory Data cache updated!")
-            st.rerun()
-
-with col3:
-    if st.button("Refresh Category Data", use_container_width=True):
-        with st.spinner("Forcing refresh of Category Data..."):
-            load_and_cache_analytics_data(fetcher, None, None, category_table_id, None, force_reload=True)
-            st.success("Category Data cache updated!")
-            st.rerun()
-
-with col4:
-    if st.button("Refresh Catalogue Data", use_container_width=True):
-        with st.spinner("Forcing refresh of Catalogue Data..."):
-            load_and_cache_analytics_data(fetcher, None, None, None, catalogue_table_id, force_reload=True)
-            st.success("Catalogue Data cache updated!")
-            st.rerun()
+    if artifacts:
+        selected_artifact = st.selectbox("Derived artifact", list(artifacts))
+        if st.button("Evict Artifact", use_container_width=True):
+            evict_in_background(artifacts[selected_artifact], kind="derived")
+            st.success(f"Evicting {selected_artifact} in the background.")
+    else:
+        st.caption("No derived artifacts have been computed in this process yet.")
+
+st.divider()
+
+# --- Cache Warmer Runs ---
+st.header("Cache Warmer")
+warmer_runs = read_history(limit=10)
+if warmer_runs:
+    st.dataframe(pd.DataFrame([{
+        "Started": run["started"][:19].replace('T', ' '),
+        "Total (s)": run["seconds"],
+        "Datasets": ", ".join(f"{name} {record['seconds']}s" + ("" if record["status"] == "ok" else " (failed)")
+                              for name, record in run["datasets"].items()) or "all warm",
+        "Derived": ", ".join(f"{name} {record['seconds']}s" for name, record in run["derived"].items()),
+    } for run in warmer_runs]), use_container_width=True, hide_index=True)
+else:
+    st.caption("No cache warmer runs recorded. Start `python run_cache_warmer.py` beside the app to keep the cache warm.")
 
 st.divider()
 if st.button("🔄 REFRESH ALL DATASETS", type="primary", use_container_width=True):
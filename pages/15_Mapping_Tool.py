@@ -74,9 +74,8 @@ def enrich_row(
     if inc_asin:
         if base_details_asin:
             result_row['Mapped ASIN'] = base_details_asin.get('asin', 'NOT FOUND')
-        elif primary_msku and sku_mapper.asin_df is not None:
-            asin_row = sku_mapper.asin_df[sku_mapper.asin_df['msku'] == primary_msku]
-            result_row['Mapped ASIN'] = asin_row.iloc[0].get('asin', 'N/A') if not asin_row.empty else 'NOT FOUND'
+        elif primary_msku:
+            result_row['Mapped ASIN'] = sku_mapper.get_asin_for_msku(primary_msku) or 'NOT FOUND'
         else:
             result_row['Mapped ASIN'] = 'NOT FOUND'
     if inc_panel: result_row['Mapped Panel'] = base_details_sku.get('Panel', 'N/A')
@@ -84,27 +83,27 @@ def enrich_row(
     
     # Enrich with data from other sources if we have a valid MSKU
     if primary_msku:
-        if (inc_category or inc_cogs or inc_vendor or inc_lead_time) and all_category_df is not None:
-            cat_row = all_category_df[all_category_df['MSKU'] == primary_msku]
-            if not cat_row.empty:
-                if inc_category: result_row['Product Category'] = cat_row.iloc[0].get('Category', 'N/A')
-                if inc_cogs: result_row['COGS (INR)'] = cat_row.iloc[0].get('Cost Inc.GST', 'N/A')
-                if inc_vendor: result_row['Vendor'] = cat_row.iloc[0].get('Supplier', 'N/A')
-                if inc_lead_time: result_row['Vendor Lead Time'] = cat_row.iloc[0].get('Vendor Lead Time (days)', 'N/A')
+        if inc_category or inc_cogs or inc_vendor or inc_lead_time:
+            cat_row = category_by_msku.get(primary_msku)
+            if cat_row is not None:
+                if inc_category: result_row['Product Category'] = cat_row.get('Category', 'N/A')
+                if inc_cogs: result_row['COGS (INR)'] = cat_row.get('Cost Inc.GST', 'N/A')
+                if inc_vendor: result_row['Vendor'] = cat_row.get('Supplier', 'N/A')
+                if inc_lead_time: result_row['Vendor Lead Time'] = cat_row.get('Vendor Lead Time (days)', 'N/A')
         
-        if inc_inventory and all_inventory_df is not None:
-            inv_row = all_inventory_df[all_inventory_df['MSKU'] == primary_msku]
-            if not inv_row.empty: result_row['Current Inventory'] = inv_row.iloc[0].get('Current Inventory', 0)
+        if inc_inventory:
+            inv_row = inventory_by_msku.get(primary_msku)
+            if inv_row is not None: result_row['Current Inventory'] = inv_row.get('Current Inventory', 0)
         
-        if (inc_sales_30d or inc_last_sale) and sales_stats is not None:
-            stats_row = sales_stats[sales_stats['MSKU'] == primary_msku]
-            if not stats_row.empty:
-                if inc_sales_30d: result_row['30-Day Avg Sales'] = stats_row.iloc[0].get('avg_daily_sales', 0)
-                if inc_last_sale: result_row['Last Sale Date'] = stats_row.iloc[0].get('last_sale_date')
+        if inc_sales_30d or inc_last_sale:
+            stats_row = sales_stats_by_msku.get(primary_msku)
+            if stats_row is not None:
+                if inc_sales_30d: result_row['30-Day Avg Sales'] = stats_row.get('avg_daily_sales', 0)
+                if inc_last_sale: result_row['Last Sale Date'] = stats_row.get('last_sale_date')
         
-        if inc_last_order and last_orders is not None:
-            order_row = last_orders[last_orders['MSKU'] == primary_msku]
-            if not order_row.empty: result_row['Last Order Date'] = order_row.iloc[0].get('last_order_date')
+        if inc_last_order:
+            order_row = last_orders_by_msku.get(primary_msku)
+            if order_row is not None: result_row['Last Order Date'] = order_row.get('last_order_date')
             
     return result_row
 
@@ -163,6 +162,12 @@ def precompute_enrichment_data(_sales_df, _pos_df):
 
 sales_stats, last_orders = precompute_enrichment_data(all_sales_df, all_pos_df)
 
+def index_by_msku(df):
+    """{MSKU: first row of `df` for it, as a dict}, so enrich_row does one dict lookup per source."""
+    if df is None or df.empty or 'MSKU' not in df.columns:
+        return {}
+    return df.drop_duplicates(subset=['MSKU'], keep='first').set_index('MSKU').to_dict('index')
+
 # --- Sidebar Controls ---
 st.sidebar.header("Mapping Controls")
 if st.sidebar.button("🔄 Refresh All Mapping Data from Baserow"):
@@ -280,14 +285,25 @@ if st.session_state.mapper_input_df is not None:
     if st.button("Run Lookup & Enrich", disabled=(not source_column)):
         with st.spinner("Looking up data..."):
             results_list = []
+            category_by_msku = index_by_msku(all_category_df)
+            inventory_by_msku = index_by_msku(all_inventory_df)
+            sales_stats_by_msku = index_by_msku(sales_stats)
+            last_orders_by_msku = index_by_msku(last_orders)
             
-            for index, row in input_df.iterrows():
-                source_value = row[source_column]
+            source_values = input_df[source_column].tolist()
+            # One bulk lookup for the whole column instead of a lookup per input line.
+            if map_from_type == "Platform SKU":
+                all_mapped_details = sku_mapper.get_mapping_details_for_skus(source_values)
+            elif map_from_type == "MSKU":
+                all_mapped_details = sku_mapper.get_mapping_details_for_mskus(source_values)
+            else:
+                all_mapped_details = sku_mapper.get_mapping_details_for_asins(source_values)
+
+            for source_value, mapped_details in zip(source_values, all_mapped_details):
                 per_source_results = []
                 
                 # --- THIS IS THE REFACTORED LOGIC ---
                 if map_from_type == "Platform SKU":
-                    mapped_details = sku_mapper.get_mapping_details_for_sku(source_value)
                     primary_msku = mapped_details.get('msku') if mapped_details else None
                     result_row = {source_column: source_value}
                     enriched_row = enrich_row(result_row, primary_msku, base_details_sku=mapped_details)
@@ -295,7 +311,7 @@ if st.session_state.mapper_input_df is not None:
 
                 elif map_from_type == "MSKU":
                     primary_msku = source_value
-                    mapped_details_list = sku_mapper.get_mapping_details_for_msku(primary_msku)
+                    mapped_details_list = mapped_details
                     
                     if mapped_details_list:
                         # Create a new row for EACH mapped platform SKU
@@ -310,7 +326,6 @@ if st.session_state.mapper_input_df is not None:
                         per_source_results.append(enriched_row)
 
                 elif map_from_type == "ASIN":
-                    mapped_details = sku_mapper.get_mapping_details_for_asin(source_value)
                     primary_msku = mapped_details.get('msku') if mapped_details else None
                     result_row = {source_column: source_value}
                     enriched_row = enrich_row(result_row, primary_msku, base_details_asin=mapped_details)
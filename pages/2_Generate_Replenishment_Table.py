@@ -181,15 +181,14 @@ def process_single_sales_file(file_path, sku_col_name, qty_cols, platform_name,
             df[q_col] = pd.to_numeric(df[q_col], errors='coerce').fillna(0)
             df['calculated_quantity'] += df[q_col]
         
-        for _, row in df.iterrows():
-            platform_sku = row[sku_col_name]; quantity = row['calculated_quantity']
-            msku_result = sku_mapper_instance.map_sku_to_msku(platform_sku)
-            if msku_result:
-                mskus_to_update = [msku_result] if isinstance(msku_result, str) else msku_result
-                for m_item in mskus_to_update:
-                    if m_item: sales_dict[m_item] = sales_dict.get(m_item, 0) + quantity; processed_mskus_set.add(m_item)
-            elif platform_sku and not pd.isna(platform_sku):
-                unmapped_list.append({'Platform SKU': platform_sku, 'Platform': platform_name, 'Account': account_name, 'Report Type': report_desc})
+        # Each distinct SKU is mapped once; a combo's quantity counts for each of its components.
+        df = df.reset_index(drop=True)
+        mapped, _ = sku_mapper_instance.map_series(df[sku_col_name])
+        for m_item, quantity in zip(mapped['MSKU'], df['calculated_quantity'].to_numpy()[mapped['row'].to_numpy()]):
+            sales_dict[m_item] = sales_dict.get(m_item, 0) + quantity; processed_mskus_set.add(m_item)
+        unmapped_skus = df.loc[~df.index.isin(mapped['row']), sku_col_name]
+        for platform_sku in unmapped_skus[unmapped_skus.notna() & (unmapped_skus.astype(str) != '')]:
+            unmapped_list.append({'Platform SKU': platform_sku, 'Platform': platform_name, 'Account': account_name, 'Report Type': report_desc})
     except Exception as e:
         st.error(f"Error processing {report_desc} for {platform_name}-{account_name}: {e}")
         logger.error(f"Error processing {report_desc} for {platform_name}-{account_name}: {e}", exc_info=True)
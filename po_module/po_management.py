@@ -6,6 +6,9 @@ import json
 from datetime import datetime
 import numpy as np 
 
+from utils.dataset_schemas import DATASET_SCHEMAS
+from utils.derived_cache import derived_artifact, get_derived_cache
+
 logger = logging.getLogger(__name__)
 
 # --- Core PO Data Functions ---
@@ -16,29 +19,9 @@ def get_all_pos(fetcher, po_table_id: int) -> pd.DataFrame:
     po_df = fetcher.get_table_data_as_dataframe(po_table_id)
     if po_df is None or po_df.empty:
         return pd.DataFrame()
-    
-    # --- CORRECTED DATE FORMAT ---
-    # The format string now matches your sample data like "9-Dec-2024"
-    date_format = "%d-%b-%Y"
-    
-    if 'Order Date' in po_df.columns:
-        # We apply the correct format here
-        po_df['Order Date'] = pd.to_datetime(po_df['Order Date'], format=date_format, errors='coerce')
-    
-    if 'Arrive by' in po_df.columns:
-        po_df['Arrive by'] = pd.to_datetime(po_df['Arrive by'], format=date_format, errors='coerce')
-        
-    if 'Actual Receiving Date' in po_df.columns:
-        po_df['Actual Receiving Date'] = pd.to_datetime(po_df['Actual Receiving Date'], format=date_format, errors='coerce')
-    # --- END FIX ---
-
-    # Convert other columns as before
-    if 'Quantity' in po_df.columns:
-        po_df['Quantity'] = pd.to_numeric(po_df['Quantity'], errors='coerce').fillna(0)
-    if 'INR Amt' in po_df.columns:
-        po_df['INR Amt'] = pd.to_numeric(po_df['INR Amt'], errors='coerce').fillna(0)
-    
-    return po_df
+
+    # Dates ("9-Dec-2024") and amounts are typed by the declared schema of the PO table.
+    return DATASET_SCHEMAS['purchase_orders_data'].apply(po_df)
 
 def get_po_details(po_df: pd.DataFrame, po_number: str) -> pd.DataFrame:
     """Filters the main PO DataFrame to get all line items for a specific PO number."""
@@ -51,16 +34,21 @@ def create_po_line_item(fetcher, po_table_id: int, data_dict: dict) -> bool:
     logger.info(f"PO_MGMT: Creating new PO line item in table {po_table_id} for PO: {data_dict.get('Po No.')}")
     # This function already saves dates in the standard 'YYYY-MM-DD' format, which is good.
     # The warning only appears when reading inconsistent, manually entered data.
-    return fetcher.batch_create_rows(po_table_id, [data_dict])
+    created = bool(fetcher.batch_create_rows(po_table_id, [data_dict]))
+    if created:
+        get_derived_cache().invalidate_dependents('purchase_orders_data')
+    return created
 
 def update_po_line_item(fetcher, po_table_id: int, row_id: int, data_dict: dict) -> bool:
     """Updates an existing PO line item row."""
     logger.info(f"PO_MGMT: Updating PO line item row {row_id} in table {po_table_id}")
     url = f"{fetcher.base_url}/api/database/rows/table/{po_table_id}/{row_id}/?user_field_names=true"
+    response = None
     try:
-        response = requests.patch(url, headers=fetcher.headers, json=data_dict)
+        response = fetcher.http.request("PATCH", url, category="write", headers=fetcher.headers, json=data_dict)
         response.raise_for_status()
         logger.info(f"Successfully updated row {row_id}.")
+        get_derived_cache().invalidate_dependents('purchase_orders_data')
         return True
     except requests.exceptions.RequestException as e:
         logger.error(f"Error updating row {row_id}: {e}", exc_info=True)
@@ -70,7 +58,10 @@ def update_po_line_item(fetcher, po_table_id: int, row_id: int, data_dict: dict)
 def delete_po_line_item(fetcher, po_table_id: int, row_id: int) -> bool:
     """Deletes a specific PO line item row."""
     logger.info(f"PO_MGMT: Deleting PO line item row {row_id} from table {po_table_id}")
-    return fetcher.delete_single_row(po_table_id, row_id) # Reuse existing working method
+    deleted = fetcher.delete_single_row(po_table_id, row_id) # Reuse existing working method
+    if deleted:
+        get_derived_cache().invalidate_dependents('purchase_orders_data')
+    return deleted
 
 # --- File Handling Functions ---
 
@@ -82,12 +73,13 @@ def upload_file_to_baserow(fetcher, file_bytes, filename: str) -> dict | None:
     """
     logger.info(f"PO_MGMT: Uploading file '{filename}' to Baserow user files.")
     url = f"{fetcher.base_url}/api/user-files/upload-file/"
+    response = None
     try:
         files = {'file': (filename, file_bytes)}
         # Note: For file uploads, we don't send a JSON content-type header
         upload_headers = {"Authorization": fetcher.headers["Authorization"]}
         
-        response = requests.post(url, headers=upload_headers, files=files)
+        response = fetcher.http.request("POST", url, category="write", headers=upload_headers, files=files)
         response.raise_for_status()
         
         file_data = response.json()
@@ -163,6 +155,8 @@ def get_msku_cost_details(category_df: pd.DataFrame, msku: str) -> dict:
     }
     return cost_info
 
+# PO_Details holds lists of dicts, which parquet would turn into arrays; keep it in memory only.
+@derived_artifact('purchase_orders_data', persist=False)
 def get_open_po_data(all_pos_df: pd.DataFrame) -> pd.DataFrame:
     """
     Aggregates data for all open POs to get on-order quantities
@@ -233,6 +227,7 @@ def get_open_po_data(all_pos_df: pd.DataFrame) -> pd.DataFrame:
     return final_open_po_df
 
 
+@derived_artifact('purchase_orders_data')
 def get_last_order_dates(all_pos_df: pd.DataFrame) -> pd.DataFrame:
     """
     Finds the most recent 'Order Date' for each MSKU from all POs.
@@ -257,6 +252,7 @@ def get_last_order_dates(all_pos_df: pd.DataFrame) -> pd.DataFrame:
     return last_dates
 
 
+@derived_artifact('purchase_orders_data')
 def get_last_landed_costs(all_pos_df: pd.DataFrame) -> pd.DataFrame:
     """
     Calculates the most recent and second most recent 'Final Cost With Packaging' for each MSKU.
@@ -239,8 +239,11 @@ import numpy as np
 from datetime import datetime, timedelta
 import logging
 
+from utils.derived_cache import derived_artifact
+
 logger = logging.getLogger(__name__)
 
+@derived_artifact('processed_sales_data')
 def calculate_sales_stats(daily_sales_df: pd.DataFrame, sales_history_days: int = 60) -> pd.DataFrame:
     """
     Calculates simple sales statistics for each MSKU from daily sales data.
@@ -263,10 +266,10 @@ def calculate_sales_stats(daily_sales_df: pd.DataFrame, sales_history_days: int
     
     date_range = pd.date_range(start=start_date, end=most_recent_date, freq='D').date
     multi_index = pd.MultiIndex.from_product([all_mskus, date_range], names=['MSKU', 'Sale Date'])
-    sales_grouped = sales_in_period.groupby(['MSKU', 'Sale Date'])['Quantity Sold'].sum()
+    sales_grouped = sales_in_period.groupby(['MSKU', 'Sale Date'], observed=True)['Quantity Sold'].sum()
     sales_full = sales_grouped.reindex(multi_index, fill_value=0).reset_index()
     
-    stats = sales_full.groupby('MSKU').agg(
+    stats = sales_full.groupby('MSKU', observed=True).agg(
         total_sales_period=('Quantity Sold', 'sum'),
         days_with_sales=('Quantity Sold', lambda x: (x > 0).sum())
     ).reset_index()
@@ -275,19 +278,19 @@ def calculate_sales_stats(daily_sales_df: pd.DataFrame, sales_history_days: int
     # --- NEW: Calculate fixed 30-day and 60-day total sales ---
     start_date_30d = most_recent_date - timedelta(days=29)
     sales_last_30d = daily_sales_df[daily_sales_df['Sale Date'] >= start_date_30d]
-    total_sales_30d = sales_last_30d.groupby('MSKU')['Quantity Sold'].sum().reset_index()
+    total_sales_30d = sales_last_30d.groupby('MSKU', observed=True)['Quantity Sold'].sum().reset_index()
     total_sales_30d.rename(columns={'Quantity Sold': 'Total Sales (30d)'}, inplace=True)
 
     start_date_60d = most_recent_date - timedelta(days=59)
     sales_last_60d = daily_sales_df[daily_sales_df['Sale Date'] >= start_date_60d]
-    total_sales_60d = sales_last_60d.groupby('MSKU')['Quantity Sold'].sum().reset_index()
+    total_sales_60d = sales_last_60d.groupby('MSKU', observed=True)['Quantity Sold'].sum().reset_index()
     total_sales_60d.rename(columns={'Quantity Sold': 'Total Sales (60d)'}, inplace=True)
 
 
     
     stats['avg_daily_sales'] = stats['total_sales_period'] / sales_history_days
     
-    last_sale_dates = daily_sales_df[daily_sales_df['Quantity Sold'] > 0].groupby('MSKU')['Sale Date'].max().reset_index()
+    last_sale_dates = daily_sales_df[daily_sales_df['Quantity Sold'] > 0].groupby('MSKU', observed=True)['Sale Date'].max().reset_index()
     last_sale_dates.columns = ['MSKU', 'last_sale_date']
 
 
@@ -0,0 +1,63 @@
+# RMS/run_cache_warmer.py
+import argparse
+import os
+import sys
+import logging
+
+# Add the project root to the Python path
+project_root = os.path.dirname(os.path.abspath(__file__))
+if project_root not in sys.path:
+    sys.path.insert(0, project_root)
+
+from utils.config_loader import APP_CONFIG
+from utils.cache_warmer import run_forever, warm_caches
+from data_processing.async_baserow_fetcher import AsyncBaserowFetcher
+
+# --- Setup Logging with UTF-8 Encoding ---
+log_config = APP_CONFIG.get('logging', {})
+log_file = log_config.get('file_name', 'rms_app.log')
+log_level = getattr(logging, log_config.get('level', 'INFO').upper(), logging.INFO)
+log_format = log_config.get('format', '%(asctime)s - %(name)s - %(levelname)s - %(message)s')
+
+# Create handlers with explicit encoding
+file_handler = logging.FileHandler(os.path.join(project_root, log_file), encoding='utf-8')
+stream_handler = logging.StreamHandler() # Console
+
+# Set formatters
+formatter = logging.Formatter(log_format)
+file_handler.setFormatter(formatter)
+stream_handler.setFormatter(formatter)
+
+# Get the root logger and add handlers
+logger_root = logging.getLogger()
+logger_root.setLevel(log_level)
+# Clear existing handlers to avoid duplicate logs
+if logger_root.hasHandlers():
+    logger_root.handlers.clear()
+logger_root.addHandler(file_handler)
+logger_root.addHandler(stream_handler)
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Keeps the RMS cache warm: refreshes datasets before they expire, then the derived sales stats.")
+    parser.add_argument("--once", action="store_true", help="Run a single warming pass and exit (for cron/n8n) instead of following cache_warmer.interval_minutes.")
+    parser.add_argument("--force", action="store_true", help="Refresh every dataset on the first pass, not only those that are due, and rebuild the delta-sync snapshots from full fetches.")
+    args = parser.parse_args()
+
+    logger = logging.getLogger(__name__)
+    logger.info("=============================================")
+    logger.info("STARTING RMS CACHE WARMER")
+    logger.info("=============================================")
+
+    if "error" in APP_CONFIG:
+        logger.critical(f"Failed to load application configuration. Error: {APP_CONFIG['error']}")
+        logger.critical("Aborting cache warmer.")
+        sys.exit(1)
+
+    fetcher = AsyncBaserowFetcher(api_token=APP_CONFIG['baserow']['api_token'], base_url=APP_CONFIG['baserow'].get('base_url'))
+    if args.once:
+        warm_caches(fetcher, force=args.force)
+        logger.info("---------------------------------------------")
+        logger.info("FINISHED RMS CACHE WARMER PASS")
+        logger.info("---------------------------------------------")
+    else:
+        run_forever(fetcher, force_first=args.force)
@@ -0,0 +1,151 @@
+# RMS/utils/cache_registry.py
+import importlib
+import logging
+import threading
+
+from utils.config_loader import APP_CONFIG
+from utils.dataset_cache import DatasetCache, get_dataset_cache
+from utils.derived_cache import get_derived_cache
+
+logger = logging.getLogger(__name__)
+
+# Every dataset RMS caches from Baserow: dataset name -> (label, table id key in `baserow`, fetcher method).
+CACHED_DATASETS = {
+    'processed_sales_data': ("Processed Sales", 'processed_sales_data_table_id', 'get_table_data_as_dataframe'),
+    'inventory_data': ("Inventory", 'inventory_table_id', 'get_inventory_data'),
+    'category_data': ("Category", 'category_table_id', 'get_category_data'),
+    'catalogue_data': ("Catalogue", 'catalogue_table_id', 'get_catalogue_data'),
+    'purchase_orders_data': ("Purchase Orders", 'purchase_orders_table_id', 'get_table_data_as_dataframe'),
+    'outbound_packaging_data': ("Outbound Packaging", 'automated_outbound_table_id', 'get_outbound_packaging_data'),
+    'packaging_inventory_data': ("Packaging Inventory", 'packaging_inventory_table_id', 'get_packaging_inventory'),
+    'sku_mapping_data': ("SKU Mapping", 'sku_mapping_table_id', 'get_sku_mapping_data'),
+    'combo_sku_data': ("Combo SKUs", 'combo_sku_table_id', 'get_combo_sku_data'),
+    'asin_mapping_data': ("ASIN Mapping", 'amazon_listing_table_id', 'get_asin_mapping_data'),
+}
+
+# Modules defining @derived_artifact functions; imported so their artifacts are listed even before first use.
+DERIVED_ARTIFACT_MODULES = ('replenishment_engine.core', 'po_module.po_management')
+
+
+def _hit_ratio(hits, misses):
+    return round(hits / (hits + misses), 3) if hits + misses else None
+
+
+def _staleness(age, ttl, grace_seconds):
+    if age is None:
+        return "Not Cached"
+    if age < ttl:
+        return "Fresh"
+    if age < ttl + grace_seconds:
+        return "Stale (served, refreshed on next load)"
+    return "Expired"
+
+
+def dataset_status(cache=None):
+    """
+    One row per cached dataset (every entry of CACHED_DATASETS plus anything else with a meta file):
+    disk and memory bytes, rows, how long the last fetch took, hit/miss counts of this process
+    and how stale the data is.
+    """
+    cache = cache or get_dataset_cache()
+    grace_seconds = float((APP_CONFIG.get('cache', {}) or {}).get('stale_grace_hours', 72)) * 3600
+    stats = cache.stats()
+    rows = []
+    for name in list(CACHED_DATASETS) + [n for n in cache.cached_names() if n not in CACHED_DATASETS]:
+        meta = cache.current_meta(name)
+        counters = stats.get(name, {})
+        age = DatasetCache.age_seconds(meta)
+        ttl = cache.ttl_for(name)
+        hits = counters.get("memory_hits", 0) + counters.get("disk_hits", 0)
+        misses = counters.get("misses", 0) + counters.get("stale_misses", 0)
+        rows.append({
+            "kind": "dataset",
+            "name": name,
+            "label": CACHED_DATASETS.get(name, (name,))[0],
+            "disk_bytes": cache.disk_bytes(name) if meta else 0,
+            "memory_bytes": counters.get("memory_bytes", 0),
+            "rows": meta.get("rows") if meta else None,
+            "last_fetch_seconds": (meta.get("fetch_seconds") if meta else None) or counters.get("last_fill_seconds"),
+            "hits": hits,
+            "misses": misses,
+            "hit_ratio": _hit_ratio(hits, misses),
+            "age_hours": round(age / 3600, 1) if age is not None else None,
+            "ttl_hours": round(ttl / 3600, 1),
+            "status": _staleness(age, ttl, grace_seconds),
+            "last_updated": meta.get("last_updated") if meta else None,
+            "refreshing": cache.is_refreshing(name),
+        })
+    return rows
+
+
+def derived_status(derived=None):
+    """One row per derived artifact (see utils/derived_cache.py), in the same shape as dataset_status."""
+    for module in DERIVED_ARTIFACT_MODULES:
+        importlib.import_module(module)
+    derived = derived or get_derived_cache()
+    rows = []
+    for artifact, stats in derived.stats().items():
+        hits = stats["memory_hits"] + stats["disk_hits"]
+        rows.append({
+            "kind": "derived",
+            "name": artifact,
+            "label": f"{artifact} (from {', '.join(stats['depends_on'])})",
+            "disk_bytes": derived.disk_bytes(artifact),
+            "memory_bytes": stats["memory_bytes"],
+            "rows": None,
+            "last_fetch_seconds": stats["last_compute_seconds"],
+            "hits": hits,
+            "misses": stats["misses"],
+            "hit_ratio": _hit_ratio(hits, stats["misses"]),
+            "age_hours": None,
+            "ttl_hours": None,
+            "status": f"{stats['memory_entries']} result(s) in memory",
+            "last_updated": None,
+            "refreshing": False,
+        })
+    return rows
+
+
+def cache_status():
+    """dataset_status() followed by derived_status()."""
+    return dataset_status() + derived_status()
+
+
+def refresh_in_background(name, fetcher):
+    """
+    Starts a background refresh of dataset `name` from its Baserow table. Returns a message for
+    the user: started, already running, or why it can't be refreshed.
+    """
+    if name not in CACHED_DATASETS:
+        return f"'{name}' is not a known dataset; it can only be evicted."
+    label, table_id_key, fetch_method = CACHED_DATASETS[name]
+    table_id = APP_CONFIG.get('baserow', {}).get(table_id_key)
+    if not table_id:
+        return f"No `baserow.{table_id_key}` is configured, so {label} can't be refreshed."
+    fetch = getattr(fetcher, fetch_method)
+
+    def full_fetch():
+        # A refresh asked for by hand also rebuilds the delta-sync snapshot, so edits it missed are picked up.
+        with fetcher.full_refresh():
+            return fetch(table_id)
+    if get_dataset_cache().refresh_in_background(name, full_fetch, retry_window=False):
+        return f"Refreshing {label} in the background."
+    return f"{label} is already being refreshed."
+
+
+def evict_in_background(name, kind="dataset"):
+    """
+    Drops a dataset (memory, parquet, Arrow and meta files) or a derived artifact on a daemon
+    thread. Sessions keep the copy they hold; the next load fetches the dataset again.
+    """
+    def evict():
+        try:
+            if kind == "derived":
+                get_derived_cache().evict(name)
+            else:
+                get_dataset_cache().invalidate(name, delete_files=True)
+                logger.info(f"CACHE_REGISTRY: Evicted '{name}' from the cache.")
+        except Exception as e:
+            logger.error(f"CACHE_REGISTRY: Could not evict '{name}': {e}", exc_info=True)
+
+    threading.Thread(target=evict, name=f"cache-evict-{name}", daemon=True).start()
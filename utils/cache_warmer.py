@@ -0,0 +1,186 @@
+# RMS/utils/cache_warmer.py
+import json
+import logging
+import os
+import time
+from datetime import datetime, timedelta
+
+from utils.cache_registry import CACHED_DATASETS
+from utils.config_loader import APP_CONFIG
+from utils.dataset_cache import DatasetCache, atomic_write, get_dataset_cache
+
+logger = logging.getLogger(__name__)
+
+HISTORY_FILE = "cache_warmer_runs.jsonl"
+HISTORY_LIMIT = 500 # Runs kept in the history file
+
+
+def _warmer_config():
+    return APP_CONFIG.get('cache_warmer', {}) or {}
+
+
+def datasets_due(cache, force=False):
+    """
+    {dataset name: table id} of the configured datasets (`cache_warmer.datasets`, default all of
+    CACHED_DATASETS) that are not cached, or expire within `cache_warmer.refresh_ahead_minutes`.
+    With `force` every configured dataset is due.
+    """
+    warmer_config = _warmer_config()
+    refresh_ahead_seconds = float(warmer_config.get('refresh_ahead_minutes', 60)) * 60
+    due = {}
+    for name in warmer_config.get('datasets') or list(CACHED_DATASETS):
+        if name not in CACHED_DATASETS:
+            logger.warning(f"CACHE_WARMER: Unknown dataset '{name}' in cache_warmer.datasets; skipping it.")
+            continue
+        table_id = APP_CONFIG.get('baserow', {}).get(CACHED_DATASETS[name][1])
+        if not table_id:
+            continue
+        age = DatasetCache.age_seconds(cache.current_meta(name))
+        if force or age is None or age >= cache.ttl_for(name) - refresh_ahead_seconds:
+            due[name] = table_id
+    return due
+
+
+def warm_datasets(fetcher, cache, due, full=False):
+    """
+    Refreshes the datasets in `due` ({name: table id}) concurrently through AsyncBaserowFetcher.load_many,
+    each as a forced single-flight fill (so the delta-sync snapshots and bulk exports are used as in the app).
+    With `full`, delta-synced tables are rebuilt from a full fetch (see BaserowFetcher.full_refresh).
+    Returns {name: {'seconds', 'rows', 'status'}}.
+    """
+    timings = {}
+
+    def timed_fill(name):
+        fetch = getattr(fetcher, CACHED_DATASETS[name][2])
+
+        def full_fetch(table_id):
+            with fetcher.full_refresh():
+                return fetch(table_id)
+
+        def fill(table_id):
+            started = time.perf_counter()
+            df = cache.get_or_fill(name, lambda: full_fetch(table_id) if full else fetch(table_id), force=True)
+            timings[name] = round(time.perf_counter() - started, 3)
+            return df
+        return fill
+
+    results = fetcher.load_many({name: (timed_fill(name), table_id) for name, table_id in due.items()},
+                                return_exceptions=True)
+    records = {}
+    for name, result in results.items():
+        if isinstance(result, Exception):
+            logger.error(f"CACHE_WARMER: Refreshing '{name}' failed: {result}")
+            records[name] = {"seconds": timings.get(name), "rows": None, "status": f"error: {result}"}
+        else:
+            records[name] = {"seconds": timings.get(name), "rows": 0 if result is None else int(len(result)), "status": "ok"}
+    return records
+
+
+def warm_derived(cache):
+    """
+    Computes the derived artifacts from the cached datasets with the inputs the Replenishment
+    Planner uses, so its first run is served from the derived cache. Returns {artifact: {'seconds', 'status'}}.
+
+    Only the sales stats are warmed. The PO artifacts (open POs, last order dates and landed costs)
+    are computed by the pages from get_all_pos, which reads Baserow directly; a frame read back from
+    the `purchase_orders_data` parquet hashes differently (link-row lists become arrays), so warming
+    them here could never produce a hit.
+    """
+    # Imported here: these modules register their @derived_artifact functions on import.
+    from analytics_dashboard.data_loader import load_sales_data
+    from analytics_dashboard.kpi_calculations import process_sales_data_for_analytics
+    from replenishment_engine.core import calculate_sales_stats
+
+    sales_df = cache.get('processed_sales_data', allow_stale=True)
+    jobs = {}
+    if sales_df is not None and not sales_df.empty:
+        max_date = sales_df['Sale Date'].max()
+        min_date = max_date - timedelta(days=60)
+        # Same read as the Planner's, so the stats are keyed by the same input frame.
+        jobs['calculate_sales_stats'] = lambda: calculate_sales_stats(
+            process_sales_data_for_analytics(load_sales_data(min_date, max_date), min_date, max_date), sales_history_days=60)
+
+    records = {}
+    for artifact, job in jobs.items():
+        started = time.perf_counter()
+        try:
+            job()
+            records[artifact] = {"seconds": round(time.perf_counter() - started, 3), "status": "ok"}
+        except Exception as e:
+            logger.error(f"CACHE_WARMER: Computing '{artifact}' failed: {e}", exc_info=True)
+            records[artifact] = {"seconds": round(time.perf_counter() - started, 3), "status": f"error: {e}"}
+    return records
+
+
+def _append_history(cache, run):
+    """Appends `run` to the history file in the cache directory, keeping the last HISTORY_LIMIT runs."""
+    path = os.path.join(cache.cache_dir, HISTORY_FILE)
+    lines = []
+    if os.path.exists(path):
+        with open(path, 'r', encoding='utf-8') as f:
+            lines = f.read().splitlines()
+    lines = lines[-(HISTORY_LIMIT - 1):] + [json.dumps(run)]
+
+    def write(tmp_path):
+        with open(tmp_path, 'w', encoding='utf-8') as f:
+            f.write("\n".join(lines) + "\n")
+    atomic_write(path, write)
+
+
+def read_history(limit=20, cache=None):
+    """The last `limit` warmer runs, newest first."""
+    cache = cache or get_dataset_cache()
+    path = os.path.join(cache.cache_dir, HISTORY_FILE)
+    if not os.path.exists(path):
+        return []
+    runs = []
+    with open(path, 'r', encoding='utf-8') as f:
+        for line in f.read().splitlines()[-limit:]:
+            try:
+                runs.append(json.loads(line))
+            except ValueError:
+                continue
+    return runs[::-1]
+
+
+def warm_caches(fetcher, force=False):
+    """
+    One warming pass: refreshes the datasets that are due (see datasets_due), then the derived
+    artifacts when any dataset was refreshed (or with `force`). The timings are logged and
+    appended to the history file; the run record is returned.
+    """
+    cache = get_dataset_cache()
+    started_at = datetime.now()
+    started = time.perf_counter()
+    due = datasets_due(cache, force=force)
+    logger.info(f"CACHE_WARMER: Refreshing {', '.join(due) if due else 'nothing (all datasets are warm)'}.")
+    datasets = warm_datasets(fetcher, cache, due, full=force) if due else {}
+    derived = warm_derived(cache) if (datasets or force) else {}
+    run = {
+        "started": started_at.isoformat(),
+        "seconds": round(time.perf_counter() - started, 3),
+        "datasets": datasets,
+        "derived": derived,
+    }
+    try:
+        _append_history(cache, run)
+    except OSError as e:
+        logger.warning(f"CACHE_WARMER: Could not record the run: {e}")
+    for name, record in {**datasets, **derived}.items():
+        logger.info(f"CACHE_WARMER: {name}: {record['status']} in {record['seconds']}s.")
+    logger.info(f"CACHE_WARMER: Pass finished in {run['seconds']}s.")
+    return run
+
+
+def run_forever(fetcher, force_first=False):
+    """Runs warm_caches every `cache_warmer.interval_minutes`, starting now. Errors are logged and the schedule continues."""
+    interval_seconds = float(_warmer_config().get('interval_minutes', 30)) * 60
+    force = force_first
+    while True:
+        next_run = time.monotonic() + interval_seconds
+        try:
+            warm_caches(fetcher, force=force)
+        except Exception as e:
+            logger.error(f"CACHE_WARMER: Warming pass failed: {e}", exc_info=True)
+        force = False
+        time.sleep(max(0.0, next_run - time.monotonic()))
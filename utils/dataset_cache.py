@@ -0,0 +1,584 @@
+# RMS/utils/dataset_cache.py
+import json
+import logging
+import os
+import shutil
+import threading
+import time
+from collections import OrderedDict
+from datetime import datetime
+
+import pandas as pd
+import pyarrow.parquet as pq
+from utils.config_loader import APP_CONFIG
+from utils.dataset_schemas import DATASET_SCHEMAS
+from utils.file_lock import file_lock, FileLockTimeout
+from utils.partitioned_parquet import HivePartitioning
+
+logger = logging.getLogger(__name__)
+
+PROJECT_ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+COUNTER_NAMES = ("memory_hits", "disk_hits", "misses", "stale_misses", "evictions", "bytes_read", "bytes_written",
+                 "fills", "shared_fills")
+
+# Datasets stored as a Hive-partitioned directory instead of a single parquet file, so loaders can
+# read only the partitions they need and ingestion can rewrite only the partitions it touched.
+PARTITIONED_DATASETS = {
+    'processed_sales_data': HivePartitioning(['Platform', 'Account Name'], month_of='Sale Date'),
+}
+
+
+def atomic_write(path, write):
+    """Calls `write(tmp_path)` and then renames the temp file over `path`, so readers never see a partial file."""
+    tmp_path = f"{path}.tmp-{os.getpid()}-{threading.get_ident()}"
+    try:
+        write(tmp_path)
+        os.replace(tmp_path, path)
+    except BaseException:
+        if os.path.exists(tmp_path):
+            os.remove(tmp_path)
+        raise
+
+
+def resolve_cache_dir(cache_config=None):
+    """The absolute cache directory for a `cache` config section (relative paths are under the project root)."""
+    cache_config = APP_CONFIG.get('cache', {}) if cache_config is None else cache_config
+    directory = cache_config.get('directory', '.rms_cache')
+    return directory if os.path.isabs(directory) else os.path.join(PROJECT_ROOT, directory)
+
+
+class DatasetCache:
+    """
+    Two-tier cache for the DataFrames RMS loads from Baserow.
+
+    The disk tier is `{name}.parquet` plus `{name}_meta.json` in the cache directory (the same
+    files cache_manager always wrote). In front of it sits an in-process memory tier: an LRU of
+    already-parsed frames bounded by `memory_limit_bytes`, shared by every Streamlit session in
+    the process. A memory entry is only served while the meta file on disk is unchanged, so a
+    refresh written by another process (e.g. the notifier) is picked up on the next read.
+
+    Frames handed out are shallow copies of the shared one: adding or replacing columns is
+    fine, but callers must not modify values in place.
+
+    Fills are single-flight: get_or_fill holds a per-dataset file lock while fetching, so
+    concurrent sessions and processes wait for one fetch instead of all calling Baserow.
+    Files are written to a temp name and renamed into place; the meta (renamed last) records
+    the parquet's size and mtime, so a reader can tell when it raced a writer.
+
+    Datasets in `partitioning` (default PARTITIONED_DATASETS) are stored under
+    `{name}.parts/v<timestamp>/` as Hive partitions instead; the meta's `data_dir` names the
+    current version directory, and the previous one is kept for readers that are still on it.
+    get_partitions reads a subset of the partitions and update_partitions rewrites a few in place.
+
+    Datasets with a declared schema (`schemas`, default DATASET_SCHEMAS) are stored in their
+    typed form: fills and updates are typed once before they are written, so reads need no parsing.
+    """
+    def __init__(self, cache_dir, default_ttl_seconds=5 * 86400, ttl_overrides=None, memory_limit_bytes=512 * 1024 * 1024,
+                 fill_lock_timeout=600, refresh_retry_seconds=300, partitioning=None, schemas=None):
+        self.cache_dir = cache_dir
+        self.partitioning = PARTITIONED_DATASETS if partitioning is None else partitioning
+        self.schemas = DATASET_SCHEMAS if schemas is None else schemas
+        self.fill_lock_timeout = float(fill_lock_timeout)
+        self.refresh_retry_seconds = float(refresh_retry_seconds)
+        self.default_ttl_seconds = float(default_ttl_seconds)
+        self.ttl_overrides = {name: float(seconds) for name, seconds in (ttl_overrides or {}).items()}
+        self.memory_limit_bytes = int(memory_limit_bytes)
+        self.memory_bytes = 0
+        self._memory = OrderedDict() # name -> {'df', 'meta', 'bytes', 'meta_mtime'}
+        self._counters = {}
+        self._fill_seconds = {} # name -> duration of this process's last fill
+        self._refreshing = set()
+        self._last_refresh_started = {} # name -> monotonic time of the last background refresh
+        self._change_listeners = []
+        self._lock = threading.RLock()
+
+    def paths(self, name):
+        return os.path.join(self.cache_dir, f"{name}.parquet"), os.path.join(self.cache_dir, f"{name}_meta.json")
+
+    def _partitions_root(self, name):
+        return os.path.join(self.cache_dir, f"{name}.parts")
+
+    def _data_path(self, name, meta):
+        """The parquet file, or for a partitioned dataset the version directory, that `meta` describes."""
+        if meta and meta.get("data_dir"):
+            return os.path.join(self._partitions_root(name), meta["data_dir"])
+        return self.paths(name)[0]
+
+    def add_change_listener(self, callback):
+        """`callback(name)` is called after a dataset is written, patched or invalidated (e.g. to drop derived artifacts)."""
+        with self._lock:
+            self._change_listeners.append(callback)
+
+    def _changed(self, name):
+        for callback in list(self._change_listeners):
+            try:
+                callback(name)
+            except Exception as e:
+                logger.warning(f"DATASET_CACHE: Change listener failed for '{name}': {e}")
+
+    def typed(self, name, df):
+        """`df` in the dataset's declared typed form (unchanged for datasets without a schema)."""
+        schema = self.schemas.get(name)
+        return df if schema is None or df is None else schema.apply(df)
+
+    def lock_for(self, name):
+        """The dataset's fill lock, shared with every other session and process using this cache directory."""
+        return file_lock(os.path.join(self.cache_dir, "locks", f"{name}.lock"))
+
+    def ttl_for(self, name, default_ttl_seconds=None):
+        """A dataset's own TTL from `cache.ttl_hours` wins over the caller's default and the global expiry_days."""
+        if name in self.ttl_overrides:
+            return self.ttl_overrides[name]
+        return self.default_ttl_seconds if default_ttl_seconds is None else float(default_ttl_seconds)
+
+    def _count(self, name, counter, amount=1):
+        with self._lock:
+            counters = self._counters.setdefault(name, dict.fromkeys(COUNTER_NAMES, 0))
+            counters[counter] += amount
+
+    @staticmethod
+    def age_seconds(meta):
+        last_updated = meta.get("last_updated") if meta else None
+        if not last_updated:
+            return None
+        try:
+            return (datetime.now() - datetime.fromisoformat(last_updated)).total_seconds()
+        except (TypeError, ValueError):
+            return None # Treated like a missing timestamp
+
+    def read_meta(self, name):
+        """The dataset's meta dict from disk, or None when it isn't cached."""
+        meta_path = self.paths(name)[1]
+        try:
+            with open(meta_path, 'r') as f:
+                return json.load(f)
+        except FileNotFoundError:
+            return None
+        except (OSError, ValueError) as e:
+            logger.warning(f"DATASET_CACHE: Unreadable metadata for '{name}': {e}")
+            return None
+
+    @staticmethod
+    def _meta_mtime(meta_path):
+        try:
+            return os.stat(meta_path).st_mtime_ns
+        except OSError:
+            return None
+
+    def _remember(self, name, df, meta, meta_mtime):
+        nbytes = int(df.memory_usage(deep=True).sum())
+        with self._lock:
+            self._forget(name)
+            if nbytes > self.memory_limit_bytes:
+                logger.debug(f"DATASET_CACHE: '{name}' ({nbytes / 1e6:.1f} MB) exceeds the memory tier limit; disk only.")
+                return
+            while self._memory and self.memory_bytes + nbytes > self.memory_limit_bytes:
+                evicted_name, evicted = self._memory.popitem(last=False)
+                self.memory_bytes -= evicted['bytes']
+                self._count(evicted_name, "evictions")
+                logger.debug(f"DATASET_CACHE: Evicted '{evicted_name}' from memory ({evicted['bytes'] / 1e6:.1f} MB).")
+            self._memory[name] = {'df': df, 'meta': meta, 'bytes': nbytes, 'meta_mtime': meta_mtime}
+            self.memory_bytes += nbytes
+
+    def _forget(self, name):
+        with self._lock:
+            entry = self._memory.pop(name, None)
+            if entry is not None:
+                self.memory_bytes -= entry['bytes']
+
+    def get(self, name, ttl_seconds=None, allow_stale=False):
+        """
+        Returns the cached frame for `name`, or None when it is missing or older than its TTL.
+        With `allow_stale=True` an expired copy is returned anyway (fallback when Baserow fails).
+        The frame is writable, but it is a shallow copy of the one shared through the memory tier:
+        add or replace columns freely, and deep-copy it before modifying values in place.
+        """
+        ttl = self.ttl_for(name, ttl_seconds)
+        df_path, meta_path = self.paths(name)
+        meta_mtime = self._meta_mtime(meta_path)
+
+        with self._lock:
+            entry = self._memory.get(name)
+            if entry is not None and entry['meta_mtime'] == meta_mtime:
+                age = self.age_seconds(entry['meta'])
+                if allow_stale or (age is not None and age < ttl):
+                    self._memory.move_to_end(name)
+                    self._count(name, "memory_hits")
+                    return entry['df'].copy(deep=False)
+                if age is None:
+                    self._count(name, "misses")
+                    logger.warning(f"DATASET_CACHE: Metadata for '{name}' has no valid 'last_updated' timestamp.")
+                    return None
+                self._count(name, "stale_misses")
+                logger.info(f"DATASET_CACHE: '{name}' is stale (age {age / 3600:.1f}h, TTL {ttl / 3600:.1f}h).")
+                return None
+            if entry is not None:
+                self._forget(name) # Rewritten or removed on disk since we loaded it
+
+        for attempt in range(2):
+            meta = self.read_meta(name) if meta_mtime is not None else None
+            data_path = self._data_path(name, meta)
+            if meta is None or not os.path.exists(data_path):
+                self._count(name, "misses")
+                logger.info(f"DATASET_CACHE: '{name}' is not cached in {self.cache_dir}.")
+                return None
+            age = self.age_seconds(meta)
+            if age is None:
+                self._count(name, "misses")
+                logger.warning(f"DATASET_CACHE: Metadata for '{name}' has no valid 'last_updated' timestamp.")
+                return None
+            if age >= ttl and not allow_stale:
+                self._count(name, "stale_misses")
+                logger.info(f"DATASET_CACHE: '{name}' is stale (age {age / 3600:.1f}h, TTL {ttl / 3600:.1f}h).")
+                return None
+            if self._matches_meta(data_path, meta):
+                break
+            if attempt == 0:
+                # A writer replaced the parquet but not yet the meta. Wait for it to finish, then read again.
+                logger.debug(f"DATASET_CACHE: '{name}' is being rewritten; waiting for the writer.")
+                try:
+                    self.lock_for(name).acquire(timeout=self.fill_lock_timeout)
+                except FileLockTimeout:
+                    break
+                self.lock_for(name).release()
+                meta_mtime = self._meta_mtime(meta_path)
+            else:
+                self._count(name, "misses")
+                logger.warning(f"DATASET_CACHE: '{name}' parquet does not match its metadata. Will fetch fresh data.")
+                return None
+        try:
+            if meta.get("data_dir"):
+                df = self.partitioning[name].read(data_path, column_order=meta.get("column_order"))
+            else:
+                df = pd.read_parquet(data_path)
+            # Partition columns come back as plain strings, and data cached before its schema was declared is untyped.
+            df = self.typed(name, df)
+        except Exception as e:
+            self._count(name, "misses")
+            logger.warning(f"DATASET_CACHE: Error reading '{name}' from {data_path}: {e}. Will fetch fresh data.")
+            return None
+        self._count(name, "bytes_read", meta.get("bytes") or os.path.getsize(data_path))
+        self._count(name, "disk_hits")
+        self._remember(name, df, meta, meta_mtime)
+        logger.info(f"DATASET_CACHE: Loaded '{name}' from disk ({len(df)} rows, last updated {meta['last_updated'][:16]}).")
+        return df.copy(deep=False)
+
+    @staticmethod
+    def _matches_meta(data_path, meta):
+        """True when the parquet on disk is the one the meta describes (meta written before this check existed always match)."""
+        if meta.get("data_dir"):
+            return os.path.isdir(data_path) # Version directories are never reused
+        if "bytes" not in meta:
+            return True
+        try:
+            stat = os.stat(data_path)
+        except OSError:
+            return False
+        return stat.st_size == meta["bytes"] and stat.st_mtime_ns == meta.get("data_mtime_ns", stat.st_mtime_ns)
+
+    def put(self, name, df, fetch_seconds=None):
+        """
+        Writes `df` to the disk tier (parquet first, then the meta, each via an atomic rename)
+        and keeps it in the memory tier. Holds the dataset's lock while writing. `fetch_seconds`
+        (how long the fill took) is kept in the meta for the cache management page.
+        """
+        os.makedirs(self.cache_dir, exist_ok=True)
+        df_path, meta_path = self.paths(name)
+        df = self.typed(name, df)
+        try:
+            with self.lock_for(name):
+                now = datetime.now().isoformat()
+                meta = {"last_updated": now, "version": now, "rows": int(len(df)), "columns": int(len(df.columns))}
+                if name in self.schemas:
+                    meta["schema"] = self.schemas[name].version
+                if fetch_seconds is not None:
+                    meta["fetch_seconds"] = fetch_seconds
+                previous_meta = self.read_meta(name) or {}
+                if name in self.partitioning:
+                    meta.update(self._write_partitioned(name, df))
+                    data_path = self._data_path(name, meta)
+                else:
+                    atomic_write(df_path, lambda tmp_path: df.to_parquet(tmp_path, index=False))
+                    stat = os.stat(df_path)
+                    meta.update({"bytes": stat.st_size, "data_mtime_ns": stat.st_mtime_ns})
+                    data_path = df_path
+                atomic_write(meta_path, lambda tmp_path: self._write_json(tmp_path, meta))
+                meta_mtime = self._meta_mtime(meta_path)
+                if name in self.partitioning:
+                    self._remove_old_versions(name, {meta["data_dir"], previous_meta.get("data_dir")})
+        except Exception as e:
+            self._forget(name)
+            logger.error(f"DATASET_CACHE: Error saving '{name}' to cache: {e}")
+            return False
+        self._count(name, "bytes_written", meta["bytes"])
+        # Keep our own shallow copy so the caller can go on adding/replacing columns on `df`.
+        self._remember(name, df.copy(deep=False), meta, meta_mtime)
+        logger.info(f"DATASET_CACHE: Saved '{name}' to cache at {data_path} ({len(df)} rows).")
+        self._changed(name)
+        return True
+
+    @staticmethod
+    def _write_json(path, data):
+        with open(path, 'w') as f:
+            json.dump(data, f)
+
+    @staticmethod
+    def _write_table(path, table):
+        atomic_write(path, lambda tmp_path: pq.write_table(table, tmp_path))
+
+    def _write_partitioned(self, name, df):
+        """Writes `df` as a new version directory of a partitioned dataset and returns the meta fields describing it."""
+        data_dir = f"v{time.time_ns()}"
+        version_path = os.path.join(self._partitions_root(name), data_dir)
+        try:
+            nbytes, partitions = self.partitioning[name].write(df, version_path, self._write_table)
+        except BaseException:
+            shutil.rmtree(version_path, ignore_errors=True)
+            raise
+        return {"data_dir": data_dir, "bytes": nbytes, "partitions": partitions, "column_order": [str(c) for c in df.columns]}
+
+    def _remove_old_versions(self, name, keep):
+        """Deletes the version directories not in `keep`, and the single-file parquet of the unpartitioned layout."""
+        root = self._partitions_root(name)
+        for entry in os.listdir(root):
+            if entry not in keep:
+                shutil.rmtree(os.path.join(root, entry), ignore_errors=True)
+        legacy_path = self.paths(name)[0]
+        if os.path.exists(legacy_path):
+            os.remove(legacy_path)
+
+    def get_partitions(self, name, where, ttl_seconds=None, allow_stale=False):
+        """
+        Rows of a partitioned dataset from the partitions `where` selects ({column: allowed values
+        or a predicate on the value}, see HivePartitioning.partition_files), without loading the
+        rest: filtered from the memory tier when the whole dataset is there, otherwise read from
+        just those files (and not kept in memory). Selection is per partition, so callers still
+        apply row-level filters such as exact dates. Returns None like get() does.
+        """
+        partitioning = self.partitioning[name]
+        meta_mtime = self._meta_mtime(self.paths(name)[1])
+        with self._lock:
+            entry = self._memory.get(name)
+            in_memory = entry is not None and entry['meta_mtime'] == meta_mtime
+        meta = entry['meta'] if in_memory else self.read_meta(name)
+        if in_memory or not meta or not meta.get("data_dir"):
+            # Whole frame is at hand, or not cached as partitions (yet): go through get() and filter.
+            df = self.get(name, ttl_seconds=ttl_seconds, allow_stale=allow_stale)
+            return None if df is None else df[partitioning.mask(df, where)]
+
+        age = self.age_seconds(meta)
+        ttl = self.ttl_for(name, ttl_seconds)
+        if age is None or (age >= ttl and not allow_stale):
+            self._count(name, "stale_misses" if age is not None else "misses")
+            return None
+        data_path = self._data_path(name, meta)
+        try:
+            files = partitioning.partition_files(data_path, where)
+            df = self.typed(name, partitioning.read(data_path, column_order=meta.get("column_order"), files=files))
+        except Exception as e:
+            self._count(name, "misses")
+            logger.warning(f"DATASET_CACHE: Error reading partitions of '{name}' from {data_path}: {e}.")
+            return None
+        self._count(name, "disk_hits")
+        self._count(name, "bytes_read", sum(os.path.getsize(path) for path in files if os.path.exists(path)))
+        logger.info(f"DATASET_CACHE: Read {len(files)} partition(s) of '{name}' from disk ({len(df)} rows).")
+        return df
+
+    def update_partitions(self, name, new_rows, where, scope):
+        """
+        Replaces the rows `scope(frame)` selects with `new_rows` in a partitioned dataset,
+        rewriting only the partition files involved (see HivePartitioning.rewrite_partitions) and
+        the memory-tier copy. The meta gets a new `version`, so sessions swap the data in, but
+        keeps `last_updated`: the other partitions are no fresher than before. Returns False when
+        there is nothing cached as partitions to patch; on errors the dataset is dropped so the
+        next load does a full fetch.
+        """
+        meta_path = self.paths(name)[1]
+        new_rows = self.typed(name, new_rows)
+        with self.lock_for(name):
+            meta = self.read_meta(name)
+            if not meta or not meta.get("data_dir"):
+                return False
+            old_meta_mtime = self._meta_mtime(meta_path)
+            with self._lock:
+                entry = self._memory.get(name)
+            patched = None
+            try:
+                bytes_delta, rows_delta, rewritten = self.partitioning[name].rewrite_partitions(
+                    self._data_path(name, meta), new_rows, where, scope, self._write_table)
+                meta = {**meta, "version": datetime.now().isoformat(), "bytes": meta["bytes"] + bytes_delta,
+                        "rows": meta["rows"] + rows_delta}
+                if entry is not None and entry['meta_mtime'] == old_meta_mtime:
+                    df = entry['df']
+                    patched = pd.concat([df[~scope(df).to_numpy()], new_rows], ignore_index=True)
+                    patched = self.typed(name, patched[list(df.columns) + [c for c in patched.columns if c not in df.columns]])
+                atomic_write(meta_path, lambda tmp_path: self._write_json(tmp_path, meta))
+            except Exception as e:
+                logger.error(f"DATASET_CACHE: Could not update partitions of '{name}': {e}. It will be fetched in full on the next load.")
+                self.invalidate(name, delete_files=True)
+                return False
+            meta_mtime = self._meta_mtime(meta_path)
+            if patched is not None:
+                self._remember(name, patched, meta, meta_mtime)
+            else:
+                self._forget(name)
+        self._count(name, "bytes_written", max(bytes_delta, 0))
+        logger.info(f"DATASET_CACHE: Updated {rewritten} partition(s) of '{name}' ({rows_delta:+d} rows).")
+        self._changed(name)
+        return True
+
+    def get_or_fill(self, name, fetch, ttl_seconds=None, force=False):
+        """
+        Returns the cached frame, or calls `fetch()` to fill the cache. Only one session or
+        process fetches a dataset at a time; the others wait on the dataset's lock and then use
+        what it wrote. With `force=True` the cache is refreshed unless another fill finished
+        while we waited. Empty or None results are returned but not cached.
+        """
+        if not force:
+            df = self.get(name, ttl_seconds=ttl_seconds)
+            if df is not None:
+                return df
+        requested_at = datetime.now()
+        lock = self.lock_for(name)
+        try:
+            lock.acquire(timeout=self.fill_lock_timeout)
+        except FileLockTimeout:
+            logger.warning(f"DATASET_CACHE: Gave up waiting {self.fill_lock_timeout:.0f}s for another fill of '{name}'; fetching it here.")
+            lock = None
+        try:
+            if lock is not None:
+                if force:
+                    meta = self.read_meta(name)
+                    filled_meanwhile = bool(meta and meta.get("last_updated")) and datetime.fromisoformat(meta["last_updated"]) >= requested_at
+                    df = self.get(name, allow_stale=True) if filled_meanwhile else None
+                else:
+                    df = self.get(name, ttl_seconds=ttl_seconds)
+                if df is not None:
+                    self._count(name, "shared_fills")
+                    logger.info(f"DATASET_CACHE: '{name}' was filled by another session or process while we waited.")
+                    return df
+            started = time.perf_counter()
+            df = self.typed(name, fetch())
+            fill_seconds = round(time.perf_counter() - started, 3)
+            with self._lock:
+                self._fill_seconds[name] = fill_seconds
+            self._count(name, "fills")
+            if df is not None and not df.empty:
+                self.put(name, df, fetch_seconds=fill_seconds)
+            return df
+        finally:
+            if lock is not None:
+                lock.release()
+
+    def current_meta(self, name):
+        """Meta of the version currently on disk (from the memory tier when unchanged), or None."""
+        meta_mtime = self._meta_mtime(self.paths(name)[1])
+        if meta_mtime is None:
+            return None
+        with self._lock:
+            entry = self._memory.get(name)
+            if entry is not None and entry['meta_mtime'] == meta_mtime:
+                return entry['meta']
+        return self.read_meta(name)
+
+    def is_refreshing(self, name):
+        with self._lock:
+            return name in self._refreshing
+
+    def refresh_in_background(self, name, fetch, retry_window=True):
+        """
+        Refreshes `name` with `fetch()` on a daemon thread (a forced single-flight fill) and returns
+        True, or returns False when a refresh is already running or (with `retry_window`) was started
+        less than `refresh_retry_seconds` ago. Readers keep getting the old version until the new one is written.
+        """
+        now = time.monotonic()
+        with self._lock:
+            last_started = self._last_refresh_started.get(name, -self.refresh_retry_seconds)
+            if name in self._refreshing or (retry_window and now - last_started < self.refresh_retry_seconds):
+                return False
+            self._refreshing.add(name)
+            self._last_refresh_started[name] = now
+
+        def refresh():
+            try:
+                self.get_or_fill(name, fetch, force=True)
+                logger.info(f"DATASET_CACHE: Background refresh of '{name}' finished.")
+            except Exception as e:
+                logger.error(f"DATASET_CACHE: Background refresh of '{name}' failed: {e}", exc_info=True)
+            finally:
+                with self._lock:
+                    self._refreshing.discard(name)
+
+        logger.info(f"DATASET_CACHE: Refreshing '{name}' in the background.")
+        threading.Thread(target=refresh, name=f"cache-refresh-{name}", daemon=True).start()
+        return True
+
+    def invalidate(self, name, delete_files=False):
+        """Drops `name` from memory; with `delete_files` the parquet (or partitions) and meta files are removed too."""
+        self._forget(name)
+        self._changed(name)
+        if delete_files:
+            with self.lock_for(name):
+                for path in self.paths(name):
+                    if os.path.exists(path):
+                        os.remove(path)
+                shutil.rmtree(self._partitions_root(name), ignore_errors=True)
+
+    def cached_names(self):
+        """Names of the datasets that have a meta file in the cache directory."""
+        try:
+            entries = os.listdir(self.cache_dir)
+        except FileNotFoundError:
+            return []
+        return sorted(entry[:-len("_meta.json")] for entry in entries if entry.endswith("_meta.json"))
+
+    def disk_bytes(self, name):
+        """Bytes `name` takes on disk: parquet or partition versions and the meta."""
+        paths = [path for path in self.paths(name) if os.path.exists(path)]
+        for directory, _, files in os.walk(self._partitions_root(name)):
+            paths += [os.path.join(directory, file) for file in files]
+        total = 0
+        for path in paths:
+            try:
+                total += os.path.getsize(path)
+            except OSError:
+                pass # Removed by a writer meanwhile
+        return total
+
+    def stats(self):
+        """{name: counters + 'memory_bytes' and 'last_fill_seconds'} for every dataset this process has touched."""
+        with self._lock:
+            names = set(self._counters) | set(self._memory)
+            return {
+                name: {
+                    **self._counters.get(name, dict.fromkeys(COUNTER_NAMES, 0)),
+                    "memory_bytes": self._memory[name]['bytes'] if name in self._memory else 0,
+                    "last_fill_seconds": self._fill_seconds.get(name),
+                }
+                for name in sorted(names)
+            }
+
+
+_CACHES = {}
+_CACHES_LOCK = threading.Lock()
+
+
+def get_dataset_cache(cache_dir=None):
+    """
+    Returns the process-wide DatasetCache for `cache_dir` (default: `cache.directory`), configured
+    from the `cache` section: expiry_days, ttl_hours (per dataset), memory_limit_mb, fill_lock_timeout_seconds,
+    and refresh_retry_seconds.
+    """
+    cache_config = APP_CONFIG.get('cache', {}) or {}
+    cache_dir = os.path.abspath(cache_dir or resolve_cache_dir(cache_config))
+    with _CACHES_LOCK:
+        if cache_dir not in _CACHES:
+            _CACHES[cache_dir] = DatasetCache(
+                cache_dir,
+                default_ttl_seconds=float(cache_config.get('expiry_days', 5)) * 86400,
+                ttl_overrides={name: float(hours) * 3600 for name, hours in (cache_config.get('ttl_hours') or {}).items()},
+                memory_limit_bytes=int(cache_config.get('memory_limit_mb', 512)) * 1024 * 1024,
+                fill_lock_timeout=float(cache_config.get('fill_lock_timeout_seconds', 600)),
+                refresh_retry_seconds=float(cache_config.get('refresh_retry_seconds', 300)),
+            )
+        return _CACHES[cache_dir]
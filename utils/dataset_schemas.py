@@ -0,0 +1,77 @@
+# RMS/utils/dataset_schemas.py
+import logging
+
+import pandas as pd
+from pandas.api.types import infer_dtype, is_datetime64_any_dtype, is_numeric_dtype
+
+logger = logging.getLogger(__name__)
+
+
+class DatasetSchema:
+    """
+    The typed form of a dataset: what its one-time cleaning produces, and what the cache stores
+    so a load is a plain parquet read.
+    - dates: parsed to datetime.date (parquet date32); values that do not parse become NaT
+    - datetimes: {column: strftime format or None} parsed to datetime64
+    - numerics: {column: value for missing/unparseable entries}
+    - defaults: {column: value} replacing missing and empty values
+    - categoricals: string columns kept as pandas categoricals (dictionary-encoded in parquet)
+    - required: rows missing any of these after parsing are dropped
+    Columns missing from the frame are skipped. Columns that already have their type are left
+    alone, so apply() is cheap on data that is typed already. Bump `version` when the schema
+    changes; cached data written with another version is re-typed when it is read.
+    """
+    def __init__(self, version=1, dates=(), datetimes=None, numerics=None, defaults=None, categoricals=(), required=()):
+        self.version = version
+        self.dates = list(dates)
+        self.datetimes = dict(datetimes or {})
+        self.numerics = dict(numerics or {})
+        self.defaults = dict(defaults or {})
+        self.categoricals = list(categoricals)
+        self.required = list(required)
+
+    def apply(self, df):
+        """Returns `df` in its typed form (columns are replaced on `df` itself; rows are dropped on a copy)."""
+        if df is None or df.empty:
+            return df
+        for column in self.dates:
+            if column in df.columns and infer_dtype(df[column], skipna=True) not in ('date', 'empty'):
+                df[column] = pd.to_datetime(df[column].astype(str).str.strip(), errors='coerce').dt.date
+        for column, date_format in self.datetimes.items():
+            if column in df.columns and not is_datetime64_any_dtype(df[column]):
+                df[column] = pd.to_datetime(df[column], format=date_format, errors='coerce')
+        for column, fill_value in self.numerics.items():
+            if column in df.columns:
+                values = df[column] if is_numeric_dtype(df[column]) else pd.to_numeric(df[column], errors='coerce')
+                df[column] = values.fillna(fill_value)
+        for column, default in self.defaults.items():
+            if column in df.columns:
+                values = df[column].astype(object) if isinstance(df[column].dtype, pd.CategoricalDtype) else df[column]
+                df[column] = values.fillna(default).replace('', default)
+        for column in self.categoricals:
+            if column in df.columns and not isinstance(df[column].dtype, pd.CategoricalDtype):
+                df[column] = df[column].astype('category')
+        required = [c for c in self.required if c in df.columns]
+        if required:
+            missing = df[required].isna().any(axis=1)
+            if missing.any():
+                logger.debug(f"DATASET_SCHEMA: Dropping {int(missing.sum())} rows missing one of {required}.")
+                df = df[~missing]
+        return df
+
+
+# Declared schemas of the datasets RMS cleans after loading them from Baserow.
+DATASET_SCHEMAS = {
+    'processed_sales_data': DatasetSchema(
+        dates=['Sale Date', 'Report Period Start Date'],
+        numerics={'Quantity Sold': 0, 'Net Revenue': 0},
+        defaults={'MSKU': 'UNMAPPED'},
+        categoricals=['Platform', 'Account Name', 'MSKU'],
+        required=['Sale Date', 'Platform', 'Account Name'],
+    ),
+    # Dates in the PO table are entered like "9-Dec-2024".
+    'purchase_orders_data': DatasetSchema(
+        datetimes={'Order Date': "%d-%b-%Y", 'Arrive by': "%d-%b-%Y", 'Actual Receiving Date': "%d-%b-%Y"},
+        numerics={'Quantity': 0, 'INR Amt': 0},
+    ),
+}
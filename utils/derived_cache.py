@@ -0,0 +1,226 @@
+# RMS/utils/derived_cache.py
+import functools
+import hashlib
+import inspect
+import logging
+import os
+import shutil
+import threading
+import time
+from collections import OrderedDict
+
+import pandas as pd
+from utils.config_loader import APP_CONFIG
+from utils.dataset_cache import atomic_write, get_dataset_cache, resolve_cache_dir
+
+logger = logging.getLogger(__name__)
+
+# Bump to drop every stored artifact, e.g. after changing what one of the functions computes.
+ARTIFACT_FORMAT = 1
+COUNTER_NAMES = ("memory_hits", "disk_hits", "misses", "invalidations")
+
+# artifact (function) name -> datasets it is derived from, filled in by @derived_artifact
+ARTIFACT_DEPENDENCIES = {}
+
+
+def frame_fingerprint(df):
+    """A content hash of a DataFrame: columns, dtypes and every value (not the index)."""
+    digest = hashlib.blake2b(digest_size=16)
+    digest.update(repr((list(map(str, df.columns)), list(map(str, df.dtypes)), len(df))).encode('utf-8'))
+    for _, values in df.items():
+        try:
+            hashes = pd.util.hash_pandas_object(values, index=False)
+        except TypeError: # Unhashable values, e.g. the lists of Baserow link-row fields
+            hashes = pd.util.hash_pandas_object(values.map(repr), index=False)
+        digest.update(hashes.to_numpy().tobytes())
+    return digest.hexdigest()
+
+
+def _fingerprint(value):
+    if isinstance(value, pd.DataFrame):
+        return f"df:{frame_fingerprint(value)}"
+    if isinstance(value, pd.Series):
+        return f"series:{frame_fingerprint(value.to_frame())}"
+    return repr(value)
+
+
+class DerivedCache:
+    """
+    Content-addressed cache for values computed from datasets (sales stats, open PO data, ...).
+
+    An artifact's key is a hash of the function, ARTIFACT_FORMAT, the parameters and the content
+    of every DataFrame argument, so a changed input can never return an old result. Results are
+    kept in a small in-process LRU and, when they are DataFrames, as parquet files under
+    `{cache_dir}/derived/<function>/` shared with the other processes.
+
+    Each artifact declares the datasets it depends on. When one of them changes (the dataset
+    cache calls invalidate_dependents on every put, partition update and invalidation; PO
+    writes call it for the PO table), only the artifacts derived from it are dropped.
+    Returned frames are copies, so callers may modify them.
+    """
+    def __init__(self, cache_dir, max_entries=64):
+        self.root = os.path.join(cache_dir, "derived")
+        self.max_entries = int(max_entries)
+        self._memory = OrderedDict() # (artifact, key) -> result
+        self._counters = {}
+        self._compute_seconds = {} # artifact -> duration of the last computation in this process
+        self._lock = threading.RLock()
+
+    def _count(self, artifact, counter):
+        with self._lock:
+            counters = self._counters.setdefault(artifact, dict.fromkeys(COUNTER_NAMES, 0))
+            counters[counter] += 1
+
+    def key_for(self, func, args, kwargs):
+        """Content key for calling `func` with these arguments (defaults filled in)."""
+        bound = inspect.signature(func).bind(*args, **kwargs)
+        bound.apply_defaults()
+        parts = [f"{func.__module__}.{func.__qualname__}", str(ARTIFACT_FORMAT)]
+        parts += [f"{name}={_fingerprint(value)}" for name, value in bound.arguments.items()]
+        return hashlib.sha256("|".join(parts).encode('utf-8')).hexdigest()[:32]
+
+    def _path(self, artifact, key):
+        return os.path.join(self.root, artifact, f"{key}.parquet")
+
+    @staticmethod
+    def _copy(result):
+        return result.copy() if isinstance(result, (pd.DataFrame, pd.Series)) else result
+
+    def _remember(self, artifact, key, result):
+        with self._lock:
+            self._memory[(artifact, key)] = result
+            self._memory.move_to_end((artifact, key))
+            while len(self._memory) > self.max_entries:
+                self._memory.popitem(last=False)
+
+    def get_or_compute(self, func, args, kwargs, persist=True):
+        """
+        Returns the stored result of `func(*args, **kwargs)`, computing and storing it when there
+        is none. With `persist=False` the result is only kept in memory.
+        """
+        artifact = func.__name__
+        try:
+            key = self.key_for(func, args, kwargs)
+        except Exception as e: # Inputs that can't be hashed; just compute.
+            logger.debug(f"DERIVED_CACHE: Not caching '{artifact}': {e}")
+            return func(*args, **kwargs)
+
+        with self._lock:
+            if (artifact, key) in self._memory:
+                self._memory.move_to_end((artifact, key))
+                self._count(artifact, "memory_hits")
+                return self._copy(self._memory[(artifact, key)])
+
+        path = self._path(artifact, key)
+        if persist and os.path.exists(path):
+            try:
+                result = pd.read_parquet(path)
+                self._count(artifact, "disk_hits")
+                self._remember(artifact, key, result)
+                logger.debug(f"DERIVED_CACHE: '{artifact}' {key[:8]} loaded from disk.")
+                return self._copy(result)
+            except Exception as e:
+                logger.warning(f"DERIVED_CACHE: Could not read {path}: {e}. Recomputing.")
+
+        self._count(artifact, "misses")
+        started = time.perf_counter()
+        result = func(*args, **kwargs)
+        with self._lock:
+            self._compute_seconds[artifact] = round(time.perf_counter() - started, 3)
+        self._remember(artifact, key, self._copy(result))
+        if persist and isinstance(result, pd.DataFrame):
+            try:
+                os.makedirs(os.path.dirname(path), exist_ok=True)
+                atomic_write(path, lambda tmp_path: result.to_parquet(tmp_path))
+            except Exception as e:
+                logger.debug(f"DERIVED_CACHE: '{artifact}' kept in memory only, parquet write failed: {e}")
+        logger.info(f"DERIVED_CACHE: Computed '{artifact}' {key[:8]} in {self._compute_seconds[artifact]}s.")
+        return result
+
+    def evict(self, artifact):
+        """Drops every stored result of `artifact`, in memory and on disk."""
+        with self._lock:
+            for entry in [entry for entry in self._memory if entry[0] == artifact]:
+                del self._memory[entry]
+        shutil.rmtree(os.path.join(self.root, artifact), ignore_errors=True)
+        logger.info(f"DERIVED_CACHE: Evicted '{artifact}'.")
+
+    def disk_bytes(self, artifact):
+        """Bytes the stored results of `artifact` take on disk."""
+        total = 0
+        for directory, _, files in os.walk(os.path.join(self.root, artifact)):
+            for file in files:
+                try:
+                    total += os.path.getsize(os.path.join(directory, file))
+                except OSError:
+                    pass
+        return total
+
+    def invalidate_dependents(self, dataset_name):
+        """Drops the artifacts derived from `dataset_name`, in memory and on disk."""
+        artifacts = [artifact for artifact, datasets in ARTIFACT_DEPENDENCIES.items() if dataset_name in datasets]
+        if not artifacts:
+            return
+        with self._lock:
+            for entry in [entry for entry in self._memory if entry[0] in artifacts]:
+                del self._memory[entry]
+        for artifact in artifacts:
+            self._count(artifact, "invalidations")
+            shutil.rmtree(os.path.join(self.root, artifact), ignore_errors=True)
+        logger.info(f"DERIVED_CACHE: '{dataset_name}' changed; dropped {', '.join(artifacts)}.")
+
+    @staticmethod
+    def _nbytes(result):
+        if isinstance(result, pd.DataFrame):
+            return int(result.memory_usage(deep=True).sum())
+        if isinstance(result, pd.Series):
+            return int(result.memory_usage(deep=True))
+        return 0
+
+    def stats(self):
+        """{artifact: counters + 'depends_on', 'memory_entries', 'memory_bytes' and 'last_compute_seconds'}."""
+        with self._lock:
+            return {
+                artifact: {
+                    **self._counters.get(artifact, dict.fromkeys(COUNTER_NAMES, 0)),
+                    "depends_on": list(datasets),
+                    "memory_entries": sum(1 for entry in self._memory if entry[0] == artifact),
+                    "memory_bytes": sum(self._nbytes(result) for entry, result in self._memory.items() if entry[0] == artifact),
+                    "last_compute_seconds": self._compute_seconds.get(artifact),
+                }
+                for artifact, datasets in sorted(ARTIFACT_DEPENDENCIES.items())
+            }
+
+
+_CACHES = {}
+_CACHES_LOCK = threading.Lock()
+
+
+def get_derived_cache(cache_dir=None):
+    """
+    Returns the process-wide DerivedCache for `cache_dir` (default: `cache.directory`), subscribed
+    to the dataset cache of the same directory so dataset changes drop the dependent artifacts.
+    """
+    cache_config = APP_CONFIG.get('cache', {}) or {}
+    cache_dir = os.path.abspath(cache_dir or resolve_cache_dir(cache_config))
+    with _CACHES_LOCK:
+        if cache_dir not in _CACHES:
+            _CACHES[cache_dir] = DerivedCache(cache_dir, max_entries=cache_config.get('derived_memory_entries', 64))
+            get_dataset_cache(cache_dir).add_change_listener(_CACHES[cache_dir].invalidate_dependents)
+        return _CACHES[cache_dir]
+
+
+def derived_artifact(*depends_on, persist=True):
+    """
+    Decorator: results of the function are cached by content (see DerivedCache) and dropped
+    when one of the datasets in `depends_on` changes. Use `persist=False` for results that do
+    not survive a parquet round trip (e.g. columns holding lists of dicts).
+    """
+    def decorate(func):
+        ARTIFACT_DEPENDENCIES[func.__name__] = tuple(depends_on)
+
+        @functools.wraps(func)
+        def wrapper(*args, **kwargs):
+            return get_derived_cache().get_or_compute(func, args, kwargs, persist=persist)
+        return wrapper
+    return decorate
@@ -0,0 +1,108 @@
+# RMS/utils/file_lock.py
+import logging
+import os
+import threading
+import time
+
+try:
+    import fcntl
+except ImportError: # Windows
+    fcntl = None
+    import msvcrt
+
+logger = logging.getLogger(__name__)
+
+
+class FileLockTimeout(TimeoutError):
+    pass
+
+
+class FileLock:
+    """
+    An exclusive lock on a lock file, held across threads of this process and across
+    processes (the Streamlit app, run_notifications.py, ...). Uses flock on POSIX and
+    msvcrt.locking on Windows. Re-entrant for the thread that holds it.
+
+    Get instances through file_lock(path) so all threads of a process share one object.
+    """
+    def __init__(self, path, poll_interval=0.1):
+        self.path = path
+        self.poll_interval = poll_interval
+        self._thread_lock = threading.RLock()
+        self._depth = 0
+        self._fd = None
+
+    def _try_lock_file(self):
+        try:
+            if fcntl:
+                fcntl.flock(self._fd, fcntl.LOCK_EX | fcntl.LOCK_NB)
+            else:
+                os.lseek(self._fd, 0, os.SEEK_SET)
+                msvcrt.locking(self._fd, msvcrt.LK_NBLCK, 1)
+            return True
+        except OSError:
+            return False
+
+    def _unlock_file(self):
+        if fcntl:
+            fcntl.flock(self._fd, fcntl.LOCK_UN)
+        else:
+            os.lseek(self._fd, 0, os.SEEK_SET)
+            msvcrt.locking(self._fd, msvcrt.LK_UNLCK, 1)
+
+    def acquire(self, timeout=None):
+        """Waits up to `timeout` seconds (forever when None); raises FileLockTimeout after that."""
+        deadline = None if timeout is None else time.monotonic() + timeout
+        if not self._thread_lock.acquire(timeout=-1 if timeout is None else timeout):
+            raise FileLockTimeout(f"Timed out after {timeout}s waiting for {self.path} (held by another thread).")
+        if self._depth:
+            self._depth += 1
+            return self
+        try:
+            os.makedirs(os.path.dirname(self.path) or '.', exist_ok=True)
+            self._fd = os.open(self.path, os.O_RDWR | os.O_CREAT, 0o644)
+            waited = False
+            while not self._try_lock_file():
+                if deadline is not None and time.monotonic() >= deadline:
+                    raise FileLockTimeout(f"Timed out after {timeout}s waiting for {self.path} (held by another process).")
+                if not waited:
+                    logger.debug(f"FILE_LOCK: Waiting for {self.path}, held by another process.")
+                    waited = True
+                time.sleep(self.poll_interval)
+        except BaseException:
+            if self._fd is not None:
+                os.close(self._fd)
+                self._fd = None
+            self._thread_lock.release()
+            raise
+        self._depth = 1
+        return self
+
+    def release(self):
+        self._depth -= 1
+        if self._depth == 0:
+            try:
+                self._unlock_file()
+            finally:
+                os.close(self._fd)
+                self._fd = None
+        self._thread_lock.release()
+
+    def __enter__(self):
+        return self.acquire()
+
+    def __exit__(self, exc_type, exc, tb):
+        self.release()
+
+
+_LOCKS = {}
+_LOCKS_LOCK = threading.Lock()
+
+
+def file_lock(path):
+    """Returns the process-wide FileLock for `path`."""
+    path = os.path.abspath(path)
+    with _LOCKS_LOCK:
+        if path not in _LOCKS:
+            _LOCKS[path] = FileLock(path)
+        return _LOCKS[path]
@@ -0,0 +1,89 @@
+# RMS/utils/http_session.py
+import logging
+import threading
+from urllib.parse import urlsplit
+
+import requests
+from requests.adapters import HTTPAdapter
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_POOL_MAXSIZE = 10
+# requests already decodes gzip/deflate bodies; these are sent explicitly so every host sees the same headers.
+DEFAULT_HEADERS = {"Accept-Encoding": "gzip, deflate", "Connection": "keep-alive"}
+
+_SESSIONS = {}
+_POOL_SIZES = {}
+_SESSIONS_LOCK = threading.Lock()
+
+
+def host_key(url):
+    """'https://Example.com:8443/some/path' -> 'https://example.com:8443'."""
+    parts = urlsplit(url)
+    if not parts.scheme or not parts.netloc:
+        raise ValueError(f"Cannot pool connections for '{url}': expected an absolute http(s) URL.")
+    return f"{parts.scheme.lower()}://{parts.netloc.lower()}"
+
+
+def _mount_pool(session, key, pool_maxsize):
+    # One adapter per host, mounted on the host prefix, so each host gets its own keep-alive pool.
+    session.mount(f"{key}/", HTTPAdapter(pool_connections=1, pool_maxsize=pool_maxsize))
+    _POOL_SIZES[key] = pool_maxsize
+
+
+def get_http_session(url, pool_maxsize=None):
+    """
+    Returns the process-wide requests.Session for the host of `url`. Connections to that host
+    are kept alive and reused by every caller (Baserow client, PO uploads, PDF image downloads,
+    WAHA), instead of opening a new TCP/TLS connection per call as module-level requests.get does.
+
+    `pool_maxsize` is the number of connections kept open to the host; a caller asking for a
+    larger pool than the current one grows it. Sessions are thread-safe for sending requests,
+    but callers must pass their own auth headers per request rather than setting them on the session.
+    """
+    key = host_key(url)
+    with _SESSIONS_LOCK:
+        session = _SESSIONS.get(key)
+        if session is None:
+            session = requests.Session()
+            session.headers.update(DEFAULT_HEADERS)
+            _mount_pool(session, key, pool_maxsize or DEFAULT_POOL_MAXSIZE)
+            _SESSIONS[key] = session
+            logger.info(f"HTTP_SESSION: Created pooled session for {key} (pool size {_POOL_SIZES[key]}).")
+        elif pool_maxsize and pool_maxsize > _POOL_SIZES.get(key, 0):
+            _mount_pool(session, key, pool_maxsize)
+            logger.info(f"HTTP_SESSION: Grew the connection pool for {key} to {pool_maxsize}.")
+        return session
+
+
+def session_stats():
+    """{host: {'pool_maxsize', 'connections_opened', 'requests_sent'}} for every pooled session."""
+    stats = {}
+    with _SESSIONS_LOCK:
+        items = list(_SESSIONS.items())
+    for key, session in items:
+        adapter = session.adapters.get(f"{key}/")
+        connections_opened = requests_sent = 0
+        if adapter is not None:
+            pools = adapter.poolmanager.pools
+            for pool_key in list(pools.keys()):
+                pool = pools.get(pool_key)
+                if pool is not None:
+                    connections_opened += pool.num_connections
+                    requests_sent += pool.num_requests
+        stats[key] = {
+            "pool_maxsize": _POOL_SIZES.get(key),
+            "connections_opened": connections_opened,
+            "requests_sent": requests_sent,
+        }
+    return stats
+
+
+def close_http_sessions():
+    """Closes every pooled session (open connections included). Later calls create new ones."""
+    with _SESSIONS_LOCK:
+        sessions = list(_SESSIONS.values())
+        _SESSIONS.clear()
+        _POOL_SIZES.clear()
+    for session in sessions:
+        session.close()
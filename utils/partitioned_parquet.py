@@ -0,0 +1,187 @@
+# RMS/utils/partitioned_parquet.py
+import logging
+import os
+from urllib.parse import quote, unquote
+
+import pandas as pd
+import pyarrow as pa
+import pyarrow.dataset as ds
+import pyarrow.parquet as pq
+
+logger = logging.getLogger(__name__)
+
+NULL_PARTITION = "__HIVE_DEFAULT_PARTITION__" # Hive's (and pyarrow's) directory name for a missing value
+UNKNOWN_MONTH = "unknown"
+SCHEMA_FILE = "_common_metadata"
+PART_FILE = "part-0.parquet"
+
+
+class HivePartitioning:
+    """
+    Stores a DataFrame as a Hive-partitioned parquet dataset, one file per partition:
+    `<root>/<column>=<value>/.../year_month=YYYY-MM/part-0.parquet`.
+
+    `columns` live in the directory names instead of the files (values URL-quoted, as pyarrow's
+    hive partitioning expects). With `month_of`, a derived `year_month` level is added from that
+    date column; rows whose date does not parse go to `year_month=unknown`, which sorts after
+    every real month and so never matches a date range.
+
+    Every file is written with the schema of the whole frame (kept in `_common_metadata`), so a
+    single partition can be rewritten later and the dataset still reads back as one table.
+    """
+    def __init__(self, columns, month_of=None):
+        self.columns = list(columns)
+        self.month_of = month_of
+        self.levels = self.columns + (['year_month'] if month_of else [])
+
+    def months(self, df):
+        """The `year_month` partition value of each row."""
+        dates = pd.to_datetime(df[self.month_of].astype(str).str.strip(), errors='coerce')
+        return dates.dt.strftime('%Y-%m').fillna(UNKNOWN_MONTH)
+
+    def _partition_keys(self, df, levels=None):
+        """The partition value of each row for `levels` (default: all), with NULL_PARTITION for missing values."""
+        keys = pd.DataFrame(index=df.index)
+        for level in levels or self.levels:
+            if level == 'year_month':
+                keys[level] = self.months(df)
+            else:
+                keys[level] = df[level].astype(object).map(lambda v: NULL_PARTITION if pd.isna(v) or str(v) == '' else str(v))
+        return keys
+
+    def _groups(self, df):
+        """{partition values tuple: row positions} for `df`."""
+        groups = self._partition_keys(df).reset_index(drop=True).groupby(self.levels, sort=False).indices
+        return {(values if isinstance(values, tuple) else (values,)): positions for values, positions in groups.items()}
+
+    def partition_path(self, root, values):
+        """Path of the file of the partition with `values` (one per level, in order)."""
+        segments = [f"{quote(level, safe='')}={value if value == NULL_PARTITION else quote(value, safe='')}"
+                    for level, value in zip(self.levels, values)]
+        return os.path.join(root, *segments, PART_FILE)
+
+    def _file_table(self, df, schema=None):
+        """`df` without the partition columns, as an arrow table (cast to `schema` when given)."""
+        data = df.drop(columns=[c for c in self.columns if c in df.columns]).reset_index(drop=True)
+        if schema is not None:
+            data = data[[name for name in schema.names if name in data.columns]]
+        return pa.Table.from_pandas(data, schema=schema, preserve_index=False)
+
+    def write(self, df, root, write_file):
+        """
+        Writes every partition of `df` under `root` (a new directory) and returns (total bytes,
+        number of partitions). `write_file(path, table)` writes one file; the cache passes one
+        that writes to a temp file and renames it into place.
+        """
+        os.makedirs(root)
+        table = self._file_table(df)
+        pq.write_metadata(table.schema, os.path.join(root, SCHEMA_FILE))
+        total_bytes = 0
+        groups = self._groups(df)
+        for values, positions in groups.items():
+            path = self.partition_path(root, values)
+            os.makedirs(os.path.dirname(path), exist_ok=True)
+            write_file(path, table.take(pa.array(positions)))
+            total_bytes += os.path.getsize(path)
+        return total_bytes, len(groups)
+
+    def schema(self, root):
+        """Schema of the partition files (without the partition columns)."""
+        return pq.read_schema(os.path.join(root, SCHEMA_FILE))
+
+    @staticmethod
+    def _allows(condition, value):
+        if condition is None:
+            return True
+        if callable(condition):
+            return condition(value)
+        return value in condition
+
+    def partition_files(self, root, where=None):
+        """
+        The partition files under `root`, pruning whole directories with `where`: {level: a
+        collection of allowed values, or a predicate on the value}. A missing value is None.
+        """
+        where = where or {}
+        directories = [root]
+        for level in self.levels:
+            prefix = f"{quote(level, safe='')}="
+            selected = []
+            for directory in directories:
+                try:
+                    entries = os.listdir(directory)
+                except FileNotFoundError:
+                    continue
+                for entry in entries:
+                    if not entry.startswith(prefix):
+                        continue
+                    raw_value = entry[len(prefix):]
+                    if self._allows(where.get(level), None if raw_value == NULL_PARTITION else unquote(raw_value)):
+                        selected.append(os.path.join(directory, entry))
+            directories = selected
+        return [path for path in (os.path.join(d, PART_FILE) for d in directories) if os.path.exists(path)]
+
+    def mask(self, df, where):
+        """Boolean mask of the rows of an in-memory `df` that lie in the partitions `where` selects."""
+        keep = pd.Series(True, index=df.index)
+        levels = [level for level, condition in (where or {}).items() if condition is not None]
+        keys = self._partition_keys(df, levels)
+        for level in levels:
+            condition, values = where[level], keys[level]
+            allowed = [v for v in values.unique() if self._allows(condition, None if v == NULL_PARTITION else v)]
+            keep &= values.isin(allowed)
+        return keep
+
+    def read(self, root, where=None, column_order=None, files=None):
+        """
+        Reads the partitions selected by `where` (see partition_files), or the given `files`,
+        into one frame with the partition columns restored; the derived `year_month` is dropped.
+        """
+        files = self.partition_files(root, where) if files is None else files
+        file_schema = self.schema(root)
+        schema = pa.schema(list(file_schema) + [pa.field(level, pa.string()) for level in self.levels],
+                           metadata=file_schema.metadata)
+        if files:
+            partitioning = ds.partitioning(pa.schema([(level, pa.string()) for level in self.levels]), flavor="hive")
+            table = ds.dataset(files, schema=schema, format="parquet", partitioning=partitioning,
+                               partition_base_dir=root).to_table()
+        else:
+            table = schema.empty_table()
+        df = table.to_pandas()
+        if self.month_of:
+            df = df.drop(columns=['year_month'])
+        if column_order:
+            df = df[[c for c in column_order if c in df.columns] + [c for c in df.columns if c not in column_order]]
+        return df
+
+    def rewrite_partitions(self, root, new_rows, where, scope, write_file):
+        """
+        Replaces the stored rows selected by `scope(frame) -> boolean mask` with `new_rows`,
+        touching only the partitions `where` selects plus those `new_rows` fall into. Each of
+        them is read, patched and written back whole (through `write_file`); partitions left
+        empty are removed. Returns (bytes delta, rows delta, number of partitions rewritten).
+        """
+        schema = self.schema(root)
+        new_groups = self._groups(new_rows) if not new_rows.empty else {}
+        paths = set(self.partition_files(root, where))
+        paths.update(self.partition_path(root, values) for values in new_groups)
+        new_by_path = {self.partition_path(root, values): positions for values, positions in new_groups.items()}
+
+        bytes_delta = rows_delta = 0
+        for path in sorted(paths):
+            old_bytes = os.path.getsize(path) if os.path.exists(path) else 0
+            stored = self.read(root, files=[path]) if old_bytes else None
+            kept = stored[~scope(stored).to_numpy()] if stored is not None else None
+            parts = [part for part in (kept, new_rows.iloc[new_by_path[path]] if path in new_by_path else None)
+                     if part is not None and not part.empty]
+            rows_delta += sum(len(part) for part in parts) - (len(stored) if stored is not None else 0)
+            if not parts:
+                if old_bytes:
+                    os.remove(path)
+                bytes_delta -= old_bytes
+                continue
+            os.makedirs(os.path.dirname(path), exist_ok=True)
+            write_file(path, self._file_table(pd.concat(parts, ignore_index=True), schema=schema))
+            bytes_delta += os.path.getsize(path) - old_bytes
+        logger.info(f"PARTITIONED_PARQUET: Rewrote {len(paths)} partition(s) under {root} ({rows_delta:+d} rows).")
+        return bytes_delta, rows_delta, len(paths)
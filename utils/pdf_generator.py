@@ -2,10 +2,10 @@
 from fpdf import FPDF
 import pandas as pd
 from datetime import datetime
-import requests
 from io import BytesIO
 import logging
 import numpy as np
+from utils.http_session import get_http_session
 
 logger = logging.getLogger(__name__)
 
@@ -77,7 +77,7 @@ def generate_replenishment_pdf(dataframe: pd.DataFrame):
             image_url = row.get("Image URL", "")
             if image_url and isinstance(image_url, str) and image_url.startswith('http'):
                 try:
-                    response = requests.get(image_url, timeout=5)
+                    response = get_http_session(image_url).get(image_url, timeout=5)
                     response.raise_for_status()
                     img = BytesIO(response.content)
                     pdf.image(img, x=x_start_row + 1, y=y_start_row + 1, w=col_widths["Image URL"] - 2, h=row_height - 2)
@@ -169,7 +169,7 @@ def generate_po_pdf(po_number, vendor_name, order_date, line_items_df: pd.DataFr
             image_url = row.get("Image URL", "")
             if image_url and isinstance(image_url, str) and image_url.startswith('http'):
                 try:
-                    response = requests.get(image_url, timeout=5)
+                    response = get_http_session(image_url).get(image_url, timeout=5)
                     response.raise_for_status()
                     img = BytesIO(response.content)
                     pdf.image(img, x=x_start_row + 1, y=y_start_row + 1, w=col_widths["Image URL"] - 2, h=row_height - 2)